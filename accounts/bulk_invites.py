@@ -0,0 +1,169 @@
+# accounts/bulk_invites.py
+"""
+Bulk user invitations from a CSV or JSON list.
+
+Rows are validated and deduplicated in memory, then checked against
+existing users and the company's pending invites with set-based queries
+(one for the invites, one per MAX_QUERY_EMAILS addresses for the users)
+rather than a query per row. New invites are written with bulk_create and
+their mails queued in the outbox with one more INSERT, so thousands of
+invites take a handful of queries. An expired pending invite is renewed
+(new token, new expiry) and its mail sent again.
+
+Every row that is not invited gets an error (line, email, message) in the
+result instead of failing the whole import.
+"""
+import csv
+import io
+import json
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from notifications.outbox import queue_emails
+from .models import UserInvite
+
+MAX_ROWS = 20000
+MAX_QUERY_EMAILS = 900  # below SQLite's 999 bound parameters
+ROLES = dict(UserInvite.ROLE_CHOICES)
+
+
+class BulkInviteError(ValueError):
+    """The uploaded list could not be read at all."""
+
+
+def parse_invite_rows(content, fmt="csv"):
+    """
+    [(line, email, role)] from CSV (`email[,role]`, header optional) or JSON
+    (a list of emails or of {"email": ..., "role": ...} objects).
+    """
+    if isinstance(content, bytes):
+        try:
+            content = content.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise BulkInviteError("The file is not UTF-8 text.")
+
+    if fmt == "json":
+        try:
+            data = json.loads(content)
+        except ValueError as exc:
+            raise BulkInviteError(f"Invalid JSON: {exc}")
+        if not isinstance(data, list):
+            raise BulkInviteError("Expected a JSON list of invites.")
+        rows = []
+        for line, item in enumerate(data, start=1):
+            if isinstance(item, dict):
+                rows.append((line, str(item.get("email", "")), str(item.get("role") or "")))
+            else:
+                rows.append((line, str(item), ""))
+    else:
+        rows = []
+        for line, cells in enumerate(csv.reader(io.StringIO(content)), start=1):
+            cells = [cell.strip() for cell in cells]
+            if not any(cells):
+                continue
+            if line == 1 and cells[0].lower() == "email":
+                continue  # header
+            rows.append((line, cells[0], cells[1] if len(cells) > 1 else ""))
+
+    if len(rows) > MAX_ROWS:
+        raise BulkInviteError(f"At most {MAX_ROWS} invites per import.")
+    return rows
+
+
+class BulkInviteResult:
+    def __init__(self, invited, renewed, errors):
+        self.invited = invited  # new UserInvite rows
+        self.renewed = renewed  # expired invites sent again
+        self.errors = errors    # [(line, email, message)]
+
+    @property
+    def sent(self):
+        return len(self.invited) + len(self.renewed)
+
+
+def _registered_emails(emails):
+    User = get_user_model()
+    emails = list(emails)
+    registered = set()
+    for start in range(0, len(emails), MAX_QUERY_EMAILS):
+        registered.update(
+            User.objects.annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=emails[start:start + MAX_QUERY_EMAILS])
+            .values_list("email_lower", flat=True)
+        )
+    return registered
+
+
+def _invite_mail(invite, company, build_link):
+    return (
+        "You're invited to SecureLink 360",
+        f"Hello,\n\nYou have been invited to join {company.name} on SecureLink 360."
+        f"\n\nClick the link to accept: {build_link(invite)}"
+        f"\n\nThis link expires in 7 days.",
+        [invite.email],
+        settings.DEFAULT_FROM_EMAIL,
+    )
+
+
+def bulk_invite(company, invited_by, rows, build_link, default_role="employee"):
+    """
+    Invite the (line, email, role) `rows` to `company`. `build_link(invite)`
+    returns the absolute accept URL for an invite's mail.
+    """
+    errors = []
+    wanted = {}  # email -> (line, role)
+    for line, email, role in rows:
+        email = email.strip().lower()
+        role = (role or default_role).strip().lower()
+        try:
+            validate_email(email)
+        except ValidationError:
+            errors.append((line, email, "Invalid email address."))
+            continue
+        if role not in ROLES:
+            errors.append((line, email, f"Unknown role '{role}'."))
+            continue
+        if email in wanted:
+            errors.append((line, email, f"Duplicate of line {wanted[email][0]}."))
+            continue
+        wanted[email] = (line, role)
+
+    registered = _registered_emails(wanted)
+    pending = {
+        invite.email.lower(): invite
+        for invite in company.invites.filter(accepted=False).only("id", "email", "role", "created_at", "token")
+    }
+
+    new_invites, renewed = [], []
+    now = timezone.now()
+    for email, (line, role) in wanted.items():
+        if email in registered:
+            errors.append((line, email, "Already has an account."))
+        elif email in pending:
+            invite = pending[email]
+            if not invite.is_expired():
+                errors.append((line, email, "Already invited."))
+                continue
+            invite.token, invite.created_at, invite.role = uuid.uuid4(), now, role
+            renewed.append(invite)
+        else:
+            new_invites.append(
+                UserInvite(company=company, email=email, role=role, invited_by=invited_by)
+            )
+
+    with transaction.atomic():
+        new_invites = UserInvite.objects.bulk_create(new_invites, batch_size=500)
+        UserInvite.objects.bulk_update(renewed, ["token", "created_at", "role"], batch_size=500)
+        queue_emails([
+            _invite_mail(invite, company, build_link) for invite in [*new_invites, *renewed]
+        ])
+
+    errors.sort()
+    return BulkInviteResult(new_invites, renewed, errors)
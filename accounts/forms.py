@@ -72,6 +72,24 @@ class InviteUserForm(BootstrapFormMixin, forms.ModelForm):
         fields = ["email", "role"]
 
 
+class BulkInviteForm(BootstrapFormMixin, forms.Form):
+    file = forms.FileField(
+        label="CSV or JSON file",
+        help_text="CSV: one email per line, optionally followed by a role. JSON: a list of emails or of {\"email\", \"role\"} objects.",
+    )
+    role = forms.ChoiceField(
+        choices=UserInvite.ROLE_CHOICES,
+        label="Default role",
+        help_text="Used for rows that do not give a role.",
+    )
+
+    def clean_file(self):
+        upload = self.cleaned_data["file"]
+        if not upload.name.lower().endswith((".csv", ".json", ".txt")):
+            raise forms.ValidationError("Upload a .csv or .json file.")
+        return upload
+
+
 class InviteAcceptanceForm(BootstrapFormMixin, SetPasswordForm):
     first_name = forms.CharField(
         max_length=50,
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from accounts.bulk_invites import BulkInviteError, bulk_invite, parse_invite_rows
+from accounts.models import UserInvite
+
+
+class Command(BaseCommand):
+    help = "Invite users to a company from a CSV (email[,role]) or JSON file; mails go through the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", help="CSV or JSON file of invites")
+        parser.add_argument(
+            "--invited-by", required=True,
+            help="Email of the company admin the invites are sent on behalf of"
+        )
+        parser.add_argument(
+            "--role", choices=[role for role, _ in UserInvite.ROLE_CHOICES], default="employee",
+            help="Role for rows that do not give one (default: employee)"
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        admin = User.objects.select_related("company").filter(email__iexact=options["invited_by"]).first()
+        if admin is None or admin.company is None:
+            raise CommandError(f"{options['invited_by']} is not a user of any company")
+
+        path = Path(options["file"])
+        fmt = "json" if path.suffix.lower() == ".json" else "csv"
+        try:
+            rows = parse_invite_rows(path.read_bytes(), fmt)
+        except (OSError, BulkInviteError) as exc:
+            raise CommandError(str(exc))
+
+        base_url = settings.SITE_URL.rstrip("/")
+        result = bulk_invite(
+            admin.company, admin, rows,
+            lambda invite: base_url + reverse("accept_invite", args=[str(invite.token)]),
+            default_role=options["role"],
+        )
+
+        for line, email, error in result.errors:
+            self.stderr.write(f"Line {line} ({email}): {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(result.invited)} invited, {len(result.renewed)} renewed, "
+            f"{len(result.errors)} skipped for {admin.company.name}."
+        ))
+
+
+# Usage: python manage.py bulk_invite staff.csv --invited-by admin@acme.com --role employee
@@ -1,7 +1,13 @@
 #company_network/accounts/middleware/company_license.py
-from django.shortcuts import redirect
-from django.utils import timezone
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
 from django.contrib import messages
+from django.core.exceptions import MiddlewareNotUsed
+from django.shortcuts import redirect
+from django.urls import reverse
+
+from companies.license_cache import get_license_snapshot, license_error
+
 
 class CompanyLicenseMiddleware:
     """
@@ -9,27 +15,63 @@ class CompanyLicenseMiddleware:
     - User is tied to a company
     - Company license is active
     - Seat limits are respected
+
+    Checks run against the cached license snapshot
+    (companies.license_cache), so a cache hit adds no queries. Works in
+    both sync and async middleware chains.
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
+        if not getattr(settings, "COMPANY_LICENSE_ENFORCED", True):
+            raise MiddlewareNotUsed
         self.get_response = get_response
+        self.exempt_paths = tuple(getattr(settings, "COMPANY_LICENSE_EXEMPT_PATHS", ()))
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if self.is_exempt(request):
+            return self.get_response(request)
+
         user = request.user
+        snapshot = None
+        if user.is_authenticated and not user.is_superuser and user.company_id:
+            snapshot = get_license_snapshot(user.company_id)
+
+        return self.check(request, user, snapshot) or self.get_response(request)
+
+    async def __acall__(self, request):
+        if self.is_exempt(request):
+            return await self.get_response(request)
+
+        user = await request.auser()
+        snapshot = None
+        if user.is_authenticated and not user.is_superuser and user.company_id:
+            snapshot = await sync_to_async(get_license_snapshot)(user.company_id)
+
+        return self.check(request, user, snapshot) or await self.get_response(request)
 
-        if user.is_authenticated and not user.is_superuser:
-            company = user.company
-            if not company:
-                messages.error(request, "You are not assigned to any company.")
-                return redirect("home")  # 🚫 not logout
+    def is_exempt(self, request):
+        # The redirect target must stay reachable or users would loop
+        return request.path == reverse("home") or request.path.startswith(self.exempt_paths)
 
-            license = getattr(company, "license", None)
-            if not license or not license.is_active():
-                messages.error(request, "Your company license has expired.")
-                return redirect("home")  # 🚫 not logout
+    def check(self, request, user, snapshot):
+        """Redirect response if the user may not continue, else None."""
+        if not user.is_authenticated or user.is_superuser:
+            return None
 
-            if company.users.count() > license.seats:
-                messages.error(request, "Your company has exceeded its user limit.")
-                return redirect("home")  # 🚫 not logout
+        if not user.company_id:
+            messages.error(request, "You are not assigned to any company.")
+            return redirect("home")  # 🚫 not logout
 
-        return self.get_response(request)
+        error = license_error(snapshot)
+        if error:
+            messages.error(request, error)
+            return redirect("home")  # 🚫 not logout
+        return None
@@ -1,3 +1,54 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from companies.models import Company
+from .bulk_invites import bulk_invite
+from .models import User, UserInvite
+
+
+class BulkInviteTests(TestCase):
+    """bulk_invite against existing invites."""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Acme", domain="acme.test")
+        self.admin = User.objects.create(email="admin@acme.test", company=self.company, role=User.Roles.ADMIN)
+
+    def invite(self, *rows):
+        return bulk_invite(self.company, self.admin, rows, lambda invite: f"https://acme.test/{invite.token}")
+
+    def test_renewed_expired_invite_takes_the_new_role(self):
+        old = UserInvite.objects.create(company=self.company, email="bob@acme.test", role="employee", invited_by=self.admin)
+        UserInvite.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=8))
+
+        result = self.invite((2, "bob@acme.test", "manager"))
+
+        self.assertEqual(result.errors, [])
+        old.refresh_from_db()
+        self.assertEqual(old.role, "manager")
+        self.assertFalse(old.is_expired())
+
+    def test_pending_invite_is_not_renewed(self):
+        UserInvite.objects.create(company=self.company, email="bob@acme.test", role="employee", invited_by=self.admin)
+
+        result = self.invite((2, "bob@acme.test", "manager"))
+
+        self.assertEqual(result.errors, [(2, "bob@acme.test", "Already invited.")])
+        self.assertEqual(UserInvite.objects.get().role, "employee")
+
+
+class BulkInviteViewTests(TestCase):
+    """The JSON body form of the bulk invite view."""
+
+    def setUp(self):
+        company = Company.objects.create(name="Acme", domain="acme.test")
+        self.client.force_login(User.objects.create(email="admin@acme.test", company=company, role=User.Roles.ADMIN))
+
+    def test_body_that_is_not_utf8_is_a_bad_request(self):
+        response = self.client.post(reverse("bulk_invite"), b'["\xff@acme.test"]', content_type="application/json")
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("UTF-8", response.json()["error"])
+        self.assertFalse(UserInvite.objects.exists())
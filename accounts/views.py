@@ -4,10 +4,10 @@ from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib import messages
 from django.conf import settings
-from django.core.mail import send_mail
 from django.urls import reverse
 from django.utils import timezone
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 
 from django.contrib.auth import get_user_model
 User = get_user_model()
@@ -15,11 +15,13 @@ User = get_user_model()
 from .models import UserInvite, Company
 from .forms import (
     AdminRegistrationForm,
+    BulkInviteForm,
     InviteUserForm,
     EditUserForm,
     InviteAcceptanceForm,
 )
 from .decorators import company_admin_required
+from .bulk_invites import BulkInviteError, parse_invite_rows, bulk_invite as run_bulk_invite
 import uuid
 
 
@@ -135,7 +137,7 @@ def user_management(request):
 
 
 from django.urls import reverse
-from django.core.mail import send_mail
+from notifications.outbox import queue_email
 from django.contrib import messages
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
@@ -156,13 +158,14 @@ def send_invite(request):
             invite_path = reverse("accept_invite", args=[str(invite.token)])
             invite_link = request.build_absolute_uri(invite_path)
 
-            send_mail(
+            # Sent by the outbox worker (manage.py send_outbox)
+            queue_email(
                 "You're invited to SecureLink 360",
                 f"Hello,\n\nYou have been invited to join {request.user.company.name} on SecureLink 360."
                 f"\n\nClick the link to accept: {invite_link}"
                 f"\n\nThis link expires in 7 days.",
-                settings.DEFAULT_FROM_EMAIL,
                 [invite.email],
+                settings.DEFAULT_FROM_EMAIL,
             )
             messages.success(request, f"Invitation sent to {invite.email}")
             return redirect("user_management")
@@ -186,17 +189,68 @@ def resend_invite(request, invite_id):
     invite_path = reverse("accept_invite", args=[str(invite.token)])
     invite_url = request.build_absolute_uri(invite_path)
 
-    send_mail(
+    queue_email(
         subject="Your invitation link (resend) - SecureLink 360",
-        message=f"Here’s your updated invite link: {invite_url}",
+        body=f"Here’s your updated invite link: {invite_url}",
+        recipients=[invite.email],
         from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[invite.email],
     )
 
     messages.success(request, f"Resent invite to {invite.email}")
     return redirect("user_management")
 
 
+def _invite_link_builder(request):
+    return lambda invite: request.build_absolute_uri(reverse("accept_invite", args=[str(invite.token)]))
+
+
+@login_required
+@company_admin_required
+def bulk_invite(request):
+    """
+    Invite many users at once from an uploaded CSV / JSON file, or from a
+    JSON body (`[{"email": ..., "role": ...}, ...]`, answered in JSON).
+    """
+    if request.method == "POST" and request.content_type == "application/json":
+        try:
+            rows = parse_invite_rows(request.body, "json")
+        except BulkInviteError as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+        result = run_bulk_invite(
+            request.user.company, request.user, rows, _invite_link_builder(request),
+            default_role=request.GET.get("role", "employee"),
+        )
+        return JsonResponse({
+            "invited": len(result.invited),
+            "renewed": len(result.renewed),
+            "errors": [
+                {"line": line, "email": email, "error": error}
+                for line, email, error in result.errors
+            ],
+        })
+
+    result = None
+    if request.method == "POST":
+        form = BulkInviteForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data["file"]
+            fmt = "json" if upload.name.lower().endswith(".json") else "csv"
+            try:
+                rows = parse_invite_rows(upload.read(), fmt)
+            except BulkInviteError as exc:
+                form.add_error("file", str(exc))
+            else:
+                result = run_bulk_invite(
+                    request.user.company, request.user, rows, _invite_link_builder(request),
+                    default_role=form.cleaned_data["role"],
+                )
+                messages.success(request, f"{result.sent} invitation(s) queued.")
+    else:
+        form = BulkInviteForm()
+
+    return render(request, "companies/admin/bulk_invite.html", {"form": form, "result": result})
+
+
 
 @login_required
 @company_admin_required
@@ -1,6 +1,6 @@
 # alerts/admin.py
 from django.contrib import admin
-from .models import IntruderLog
+from .models import IntruderLog, IntruderRollup
 
 
 @admin.register(IntruderLog)
@@ -15,3 +15,19 @@ class IntruderLogAdmin(admin.ModelAdmin):
     def device_display(self, obj):
         return obj.device.mac_address if obj.device else "—"
     device_display.short_description = "Device"
+
+
+@admin.register(IntruderRollup)
+class IntruderRollupAdmin(admin.ModelAdmin):
+    """Admin panel for IntruderRollup model (read-only, built by rollup_intruder_logs)"""
+
+    list_display = ("period", "period_start", "network", "ip_address", "mac_address", "count", "last_seen")
+    list_filter = ("period", "period_start", "company")
+    search_fields = ("ip_address", "mac_address", "network__name")
+    list_select_related = ("network",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,81 @@
+# alerts/exports.py
+"""
+Streamed intruder log exports.
+
+Rows are read in keyset chunks of CHUNK_SIZE (see alerts.pagination) and
+written to the response as they are produced, so memory use does not grow
+with the number of rows exported.
+"""
+import csv
+import json
+
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+
+CHUNK_SIZE = 2000
+
+EXPORT_FIELDS = [
+    ("MAC Address", "mac_address"),
+    ("IP Address", "ip_address"),
+    ("Status", "status"),
+    ("Timestamp", "detected_at"),
+    ("Network", "network__name"),
+    ("Reason", "note"),
+]
+
+
+def iter_log_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Dicts of EXPORT_FIELDS for every log in `queryset`, newest first."""
+    columns = [field for _, field in EXPORT_FIELDS]
+    queryset = queryset.order_by("-detected_at", "-id").values("id", *columns)
+    last = None
+    while True:
+        chunk = queryset
+        if last is not None:
+            chunk = chunk.filter(
+                Q(detected_at__lt=last["detected_at"])
+                | Q(detected_at=last["detected_at"], id__lt=last["id"])
+            )
+        rows = list(chunk[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1]
+
+
+class _Echo:
+    """File-like object whose write() hands back the line for streaming."""
+
+    def write(self, value):
+        return value
+
+
+def stream_logs_csv(queryset, filename="intruder_logs.csv"):
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow([header for header, _ in EXPORT_FIELDS])
+        for row in iter_log_rows(queryset):
+            yield writer.writerow([row[field] for _, field in EXPORT_FIELDS])
+
+    response = StreamingHttpResponse(lines(), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def stream_logs_ndjson(queryset, filename="intruder_logs.ndjson"):
+    def lines():
+        for row in iter_log_rows(queryset):
+            yield json.dumps({
+                "id": row["id"],
+                "mac_address": row["mac_address"],
+                "ip_address": row["ip_address"],
+                "status": row["status"],
+                "detected_at": row["detected_at"].isoformat(),
+                "network": row["network__name"],
+                "note": row["note"],
+            }) + "\n"
+
+    response = StreamingHttpResponse(lines(), content_type="application/x-ndjson")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
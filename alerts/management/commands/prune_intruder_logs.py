@@ -0,0 +1,84 @@
+import json
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from alerts.exports import iter_log_rows
+from alerts.models import IntruderLog
+from alerts.rollups import period_floor, rollup_intruder_logs
+from companies.dashboard import invalidate_admin_dashboard
+
+
+class Command(BaseCommand):
+    help = "Roll up, optionally archive, then delete intruder logs older than the retention window"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.INTRUDER_LOG_RETENTION_DAYS,
+            help="Keep this many days of raw logs (default: INTRUDER_LOG_RETENTION_DAYS)"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=5000,
+            help="Rows deleted per statement"
+        )
+        parser.add_argument(
+            "--archive", type=str, default=None,
+            help="Append the pruned rows to this NDJSON file before deleting them"
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Only report how many rows would be pruned"
+        )
+
+    def handle(self, *args, **options):
+        # Whole days only, so no daily roll-up is left half-rebuildable
+        cutoff = period_floor(timezone.now() - timedelta(days=options["days"]), "day")
+        old_logs = IntruderLog.objects.filter(detected_at__lt=cutoff)
+
+        if options["dry_run"]:
+            self.stdout.write(f"{old_logs.count()} intruder logs older than {cutoff:%Y-%m-%d} would be pruned.")
+            return
+
+        # Keep the counts before the rows go
+        oldest = old_logs.order_by("detected_at").values_list("detected_at", flat=True).first()
+        if oldest is None:
+            self.stdout.write("Nothing to prune.")
+            return
+        rollup_intruder_logs(oldest, cutoff, "hour")
+        rollup_intruder_logs(oldest, cutoff, "day")
+
+        if options["archive"]:
+            self.archive(old_logs, Path(options["archive"]))
+
+        company_ids = set(old_logs.values_list("company_id", flat=True).distinct())
+        deleted = 0
+        while True:
+            ids = list(old_logs.values_list("id", flat=True)[:options["batch_size"]])
+            if not ids:
+                break
+            # Raw delete: no per-row post_delete. Nothing references
+            # IntruderLog, rows this old are long out of every live view,
+            # and dashboards are invalidated once per company below.
+            deleted += IntruderLog.objects.filter(id__in=ids)._raw_delete(IntruderLog.objects.db)
+            self.stdout.write(f"  pruned {deleted} rows...")
+
+        invalidate_admin_dashboard(*company_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f"Pruned {deleted} intruder logs older than {cutoff:%Y-%m-%d}."
+        ))
+
+    def archive(self, logs, path):
+        count = 0
+        with path.open("a") as archive:
+            for row in iter_log_rows(logs):
+                row["detected_at"] = row["detected_at"].isoformat()
+                archive.write(json.dumps(row) + "\n")
+                count += 1
+        self.stdout.write(f"Archived {count} rows to {path}.")
+
+
+# Usage: python manage.py prune_intruder_logs --days 30 --archive /var/backups/intruders.ndjson
+# Schedule daily, after rollup_intruder_logs.
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from alerts.rollups import rollup_intruder_logs
+
+
+class Command(BaseCommand):
+    help = "Recompute hourly and daily intruder roll-ups for recent logs (run e.g. every 15 minutes)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours", type=int, default=2,
+            help="Roll up logs detected in the last N hours (default: 2)"
+        )
+
+    def handle(self, *args, **options):
+        end = timezone.now()
+        start = end - timedelta(hours=options["hours"])
+
+        hourly = rollup_intruder_logs(start, end, "hour")
+        daily = rollup_intruder_logs(start, end, "day")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up {hourly} hourly and {daily} daily intruder buckets."
+        ))
+
+
+# Usage: python manage.py rollup_intruder_logs --hours 48
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0002_intruderlog_network'),
+        ('devices', '0004_device_device_status_blocked_idx'),
+        ('networks', '0005_joinrequest_joinreq_pending_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='intruderlog',
+            index=models.Index(fields=['network', 'status', 'detected_at'], name='intruder_net_status_time_idx'),
+        ),
+    ]
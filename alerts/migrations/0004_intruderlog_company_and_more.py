@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_company(apps, schema_editor):
+    IntruderLog = apps.get_model("alerts", "IntruderLog")
+    Network = apps.get_model("networks", "Network")
+    Device = apps.get_model("devices", "Device")
+    User = apps.get_model("accounts", "User")
+
+    # Same precedence as IntruderLog.save(): network, then device, then user
+    IntruderLog.objects.filter(network__isnull=False).update(
+        company_id=Subquery(Network.objects.filter(pk=OuterRef("network_id")).values("company_id")[:1])
+    )
+    IntruderLog.objects.filter(company__isnull=True, device__isnull=False).update(
+        company_id=Subquery(Device.objects.filter(pk=OuterRef("device_id")).values("company_id")[:1])
+    )
+    IntruderLog.objects.filter(company__isnull=True, user__isnull=False).update(
+        company_id=Subquery(User.objects.filter(pk=OuterRef("user_id")).values("company_id")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0003_intruderlog_intruder_net_status_time_idx'),
+        ('companies', '0003_announcement_announce_company_scope_idx'),
+        ('devices', '0005_device_company'),
+        ('networks', '0005_joinrequest_joinreq_pending_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='intruderlog',
+            name='company',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='intruder_logs', to='companies.company'),
+        ),
+        migrations.AddIndex(
+            model_name='intruderlog',
+            index=models.Index(fields=['company', '-detected_at'], name='intruder_company_time_idx'),
+        ),
+        migrations.RunPython(backfill_company, migrations.RunPython.noop),
+    ]
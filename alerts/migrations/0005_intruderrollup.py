@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0004_intruderlog_company_and_more'),
+        ('companies', '0003_announcement_announce_company_scope_idx'),
+        ('networks', '0005_joinrequest_joinreq_pending_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IntruderRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily')], max_length=4)),
+                ('period_start', models.DateTimeField()),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('mac_address', models.CharField(blank=True, max_length=17, null=True)),
+                ('count', models.PositiveIntegerField()),
+                ('first_seen', models.DateTimeField()),
+                ('last_seen', models.DateTimeField()),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='intruder_rollups', to='companies.company')),
+                ('network', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='intruder_rollups', to='networks.network')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period', 'period_start'], name='rollup_period_idx'), models.Index(fields=['company', 'period', '-period_start'], name='rollup_company_period_idx'), models.Index(fields=['network', 'period', '-period_start'], name='rollup_network_period_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:42
+
+import devices.macs
+from django.db import migrations
+
+
+def normalize_log_macs(apps, schema_editor):
+    IntruderLog = apps.get_model("alerts", "IntruderLog")
+    rows = IntruderLog.objects.exclude(mac_address__isnull=True).exclude(mac_address="").order_by("pk")
+    last_pk = 0
+    while batch := list(rows.filter(pk__gt=last_pk).values_list("pk", "mac_address")[:2000]):
+        last_pk = batch[-1][0]
+        IntruderLog.objects.bulk_update(
+            [
+                IntruderLog(pk=pk, mac_address=devices.macs.normalize_mac(mac))
+                for pk, mac in batch
+                if devices.macs.normalize_mac(mac) != mac
+            ],
+            ["mac_address"],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0005_intruderrollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='intruderlog',
+            name='mac_address',
+            field=devices.macs.MACAddressField(blank=True, max_length=17, null=True),
+        ),
+        migrations.RunPython(normalize_log_macs, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,8 @@
 from django.db import models
 from django.conf import settings
 
+from devices.macs import MACAddressField
+
 class IntruderLog(models.Model):
     network = models.ForeignKey(  # ✅ NEW
         "networks.Network",
@@ -15,14 +17,80 @@ class IntruderLog(models.Model):
         "devices.Device", on_delete=models.SET_NULL, null=True, blank=True, related_name="intruder_logs"
     )
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    # Denormalized tenant (from network, else device, else user) so tenant
+    # listings need no join; filled in by save()
+    company = models.ForeignKey(
+        "companies.Company",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="intruder_logs",
+    )
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    mac_address = models.CharField(max_length=17, null=True, blank=True)
+    mac_address = MACAddressField(null=True, blank=True)
     detected_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, default="Detected")  # Detected / Resolved
     note = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            # Recent detections per network (live view, dashboards)
+            models.Index(fields=["network", "status", "detected_at"], name="intruder_net_status_time_idx"),
+            # Tenant alert listings, newest first
+            models.Index(fields=["company", "-detected_at"], name="intruder_company_time_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.company_id is None:
+            if self.network_id:
+                self.company_id = self.network.company_id
+            elif self.device_id:
+                self.company_id = self.device.company_id
+            elif self.user_id:
+                self.company_id = self.user.company_id
+        super().save(*args, **kwargs)
+
     def __str__(self):
         identifier = (
             self.device.mac_address if self.device else self.mac_address or self.ip_address or "unknown"
         )
         return f"Intruder {identifier} on {self.network or 'No Network'} @ {self.detected_at}"
+
+
+class IntruderRollup(models.Model):
+    """
+    Intruder attempts counted per hour / day, network and source (IP, MAC).
+
+    Built from IntruderLog by `manage.py rollup_intruder_logs` (and before
+    every `prune_intruder_logs`), so history outlives the raw rows and
+    reports read this small table instead of the full log.
+    """
+    PERIOD_CHOICES = [
+        ("hour", "Hourly"),
+        ("day", "Daily"),
+    ]
+
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    period_start = models.DateTimeField()
+    company = models.ForeignKey(
+        "companies.Company", on_delete=models.CASCADE, null=True, blank=True, related_name="intruder_rollups"
+    )
+    network = models.ForeignKey(
+        "networks.Network", on_delete=models.CASCADE, null=True, blank=True, related_name="intruder_rollups"
+    )
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    mac_address = models.CharField(max_length=17, null=True, blank=True)
+    count = models.PositiveIntegerField()
+    first_seen = models.DateTimeField()
+    last_seen = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["period", "period_start"], name="rollup_period_idx"),
+            models.Index(fields=["company", "period", "-period_start"], name="rollup_company_period_idx"),
+            models.Index(fields=["network", "period", "-period_start"], name="rollup_network_period_idx"),
+        ]
+
+    def __str__(self):
+        source = self.ip_address or self.mac_address or "unknown"
+        return f"{self.count} attempts from {source} ({self.period} of {self.period_start:%Y-%m-%d %H:%M})"
@@ -0,0 +1,66 @@
+# alerts/pagination.py
+"""
+Keyset pagination for intruder log listings.
+
+Pages are ordered newest first by (detected_at, id) and each page starts
+after the last row of the previous one, so a page costs one index range
+scan no matter how deep it is (OFFSET would re-read every earlier row).
+The cursor is opaque to the browser: `?after=<cursor>`.
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+PAGE_SIZE = 50
+
+
+def encode_cursor(log):
+    raw = f"{log.detected_at.isoformat()}|{log.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(detected_at, id) from a cursor, or None if it is missing/invalid."""
+    if not cursor:
+        return None
+    try:
+        detected_at, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(detected_at), int(log_id)
+    except (ValueError, UnicodeError):
+        return None
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor, is_first):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.is_first = is_first
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def paginate_logs(queryset, cursor=None, per_page=PAGE_SIZE):
+    """One page of `queryset` (IntruderLogs), newest first, after `cursor`."""
+    queryset = queryset.order_by("-detected_at", "-id")
+    position = decode_cursor(cursor)
+    if position is not None:
+        detected_at, log_id = position
+        queryset = queryset.filter(
+            Q(detected_at__lt=detected_at) | Q(detected_at=detected_at, id__lt=log_id)
+        )
+
+    items = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        next_cursor = encode_cursor(items[-1])
+    return KeysetPage(items, next_cursor, is_first=position is None)
@@ -0,0 +1,90 @@
+# alerts/rollups.py
+"""
+Hourly / daily intruder roll-ups (alerts.models.IntruderRollup).
+
+A bucket is always recomputed whole from IntruderLog (delete + insert), so
+rolling up the same range twice is harmless. Buckets whose raw rows were
+already pruned are left alone.
+
+History (daily_intruder_counts, on the admin dashboard) is read from the
+roll-ups only, so it covers pruned days too and never scans the raw log;
+the current day is as fresh as the last `rollup_intruder_logs` run.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from .models import IntruderLog, IntruderRollup
+
+PERIODS = {
+    "hour": (TruncHour, timedelta(hours=1)),
+    "day": (TruncDay, timedelta(days=1)),
+}
+
+
+def period_floor(moment, period):
+    """Start of the `period` bucket containing `moment` (in local time, like Trunc*)."""
+    moment = timezone.localtime(moment)
+    if period == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def rollup_intruder_logs(start, end, period):
+    """
+    Recompute the `period` roll-ups of every bucket in [start, end) from
+    the raw logs. Returns the number of roll-up rows written.
+    """
+    trunc, step = PERIODS[period]
+    start = period_floor(start, period)
+    if period_floor(end, period) != end:
+        end = period_floor(end, period) + step
+
+    groups = (
+        IntruderLog.objects.filter(detected_at__gte=start, detected_at__lt=end)
+        .annotate(bucket=trunc("detected_at"))
+        .values("bucket", "company_id", "network_id", "ip_address", "mac_address")
+        .annotate(count=Count("id"), first_seen=Min("detected_at"), last_seen=Max("detected_at"))
+        .order_by()
+    )
+    rollups = [
+        IntruderRollup(
+            period=period,
+            period_start=group["bucket"],
+            company_id=group["company_id"],
+            network_id=group["network_id"],
+            ip_address=group["ip_address"],
+            mac_address=group["mac_address"],
+            count=group["count"],
+            first_seen=group["first_seen"],
+            last_seen=group["last_seen"],
+        )
+        for group in groups
+    ]
+    buckets = {rollup.period_start for rollup in rollups}
+
+    with transaction.atomic():
+        # Only replace buckets that still have raw rows to rebuild them from
+        IntruderRollup.objects.filter(period=period, period_start__in=buckets).delete()
+        IntruderRollup.objects.bulk_create(rollups, batch_size=1000)
+    return len(rollups)
+
+
+def daily_intruder_counts(company_id, days):
+    """Intruder attempts of a company per day, for the last `days` days (oldest first)."""
+    today = period_floor(timezone.now(), "day")
+    start = today - timedelta(days=days - 1)
+    totals = dict(
+        IntruderRollup.objects.filter(company_id=company_id, period="day", period_start__gte=start)
+        .values("period_start")
+        .annotate(total=Sum("count"))
+        .values_list("period_start", "total")
+        .order_by()
+    )
+    return [
+        {"day": day.date(), "count": totals.get(day, 0)}
+        for day in (start + timedelta(days=n) for n in range(days))
+    ]
@@ -1,3 +1,112 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import User
+from companies.dashboard import get_admin_dashboard
+from companies.models import Company
+from devices.models import Device
+from networks.models import Network
+from .models import IntruderLog, IntruderRollup
+from .rollups import daily_intruder_counts, period_floor
+
+
+class IntruderLogCompanyTests(TestCase):
+    """IntruderLog.company is filled in from the network, else the device, else the user."""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Acme", domain="acme.test")
+        self.user = User.objects.create(email="bob@acme.test", company=self.company, role=User.Roles.EMPLOYEE)
+
+    def test_from_the_network(self):
+        network = Network.objects.create(company=self.company, name="Office", subnets="10.1.0.0/24")
+
+        self.assertEqual(IntruderLog.objects.create(network=network).company, self.company)
+
+    def test_from_the_device(self):
+        device = Device.objects.create(user=self.user, mac_address="aa:bb:cc:dd:ee:01")
+
+        self.assertEqual(IntruderLog.objects.create(device=device).company, self.company)
+
+    def test_from_the_user(self):
+        self.assertEqual(IntruderLog.objects.create(user=self.user).company, self.company)
+
+    def test_given_company_is_kept(self):
+        other = Company.objects.create(name="Globex", domain="globex.test")
+
+        self.assertEqual(IntruderLog.objects.create(user=self.user, company=other).company, other)
+
+class RollupAndPruneTests(TestCase):
+    """prune_intruder_logs rolls the expired range up, then deletes it."""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Acme", domain="acme.test")
+        self.network = Network.objects.create(company=self.company, name="Office", subnets="10.1.0.0/24")
+
+    def log(self, age, mac="aa:bb:cc:dd:ee:01"):
+        log = IntruderLog.objects.create(
+            network=self.network, ip_address="10.1.0.9", mac_address=mac
+        )
+        # auto_now_add: backdate after the insert
+        IntruderLog.objects.filter(pk=log.pk).update(detected_at=timezone.now() - age)
+        return log
+
+    def prune(self, **options):
+        call_command("prune_intruder_logs", stdout=io.StringIO(), **options)
+
+    def test_expired_rows_are_rolled_up_then_deleted(self):
+        old_day = period_floor(timezone.now() - timedelta(days=40), "day")
+        for _ in range(3):
+            self.log(timezone.now() - old_day - timedelta(hours=2))
+        self.log(timezone.now() - old_day - timedelta(hours=2), mac="aa:bb:cc:dd:ee:02")
+        recent = self.log(timedelta(days=1))
+
+        self.prune(days=30)
+
+        self.assertEqual(list(IntruderLog.objects.values_list("id", flat=True)), [recent.id])
+        daily = IntruderRollup.objects.filter(period="day", period_start=old_day)
+        self.assertEqual(
+            sorted(daily.values_list("mac_address", "count")),
+            [("aa:bb:cc:dd:ee:01", 3), ("aa:bb:cc:dd:ee:02", 1)],
+        )
+        self.assertEqual(
+            sum(IntruderRollup.objects.filter(period="hour").values_list("count", flat=True)), 4
+        )
+
+    def test_pruning_twice_keeps_the_roll_ups(self):
+        self.log(timedelta(days=40))
+
+        self.prune(days=30)
+        self.prune(days=30)
+
+        self.assertFalse(IntruderLog.objects.exists())
+        self.assertEqual(IntruderRollup.objects.get(period="day").count, 1)
+
+    def test_prune_sends_no_per_row_signals(self):
+        for _ in range(5):
+            self.log(timedelta(days=40))
+
+        with mock.patch("networks.signals.queue_delta") as queue_delta, \
+                mock.patch("alerts.management.commands.prune_intruder_logs.invalidate_admin_dashboard") as invalidate:
+            self.prune(days=30)
+
+        queue_delta.assert_not_called()
+        invalidate.assert_called_once_with(self.company.id)
+
+    def test_dashboard_history_reads_the_daily_roll_ups(self):
+        self.log(timedelta(days=2))
+        self.log(timedelta(days=2))
+        call_command("rollup_intruder_logs", hours=24 * 3, stdout=io.StringIO())
+        IntruderLog.objects.all().delete()  # history must not need the raw rows
+
+        history = daily_intruder_counts(self.company.id, 7)
 
-# Create your tests here.
+        self.assertEqual(len(history), 7)
+        self.assertEqual(history[-1]["day"], timezone.localdate())
+        self.assertEqual(sum(day["count"] for day in history), 2)
+        self.assertEqual(history[-3]["count"], 2)
+        self.assertEqual(get_admin_dashboard(self.company.id)["intruder_history"], history)
@@ -1,19 +1,23 @@
 from django.shortcuts import render
 from .models import IntruderLog
+from .pagination import paginate_logs
 
 def alert_list(request):
-    alerts = IntruderLog.objects.filter(device__company=request.user.company).order_by("-detected_at")
-    return render(request, "alerts/alert_list.html", {"alerts": alerts})
+    alerts = IntruderLog.objects.filter(company=request.user.company).select_related("network")
+    page = paginate_logs(alerts, request.GET.get("after"))
+    return render(request, "alerts/alert_list.html", {"alerts": page, "page": page})
 
 
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 from notifications.models import Notification  
+from notifications.counters import reset_unread_count
 
 @login_required
 @require_POST
 def mark_alerts_read(request):
     """Mark all current user's alerts as read."""
     Notification.objects.filter(user=request.user, read=False).update(read=True)
+    reset_unread_count(request.user.id)
     return JsonResponse({"status": "ok"})
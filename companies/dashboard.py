@@ -0,0 +1,122 @@
+# companies/dashboard.py
+"""
+Admin dashboard figures, aggregated per company.
+
+All KPI and onboarding figures come from one query (correlated count /
+EXISTS subqueries on the company row, with its license joined in), plus
+one for the recent devices list and one for the intruder history, read
+from the daily roll-ups (alerts/rollups.py). The result is cached per company for
+DASHBOARD_TIMEOUT and dropped by the signals in companies/signals.py
+whenever something it counts changes.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, Exists, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from alerts.models import IntruderLog
+from alerts.rollups import daily_intruder_counts
+from devices.models import Device
+from networks.models import Network
+from .models import Company, SecuritySetting
+
+DASHBOARD_TIMEOUT = 60
+
+# The dashboard shows at most this many recent devices / alerts
+RECENT_DEVICES = 5
+RECENT_ALERTS = 4
+# Days of intruder history shown
+HISTORY_DAYS = 7
+
+
+def _dashboard_key(company_id) -> str:
+    return f"companies:dashboard:{company_id}"
+
+
+def _count(queryset):
+    """Correlated COUNT(*) of `queryset` as an annotation."""
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .annotate(group=Value(1))
+            .values("group")
+            .annotate(total=Count("pk"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def _load_dashboard(company_id):
+    User = get_user_model()
+    company_users = User.objects.filter(company=OuterRef("pk"))
+    onboarded_users = company_users.filter(
+        (Q(first_name__isnull=False) & ~Q(first_name=""))
+        | Exists(Device.objects.filter(user=OuterRef("pk")))
+    )
+
+    company = (
+        Company.objects.select_related("license")
+        .annotate(
+            users_count=_count(company_users),
+            users_onboarded=_count(onboarded_users),
+            devices_count=_count(Device.objects.filter(company=OuterRef("pk"))),
+            alerts_count=_count(
+                IntruderLog.objects.filter(company=OuterRef("pk"), status="Detected")
+            ),
+            has_security_settings=Exists(SecuritySetting.objects.filter(company=OuterRef("pk"))),
+            has_network=Exists(Network.objects.filter(company=OuterRef("pk"))),
+        )
+        .get(pk=company_id)
+    )
+
+    recent_devices = list(
+        Device.objects.filter(company_id=company_id)
+        .only("name", "ip_address")
+        .order_by("-registered_at")[:RECENT_DEVICES]
+    )
+
+    try:
+        license = company.license
+    except Company.license.RelatedObjectDoesNotExist:
+        license = None
+
+    onboarding = {
+        "company_profile": bool(company.name and company.domain),
+        # The admin viewing the dashboard is one of the company's users
+        "invite_team": company.users_count > 1,
+        "add_device": company.devices_count > 0,
+        "review_security": company.has_security_settings,
+        "create_network": company.has_network,
+        "users_onboarded": company.users_onboarded,
+    }
+    total_steps = len(onboarding)
+    completed_steps = sum(1 for v in onboarding.values() if v)
+    onboarding["percent_complete"] = int((completed_steps / total_steps) * 100) if total_steps else 100
+    onboarding["complete"] = completed_steps == total_steps
+
+    return {
+        "license": license,
+        "devices_count": company.devices_count,
+        "recent_devices": recent_devices,
+        "alerts_count": min(company.alerts_count, RECENT_ALERTS),
+        "intruder_history": daily_intruder_counts(company_id, HISTORY_DAYS),
+        "onboarding": onboarding,
+    }
+
+
+def get_admin_dashboard(company_id):
+    """Cached dashboard figures of a company (see module docstring)."""
+    key = _dashboard_key(company_id)
+    dashboard = cache.get(key)
+    if dashboard is None:
+        dashboard = _load_dashboard(company_id)
+        cache.set(key, dashboard, DASHBOARD_TIMEOUT)
+    return dashboard
+
+
+def invalidate_admin_dashboard(*company_ids):
+    cache.delete_many([
+        _dashboard_key(company_id) for company_id in company_ids if company_id
+    ])
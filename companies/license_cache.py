@@ -0,0 +1,66 @@
+# companies/license_cache.py
+"""
+Cached per-company license snapshot for request-time enforcement.
+
+The snapshot holds what CompanyLicenseMiddleware checks on every request
+(license present, expiry, seats, active users), so a cache hit costs no
+queries. It is dropped by the License/User signals (companies/signals.py)
+and expires after SNAPSHOT_TIMEOUT in any case.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import License
+
+SNAPSHOT_TIMEOUT = 60 * 5
+
+
+def _snapshot_key(company_id) -> str:
+    return f"companies:license:{company_id}"
+
+
+def _build_snapshot(company_id):
+    license = (
+        License.objects.filter(company_id=company_id)
+        .values("seats", "expiry_date")
+        .first()
+    )
+    if license is None:
+        return {"has_license": False}
+
+    return {
+        "has_license": True,
+        # Stored as a timestamp; activity is checked against the clock on read
+        "expires_at": license["expiry_date"].timestamp(),
+        "seats": license["seats"],
+        "active_users": get_user_model().objects.filter(
+            company_id=company_id, is_active=True
+        ).count(),
+    }
+
+
+def get_license_snapshot(company_id):
+    key = _snapshot_key(company_id)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = _build_snapshot(company_id)
+        cache.set(key, snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def invalidate_license_snapshot(*company_ids):
+    cache.delete_many([
+        _snapshot_key(company_id) for company_id in company_ids if company_id
+    ])
+
+
+def license_error(snapshot):
+    """Message explaining why a company may not use the app, or None."""
+    if not snapshot["has_license"]:
+        return "Your company does not have an active license."
+    if snapshot["expires_at"] < timezone.now().timestamp():
+        return "Your company license has expired."
+    if snapshot["active_users"] > snapshot["seats"]:
+        return "Your company has exceeded its user limit."
+    return None
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0002_securitysetting'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['company', 'scope', '-created_at'], name='announce_company_scope_idx'),
+        ),
+    ]
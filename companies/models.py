@@ -1,9 +1,11 @@
 #comapnies/models.py
+import hashlib
 import secrets
 import string
+import threading
+from collections import OrderedDict
 from django.db import models
 from django.utils import timezone
-from cryptography.fernet import Fernet
 from django.conf import settings
 
 class Company(models.Model):
@@ -16,7 +18,56 @@ class Company(models.Model):
 
 from django.conf import settings
 
-fernet = Fernet(settings.FERNET_KEY)
+_fernet = None
+
+
+def get_fernet():
+    """Fernet for license keys, built on first use rather than at import."""
+    global _fernet
+    if _fernet is None:
+        from cryptography.fernet import Fernet
+        _fernet = Fernet(settings.FERNET_KEY)
+    return _fernet
+
+
+class _DecryptedKeyCache:
+    """
+    Bounded LRU of decrypted license keys, keyed by license id and a hash
+    of the ciphertext so a changed key is never served from the cache.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _entry_key(license_id, ciphertext):
+        return license_id, hashlib.sha256(bytes(ciphertext)).digest()
+
+    def get(self, license_id, ciphertext):
+        key = self._entry_key(license_id, ciphertext)
+        with self._lock:
+            raw_key = self._entries.get(key)
+            if raw_key is not None:
+                self._entries.move_to_end(key)
+            return raw_key
+
+    def put(self, license_id, ciphertext, raw_key):
+        key = self._entry_key(license_id, ciphertext)
+        with self._lock:
+            self._entries[key] = raw_key
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, license_id):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == license_id]:
+                del self._entries[key]
+
+
+decrypted_keys = _DecryptedKeyCache()
 
 class License(models.Model):
     PLAN_CHOICES = [
@@ -33,10 +84,20 @@ class License(models.Model):
     created_at = models.DateTimeField(auto_now_add=True) 
 
     def set_key(self, raw_key: str):
-        self.key_encrypted = fernet.encrypt(raw_key.encode("utf-8"))
+        self.key_encrypted = get_fernet().encrypt(raw_key.encode("utf-8"))
+        if self.pk is not None:
+            decrypted_keys.discard(self.pk)
+            decrypted_keys.put(self.pk, self.key_encrypted, raw_key)
 
     def get_key(self):
-        return fernet.decrypt(self.key_encrypted).decode("utf-8")   
+        if self.pk is None:
+            return get_fernet().decrypt(bytes(self.key_encrypted)).decode("utf-8")
+
+        raw_key = decrypted_keys.get(self.pk, self.key_encrypted)
+        if raw_key is None:
+            raw_key = get_fernet().decrypt(bytes(self.key_encrypted)).decode("utf-8")
+            decrypted_keys.put(self.pk, self.key_encrypted, raw_key)
+        return raw_key
 
     def is_active(self):
         return self.expiry_date >= timezone.now()
@@ -75,6 +136,11 @@ class Announcement(models.Model):
     scope = models.CharField(max_length=20, choices=SCOPE_CHOICES, default="team")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["company", "scope", "-created_at"], name="announce_company_scope_idx"),
+        ]
+
     def __str__(self):
         return f"[{self.get_scope_display()}] {self.message[:30]}"
 
@@ -0,0 +1,61 @@
+# companies/signals.py
+from django.conf import settings
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from devices.models import Device
+from devices.registry import invalidate_mac_registry
+from .models import Company, License, SecuritySetting
+from .license_cache import invalidate_license_snapshot
+from .dashboard import invalidate_admin_dashboard
+
+
+@receiver([post_save, post_delete], sender=License)
+def license_changed(sender, instance, **kwargs):
+    invalidate_license_snapshot(instance.company_id)
+    invalidate_admin_dashboard(instance.company_id)
+
+
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+def remember_user_company(sender, instance, **kwargs):
+    # __dict__ so a deferred field is not loaded just for this
+    instance._original_company_id = instance.__dict__.get("company_id")
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    # Logging in only touches last_login; seat usage is unchanged
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    invalidate_license_snapshot(instance.company_id, instance._original_company_id)
+    invalidate_admin_dashboard(instance.company_id, instance._original_company_id)
+    if instance.company_id != instance._original_company_id:
+        # Device.company is denormalized from its owner
+        Device.objects.filter(user=instance).update(company_id=instance.company_id)
+        invalidate_mac_registry(instance.company_id, instance._original_company_id)
+    instance._original_company_id = instance.company_id
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_license_snapshot(instance.company_id)
+    invalidate_admin_dashboard(instance.company_id)
+
+
+# Admin dashboard figures (companies/dashboard.py)
+
+@receiver([post_save, post_delete], sender=Company)
+def company_changed(sender, instance, **kwargs):
+    invalidate_admin_dashboard(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=SecuritySetting)
+@receiver([post_save, post_delete], sender="networks.Network")
+def company_object_changed(sender, instance, **kwargs):
+    invalidate_admin_dashboard(instance.company_id)
+
+
+@receiver([post_save, post_delete], sender=Device)
+@receiver([post_save, post_delete], sender="alerts.IntruderLog")
+def tenant_object_changed(sender, instance, **kwargs):
+    invalidate_admin_dashboard(instance.company_id)
@@ -1,3 +1,105 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from accounts.middleware.company_license import CompanyLicenseMiddleware
+from accounts.models import User
+from . import models
+from .license_cache import get_license_snapshot
+from .models import Company, License, _DecryptedKeyCache, get_fernet
+
+
+def create_license(company, seats=10, expiry_date=None):
+    # bulk_create: License.save() expects a `key` field the model does not have
+    license, = License.objects.bulk_create([License(
+        company=company,
+        key_encrypted=get_fernet().encrypt(b"COMP-AAAA-BBBB-CCCC"),
+        seats=seats,
+        expiry_date=expiry_date or timezone.now() + timedelta(days=30),
+    )])
+    return license
+
+
+@override_settings(COMPANY_LICENSE_ENFORCED=True)
+class CompanyLicenseMiddlewareTests(TestCase):
+    """License enforcement from the cached per-company snapshot."""
+
+    def setUp(self):
+        cache.clear()
+        self.company = Company.objects.create(name="Acme", domain="acme.test")
+        self.user = User.objects.create(email="bob@acme.test", company=self.company, role=User.Roles.EMPLOYEE)
+        self.middleware = CompanyLicenseMiddleware(lambda request: HttpResponse("ok"))
+
+    def get(self):
+        request = RequestFactory().get("/dashboard/")
+        request.user = self.user
+        request._messages = CookieStorage(request)
+        return self.middleware(request)
+
+    def test_warm_snapshot_adds_no_queries(self):
+        create_license(self.company)
+        self.get()
+
+        with self.assertNumQueries(0):
+            response = self.get()
+        self.assertEqual(response.content, b"ok")
+
+    def test_company_without_a_license_is_sent_home(self):
+        self.assertEqual(self.get().status_code, 302)
+
+    def test_expired_license_is_sent_home(self):
+        create_license(self.company, expiry_date=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(self.get().status_code, 302)
+
+    def test_new_user_past_the_seat_limit_is_seen_at_once(self):
+        create_license(self.company, seats=1)
+        self.assertEqual(self.get().status_code, 200)
+        self.assertEqual(get_license_snapshot(self.company.id)["active_users"], 1)
+
+        User.objects.create(email="carol@acme.test", company=self.company, role=User.Roles.EMPLOYEE)
+
+        self.assertEqual(self.get().status_code, 302)
+
+
+class LicenseKeyCacheTests(TestCase):
+    """Decrypted license keys are reused until the ciphertext changes."""
+
+    def setUp(self):
+        self.license = create_license(Company.objects.create(name="Acme", domain="acme.test"))
+        models.decrypted_keys.discard(self.license.pk)
+
+    def decrypting(self):
+        return mock.patch.object(models, "get_fernet", wraps=get_fernet)
+
+    def test_key_is_decrypted_once(self):
+        with self.decrypting() as fernet:
+            self.assertEqual(self.license.get_key(), "COMP-AAAA-BBBB-CCCC")
+            self.assertEqual(License.objects.get().get_key(), "COMP-AAAA-BBBB-CCCC")
+        self.assertEqual(fernet.call_count, 1)
+
+    def test_changed_ciphertext_is_not_served_from_the_cache(self):
+        self.license.get_key()
+        License.objects.update(key_encrypted=get_fernet().encrypt(b"COMP-DDDD-EEEE-FFFF"))
+
+        self.assertEqual(License.objects.get().get_key(), "COMP-DDDD-EEEE-FFFF")
+
+    def test_set_key_primes_the_cache(self):
+        self.license.set_key("COMP-DDDD-EEEE-FFFF")
+
+        with self.decrypting() as fernet:
+            self.assertEqual(self.license.get_key(), "COMP-DDDD-EEEE-FFFF")
+        fernet.assert_not_called()
+
+    def test_cache_is_bounded(self):
+        keys = _DecryptedKeyCache(maxsize=2)
+        for license_id in (1, 2, 3):
+            keys.put(license_id, b"ciphertext", f"key {license_id}")
+
+        self.assertIsNone(keys.get(1, b"ciphertext"))
+        self.assertEqual(keys.get(3, b"ciphertext"), "key 3")
@@ -4,6 +4,7 @@ from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 from channels.security.websocket import AllowedHostsOriginValidator
+import devices.routing
 import networks.routing
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'company_network.settings')
@@ -18,6 +19,7 @@ application = ProtocolTypeRouter({
         AuthMiddlewareStack(
             URLRouter(
                 networks.routing.websocket_urlpatterns
+                + devices.routing.websocket_urlpatterns
             )
         )
     ),
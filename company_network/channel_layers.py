@@ -0,0 +1,153 @@
+# company_network/channel_layers.py
+"""
+Channel layers for running more than one ASGI worker.
+
+Groups are sharded by the id in their name, so `company_{id}`,
+`network_{id}`, `network_{id}_monitors` and `user_{id}` always land on
+the same shard no matter how many shards there are. Everything that
+happens to a network stays on one Redis host.
+
+- ShardedRedisChannelLayer: channels_redis with that group placement,
+  one shard per URL in CHANNEL_REDIS_URLS.
+- LocalShardedChannelLayer: in-process stand-in with the same routing
+  (group membership on the group's shard, messages on the channel's
+  shard) for tests and single-process development. Its shards are
+  InMemoryChannelLayers used through the public send / receive API only;
+  it keeps group membership itself.
+"""
+import re
+import time
+import zlib
+
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer, InMemoryChannelLayer
+
+try:
+    from channels_redis.core import RedisChannelLayer
+except ImportError:  # only needed when CHANNEL_REDIS_URLS is set
+    RedisChannelLayer = None
+
+
+# company_{id}, network_{id}, network_{id}_monitors, user_{id}
+SHARDED_GROUP_RE = re.compile(r"^(?:company|network|user)_(?P<id>\d+)(?:_|$)")
+
+
+def group_shard(name, ring_size):
+    """Shard of an id-keyed group, or None for any other name."""
+    match = SHARDED_GROUP_RE.match(name)
+    if match is None:
+        return None
+    return int(match.group("id")) % ring_size
+
+
+if RedisChannelLayer is not None:
+
+    class ShardedRedisChannelLayer(RedisChannelLayer):
+        """RedisChannelLayer that places id-keyed groups by id instead of by name hash."""
+
+        def consistent_hash(self, value):
+            shard = group_shard(value, self.ring_size)
+            if shard is None:
+                return super().consistent_hash(value)
+            return shard
+
+
+class LocalShardedChannelLayer(BaseChannelLayer):
+    """
+    In-process channel layer split into `shards` InMemoryChannelLayers,
+    routed the same way ShardedRedisChannelLayer routes across hosts.
+    """
+
+    extensions = ["groups", "flush"]
+
+    def __init__(self, shards=1, expiry=60, group_expiry=86400, capacity=100,
+                 channel_capacity=None, **kwargs):
+        super().__init__(
+            expiry=expiry,
+            capacity=capacity,
+            channel_capacity=channel_capacity,
+            **kwargs,
+        )
+        self.ring_size = shards
+        self.group_expiry = group_expiry
+        # Per shard: group -> {channel: time added}
+        self.groups = [{} for _ in range(shards)]
+        self.shards = [
+            InMemoryChannelLayer(
+                expiry=expiry,
+                group_expiry=group_expiry,
+                capacity=capacity,
+                channel_capacity=channel_capacity,
+                **kwargs,
+            )
+            for _ in range(shards)
+        ]
+
+    def consistent_hash(self, value):
+        shard = group_shard(value, self.ring_size)
+        if shard is None:
+            shard = zlib.crc32(value.encode("utf-8")) % self.ring_size
+        return shard
+
+    def shard_for(self, name):
+        return self.shards[self.consistent_hash(name)]
+
+    def _members(self, group):
+        """Live members of `group` on its shard, dropping expired ones."""
+        groups = self.groups[self.consistent_hash(group)]
+        members = groups.get(group, {})
+        cutoff = time.time() - self.group_expiry
+        for channel, added in list(members.items()):
+            if added < cutoff:
+                del members[channel]
+        if not members:
+            groups.pop(group, None)
+        return members
+
+    # Channel layer API
+
+    async def send(self, channel, message):
+        await self.shard_for(channel).send(channel, message)
+
+    async def receive(self, channel):
+        return await self.shard_for(channel).receive(channel)
+
+    async def new_channel(self, prefix="specific."):
+        return await self.shards[0].new_channel(prefix)
+
+    async def flush(self):
+        for shard in self.shards:
+            await shard.flush()
+        for groups in self.groups:
+            groups.clear()
+
+    async def close(self):
+        pass
+
+    # Groups extension
+
+    async def group_add(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        groups = self.groups[self.consistent_hash(group)]
+        groups.setdefault(group, {})[channel] = time.time()
+
+    async def group_discard(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        groups = self.groups[self.consistent_hash(group)]
+        members = groups.get(group, {})
+        members.pop(channel, None)
+        if not members:
+            groups.pop(group, None)
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "Message is not a dict"
+        self.require_valid_group_name(group)
+
+        # Membership lives on the group's shard, inboxes on each channel's
+        for channel in list(self._members(group)):
+            try:
+                await self.send(channel, message)
+            except ChannelFull:
+                pass
@@ -1,6 +1,6 @@
 from pathlib import Path
 import os
-from decouple import config
+from decouple import config, Csv
 from datetime import timedelta
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -34,6 +34,14 @@ DEFAULT_FROM_EMAIL = config(
     "DEFAULT_FROM_EMAIL",
     default=f"SecureLink 360 <{EMAIL_HOST_USER}>"
 )
+# Mail is queued in the outbox and sent by `manage.py send_outbox`, in
+# batches over one connection: at most EMAIL_OUTBOX_RATE_LIMIT mails per
+# second (0: no limit), retried EMAIL_OUTBOX_MAX_ATTEMPTS times with the
+# delay doubling from EMAIL_OUTBOX_RETRY_DELAY seconds
+EMAIL_OUTBOX_BATCH_SIZE = config("EMAIL_OUTBOX_BATCH_SIZE", cast=int, default=100)
+EMAIL_OUTBOX_RATE_LIMIT = config("EMAIL_OUTBOX_RATE_LIMIT", cast=float, default=10)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config("EMAIL_OUTBOX_MAX_ATTEMPTS", cast=int, default=5)
+EMAIL_OUTBOX_RETRY_DELAY = config("EMAIL_OUTBOX_RETRY_DELAY", cast=int, default=60)
 
 # ==========================
 # 🍪 Session Settings
@@ -101,13 +109,56 @@ MIDDLEWARE = [
 
 
     "accounts.middleware.session_expired_middleware.SessionExpiredMiddleware",
+    "networks.broadcast.BroadcastBatchMiddleware",
+    "accounts.middleware.company_license.CompanyLicenseMiddleware",
 ]
 
+# License & seat enforcement (accounts/middleware/company_license.py)
+COMPANY_LICENSE_ENFORCED = config("COMPANY_LICENSE_ENFORCED", cast=bool, default=not DEBUG)
+# Reachable without a valid license (the home page always is)
+COMPANY_LICENSE_EXEMPT_PATHS = [
+    "/auth/",
+    "/admin/dashboard/license/",
+    "/static/",
+    "/media/",
+    "/about/",
+    "/pricing/",
+    "/contact/",
+    "/privacy-policy/",
+]
 
-# MIDDLEWARE += [
-#     "accounts.middleware.company_license.CompanyLicenseMiddleware",
-#     "accounts.middleware.company_scope.CompanyAccessMiddleware",
-# ]
+# Raw IntruderLog rows older than this are rolled up and pruned
+# (manage.py prune_intruder_logs); IntruderRollup keeps the counts
+INTRUDER_LOG_RETENTION_DAYS = config("INTRUDER_LOG_RETENTION_DAYS", cast=int, default=30)
+
+# Network scanner (devices/scanner.py, manage.py scan_network): subnets to
+# ping-scan and how many of them are scanned at once
+SCAN_SUBNETS = config("SCAN_SUBNETS", cast=Csv(), default="192.168.1.0/24")
+SCAN_WORKERS = config("SCAN_WORKERS", cast=int, default=8)
+# "nmap", "scapy" (raw sockets, no nmap binary) or "fake" (replays the
+# JSON recording at SCAN_FAKE_RECORDING); see devices/scan_backends.py
+SCAN_BACKEND = config("SCAN_BACKEND", default="nmap")
+SCAN_FAKE_RECORDING = config("SCAN_FAKE_RECORDING", default="")
+# manage.py run_scanner: networks scanned at once, and how often (seconds)
+# it re-reads the networks' scan settings
+SCANNER_CONCURRENCY = config("SCANNER_CONCURRENCY", cast=int, default=4)
+SCANNER_REFRESH_INTERVAL = config("SCANNER_REFRESH_INTERVAL", cast=int, default=60)
+# Intruder mail for scans not tied to a network (a network's go to its company admins)
+SCAN_ALERT_RECIPIENTS = config("SCAN_ALERT_RECIPIENTS", cast=Csv(), default="")
+
+# Device heartbeats (devices/heartbeats.py): seconds between write-behind
+# flushes of buffered heartbeats, and how long a device may go without one
+# before manage.py sweep_devices marks it offline. The timeout must exceed
+# the agents' 30s interval plus the flush interval (plus 5s), since beats
+# still buffered in a web worker are invisible to the sweeper
+DEVICE_HEARTBEAT_FLUSH_INTERVAL = config("DEVICE_HEARTBEAT_FLUSH_INTERVAL", cast=int, default=10)
+DEVICE_HEARTBEAT_TIMEOUT = config("DEVICE_HEARTBEAT_TIMEOUT", cast=int, default=90)
+
+# Live view presence (networks/presence.py): seconds a monitor socket stays
+# listed without refreshing its entry; sessions left open past it are closed
+# by manage.py close_stale_sessions. Presence is kept in the cache, so it
+# needs CACHE_REDIS_URL (shared by every process) to work across workers
+NETWORK_PRESENCE_TTL = config("NETWORK_PRESENCE_TTL", cast=int, default=60)
 
 
 from django.contrib.messages import constants as messages
@@ -122,11 +173,45 @@ MESSAGE_TAGS = {
 
 
 
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer",
-    },
-}
+# ==========================
+# 📡 Channel Layers & Cache
+# ==========================
+# One Redis URL per shard, e.g. "redis://10.0.0.1:6379/0,redis://10.0.0.2:6379/0".
+# company_{id} / network_{id}* / user_{id} groups are sharded by id
+# (see company_network/channel_layers.py). Leave empty for one process.
+CHANNEL_REDIS_URLS = config("CHANNEL_REDIS_URLS", cast=Csv(), default="")
+# Shards of the in-process stand-in layer used when no Redis is configured
+CHANNEL_LAYER_LOCAL_SHARDS = config("CHANNEL_LAYER_LOCAL_SHARDS", cast=int, default=1)
+
+if CHANNEL_REDIS_URLS:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "company_network.channel_layers.ShardedRedisChannelLayer",
+            "CONFIG": {
+                "hosts": CHANNEL_REDIS_URLS,
+                "prefix": "securelink",
+                "capacity": 1000,
+            },
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "company_network.channel_layers.LocalShardedChannelLayer",
+            "CONFIG": {"shards": CHANNEL_LAYER_LOCAL_SHARDS},
+        },
+    }
+
+# Live network state and version counters (networks/live.py) must be shared
+# by every worker, so multi-process deployments need a shared cache too.
+CACHE_REDIS_URL = config("CACHE_REDIS_URL", default="")
+if CACHE_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+        },
+    }
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -223,6 +308,10 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Absolute base URL for links in mail sent outside a request
+# (e.g. manage.py bulk_invite)
+SITE_URL = config("SITE_URL", default="http://localhost:8000")
+
 # Authentication settings
 LOGIN_URL = '/auth/login/'  # login URL
 LOGIN_REDIRECT_URL = '/'    # Where to redirect after successful login
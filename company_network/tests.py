@@ -0,0 +1,93 @@
+from unittest import skipIf
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from .channel_layers import LocalShardedChannelLayer, RedisChannelLayer
+
+GROUPS = ("company_{}", "network_{}", "network_{}_monitors", "user_{}")
+
+
+class LocalShardedChannelLayerTests(SimpleTestCase):
+    """Group placement and delivery of the in-process sharded layer."""
+
+    def setUp(self):
+        self.layer = LocalShardedChannelLayer(shards=4)
+
+    def test_id_keyed_groups_land_on_the_shard_of_their_id(self):
+        for pattern in GROUPS:
+            for object_id in (1, 6, 43):
+                self.assertEqual(
+                    self.layer.consistent_hash(pattern.format(object_id)), object_id % 4
+                )
+
+    def test_placement_is_stable_across_layers(self):
+        other = LocalShardedChannelLayer(shards=4)
+        for name in ("company_7", "network_7_monitors", "user_7", "presence.refresh"):
+            self.assertEqual(self.layer.consistent_hash(name), other.consistent_hash(name))
+
+    def test_everything_about_a_network_shares_a_shard(self):
+        shards = {self.layer.consistent_hash(pattern.format(42)) for pattern in GROUPS}
+        self.assertEqual(shards, {42 % 4})
+
+    def new_channels_on_distinct_shards(self, count):
+        channels = {}
+        while len(channels) < count:
+            channel = async_to_sync(self.layer.new_channel)()
+            channels.setdefault(self.layer.consistent_hash(channel), channel)
+        return list(channels.values())
+
+    def test_group_send_reaches_members_on_every_shard(self):
+        channels = self.new_channels_on_distinct_shards(4)
+        for channel in channels:
+            async_to_sync(self.layer.group_add)("network_5_monitors", channel)
+
+        async_to_sync(self.layer.group_send)("network_5_monitors", {"type": "network.message", "n": 1})
+
+        for channel in channels:
+            self.assertEqual(async_to_sync(self.layer.receive)(channel)["n"], 1)
+
+    def test_discarded_channel_gets_nothing(self):
+        kept, dropped = self.new_channels_on_distinct_shards(2)
+        for channel in (kept, dropped):
+            async_to_sync(self.layer.group_add)("company_3", channel)
+        async_to_sync(self.layer.group_discard)("company_3", dropped)
+
+        async_to_sync(self.layer.group_send)("company_3", {"type": "broadcast"})
+        async_to_sync(self.layer.send)(dropped, {"type": "direct"})
+
+        self.assertEqual(async_to_sync(self.layer.receive)(kept)["type"], "broadcast")
+        self.assertEqual(async_to_sync(self.layer.receive)(dropped)["type"], "direct")
+
+    def test_expired_membership_is_dropped(self):
+        layer = LocalShardedChannelLayer(shards=2, group_expiry=-1)
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)("user_9", channel)
+        async_to_sync(layer.group_send)("user_9", {"type": "broadcast"})
+        async_to_sync(layer.send)(channel, {"type": "direct"})
+
+        self.assertEqual(async_to_sync(layer.receive)(channel)["type"], "direct")
+
+
+@skipIf(RedisChannelLayer is None, "channels_redis is not installed")
+class ShardedRedisChannelLayerTests(SimpleTestCase):
+    """Group placement across Redis hosts (no server needed to hash)."""
+
+    def setUp(self):
+        from .channel_layers import ShardedRedisChannelLayer
+
+        self.layer = ShardedRedisChannelLayer(
+            hosts=[f"redis://redis-{n}:6379" for n in range(3)]
+        )
+
+    def test_id_keyed_groups_land_on_the_shard_of_their_id(self):
+        for pattern in GROUPS:
+            for object_id in (1, 6, 43):
+                self.assertEqual(
+                    self.layer.consistent_hash(pattern.format(object_id)), object_id % 3
+                )
+
+    def test_other_names_keep_the_default_placement(self):
+        name = "specific.abc!def"
+        self.assertIn(self.layer.consistent_hash(name), range(3))
+        self.assertEqual(self.layer.consistent_hash(name), self.layer.consistent_hash(name))
@@ -6,6 +6,11 @@ from alerts import views as alerts_views
 from notifications.views import my_notifications
 from django.conf import settings
 from django.conf.urls.static import static
+from rest_framework.routers import DefaultRouter
+from devices.views import DeviceViewSet
+
+router = DefaultRouter()
+router.register(r'devices', DeviceViewSet, basename='device')
 
 urlpatterns = [
     path('auth/', include('accounts.urls')),
@@ -48,6 +53,7 @@ urlpatterns = [
     path("admin/dashboard/alerts/", views.admin_alerts, name="admin_alerts"),
     path("admin/dashboard/users/", account_views.user_management, name="user_management"),
     path("admin/dashboard/invite/", account_views.send_invite, name="send_invite"),
+    path("admin/dashboard/invite/bulk/", account_views.bulk_invite, name="bulk_invite"),
     path("admin/dashboard/users/<int:user_id>/edit/", account_views.edit_user, name="edit_user"),
     path("admin/dashboard/users/<int:user_id>/deactivate/", account_views.deactivate_user, name="deactivate_user"),
     
@@ -81,21 +87,10 @@ urlpatterns = [
 
 
 
+    path('api/', include(router.urls)),
     path('admin/', admin.site.urls),
 ]
 
 # Serve media files only in development
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-
-# # project/urls.py
-# from django.urls import path, include
-# from rest_framework.routers import DefaultRouter
-# from devices.views import DeviceViewSet
-
-# router = DefaultRouter()
-# router.register(r'devices', DeviceViewSet)
-
-# urlpatterns = [
-#     path('api/', include(router.urls)),
-# ]
\ No newline at end of file
@@ -1,17 +1,16 @@
-from django.contrib.auth.models import User
-from companies.models import Announcement
+from django.contrib.auth import get_user_model
+from notifications.utils import create_notifications_bulk
 
+User = get_user_model()
 
-def notify_announcement(announcement):
-    from companies.models import Notification
 
+def notify_announcement(announcement):
     if announcement.scope == "company":
         recipients = User.objects.filter(company=announcement.company)
     else:
         recipients = User.objects.filter(manager=announcement.manager)
 
-    for user in recipients:
-        Notification.objects.create(
-            user=user,
-            message=f"New {announcement.get_scope_display()} announcement: {announcement.message[:50]}"
-        )
+    create_notifications_bulk(
+        recipients,
+        f"New {announcement.get_scope_display()} announcement: {announcement.message[:50]}"
+    )
@@ -40,7 +40,8 @@ from django.utils import timezone
 from accounts.decorators import company_admin_required
 from devices.models import Device
 from alerts.models import IntruderLog
-from companies.models import Announcement, License, SecuritySetting
+from companies.models import Announcement
+from companies.dashboard import get_admin_dashboard
 from networks.models import Network
 
 @login_required
@@ -49,54 +50,22 @@ def admin_dashboard(request):
     user = request.user
     company = user.company
 
-    # License info
-    license = License.objects.filter(company=company).first()
-
-    # Devices queryset + count
-    devices = Device.objects.filter(user__company=company)
-    devices_count = devices.count()
-
-    # Alerts queryset + count (latest 4 alerts only)
-    alerts = IntruderLog.objects.filter(
-        network__company=company,
-        status="Detected"
-    ).order_by("-detected_at")[:4]
-    alerts_count = alerts.count()
+    # License, KPI and onboarding figures (aggregated and cached per company)
+    dashboard = get_admin_dashboard(company.id)
 
     # Recent announcements
     announcements = Announcement.objects.filter(company=company).order_by("-created_at")[:5]
 
-    # Compute users_onboarded
-    users_onboarded_qs = company.users.filter(
-        (Q(first_name__isnull=False) & ~Q(first_name='')) | Q(devices__isnull=False)
-    ).distinct()
-    users_onboarded = users_onboarded_qs.count()
-
-    # Onboarding checklist
-    onboarding = {
-        "company_profile": bool(company.name and getattr(company, "domain", None)),
-        "invite_team": company.users.exclude(id=user.id).exists(),
-        "add_device": devices_count > 0,
-        "review_security": SecuritySetting.objects.filter(company=company).exists(),
-        "create_network": Network.objects.filter(company=company).exists(),
-        "users_onboarded": users_onboarded,
-    }
-
-    total_steps = len(onboarding)
-    completed_steps = sum(1 for v in onboarding.values() if v)
-    onboarding["percent_complete"] = int((completed_steps / total_steps) * 100) if total_steps else 100
-    onboarding["complete"] = completed_steps == total_steps
-
     return render(request, "dashboards/admin_dashboard.html", {
         "user": user,
         "company": company,
-        "license": license,
-        "devices": devices,
-        "devices_count": devices_count,
-        "alerts": alerts,
-        "alerts_count": alerts_count,
+        "license": dashboard["license"],
+        "devices": dashboard["recent_devices"],
+        "devices_count": dashboard["devices_count"],
+        "alerts_count": dashboard["alerts_count"],
+        "intruder_history": dashboard["intruder_history"],
         "announcements": announcements,
-        "onboarding": onboarding,
+        "onboarding": dashboard["onboarding"],
     })
 
 
@@ -120,7 +89,7 @@ def manager_dashboard(request):
     # Intruder logs linked to these employees' devices OR company networks
     team_alerts = IntruderLog.objects.filter(
         Q(device__user__in=team_members) |
-        Q(network__company=company),
+        Q(company=company),
         status="Detected"
     ).order_by("-detected_at")[:5]
 
@@ -234,14 +203,14 @@ def admin_license(request):
 @login_required
 @company_admin_required
 def admin_devices(request):
-    devices = Device.objects.filter(user__company=request.user.company)
+    devices = Device.objects.filter(company=request.user.company)
     return render(request, "companies/admin/devices.html", {"devices": devices})
 
 
 @login_required
 @company_admin_required
 def block_device(request, device_id):
-    device = get_object_or_404(Device, id=device_id, user__company=request.user.company)
+    device = get_object_or_404(Device, id=device_id, company=request.user.company)
     device.is_blocked = True
     device.save()
     messages.success(request, f"Device {device.name or device.mac_address} has been blocked.")
@@ -363,6 +332,8 @@ def announcements_list(request):
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from networks.models import Network, NetworkMembership
+from networks.broadcast import queue_delta
+from companies.dashboard import invalidate_admin_dashboard
 from alerts.models import IntruderLog
 from django.shortcuts import get_object_or_404
 
@@ -389,5 +360,8 @@ def mark_intruders_read(request):
 
     # Update IntruderLog records to "Read" for this network
     IntruderLog.objects.filter(network=network, status="Detected").update(status="Read")
+    # update() skips post_save, so tell the live view and dashboard directly
+    queue_delta(network.id, "intruders_cleared", {})
+    invalidate_admin_dashboard(network.company_id)
 
     return JsonResponse({"success": True, "message": "Intruder alerts marked as read."})
@@ -1,6 +1,6 @@
 # devices/admin.py
 from django.contrib import admin
-from .models import Device
+from .models import Device, DiscoveredHost
 
 
 @admin.register(Device)
@@ -8,11 +8,29 @@ class DeviceAdmin(admin.ModelAdmin):
     """Admin panel for Device model"""
 
     list_display = ("name", "mac_address", "ip_address", "user", "company_display", "registered_at", "last_seen")
-    list_filter = ("registered_at", "last_seen", "user__company")
-    search_fields = ("name", "mac_address", "ip_address", "user__email", "user__company__name")
+    list_filter = ("registered_at", "last_seen", "company")
+    search_fields = ("name", "mac_address", "ip_address", "user__email", "company__name")
     ordering = ("-registered_at",)
+    list_select_related = ("user", "company")
     readonly_fields = ("registered_at",)
 
     def company_display(self, obj):
-        return obj.company()
+        return obj.company
     company_display.short_description = "Company"
+
+
+@admin.register(DiscoveredHost)
+class DiscoveredHostAdmin(admin.ModelAdmin):
+    """Hosts seen by the network scanner (written by the scanner only)"""
+
+    list_display = ("subnet", "network", "ip_address", "mac_address", "registered", "present", "first_seen", "departed_at")
+    list_filter = ("subnet", "registered", "present", "network")
+    list_select_related = ("network",)
+    search_fields = ("ip_address", "mac_address")
+    ordering = ("subnet", "ip_address")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
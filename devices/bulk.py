@@ -0,0 +1,75 @@
+# devices/bulk.py
+"""
+Changing many devices at once.
+
+Bulk changes are one UPDATE (or bulk_update) instead of a save() per
+device. That skips the Device signals, so what they would have published
+is queued here by hand: live-graph deltas for the networks whose view
+actually changes (owners' active memberships, looked up with one query)
+and one summary broadcast to the company instead of one message per
+device.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+
+from networks.broadcast import queue_broadcast, queue_delta
+from networks.live import is_device_visible, serialize_device
+from networks.models import NetworkMembership
+
+
+def publish_live_changes(devices):
+    """
+    Queue live-graph deltas for `devices` (saved, with `user` loaded) whose
+    visibility may have changed: shown if visible, removed otherwise.
+    """
+    owner_ids = {device.user_id for device in devices if device.user_id}
+    if not owner_ids:
+        return
+    networks_by_owner = defaultdict(list)
+    for user_id, network_id in NetworkMembership.objects.filter(
+        user_id__in=owner_ids, active=True
+    ).values_list("user_id", "network_id"):
+        networks_by_owner[user_id].append(network_id)
+
+    for device in devices:
+        for network_id in networks_by_owner.get(device.user_id, ()):
+            if is_device_visible(device):
+                queue_delta(network_id, "device_upserted", serialize_device(device))
+            else:
+                queue_delta(network_id, "device_removed", {"id": device.id})
+
+
+def broadcast_devices_changed(company_id, event, device_ids, **extra):
+    """One company-wide message for a bulk change of `device_ids`."""
+    queue_broadcast(
+        f"company_{company_id}",
+        {"type": "broadcast", "payload": {
+            "type": event,
+            "company_id": company_id,
+            "device_ids": device_ids,
+            **extra,
+        }},
+    )
+
+
+def set_blocked(queryset, blocked, company_id):
+    """Set is_blocked on the devices of `queryset`; returns the ids that changed."""
+    with transaction.atomic():
+        # FOR UPDATE OF the device rows only, not the joined users. SQLite
+        # has no row locks and Django skips the clause there; its writers
+        # are serialized by the database lock instead.
+        devices = list(
+            queryset.exclude(is_blocked=blocked).select_related("user").select_for_update(of=("self",))
+        )
+        if not devices:
+            return []
+        ids = [device.id for device in devices]
+        queryset.model.objects.filter(id__in=ids).update(is_blocked=blocked)
+
+        for device in devices:
+            device.is_blocked = blocked
+        # Only online devices are on a live graph either way
+        publish_live_changes([device for device in devices if device.status == "online"])
+        broadcast_devices_changed(company_id, "devices_blocked" if blocked else "devices_unblocked", ids)
+    return ids
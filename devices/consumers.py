@@ -0,0 +1,49 @@
+# devices/consumers.py
+import json
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+from django.contrib.auth.models import AnonymousUser
+
+from .heartbeats import flush_heartbeats, record_heartbeat
+
+
+class DeviceHeartbeatConsumer(AsyncWebsocketConsumer):
+    """
+    Long-lived agent connection sending `{"type": "heartbeat", "mac_address",
+    "ip_address"}` messages. Heartbeats are only buffered (devices/heartbeats.py),
+    so a message costs no query unless it is the one that triggers a flush.
+    """
+
+    async def connect(self):
+        self.user = self.scope["user"]
+        if isinstance(self.user, AnonymousUser) or self.user.company_id is None:
+            await self.close()
+            return
+        await self.accept()
+
+    async def receive(self, text_data):
+        try:
+            message = json.loads(text_data)
+        except ValueError:
+            await self.send_error("Invalid JSON.")
+            return
+        if not isinstance(message, dict) or message.get("type") != "heartbeat":
+            await self.send_error("Expected a heartbeat message.")
+            return
+
+        try:
+            due = await self.record(message.get("mac_address", ""), message.get("ip_address") or None)
+        except ValueError as exc:
+            await self.send_error(str(exc))
+            return
+        if due:
+            await database_sync_to_async(flush_heartbeats)()
+
+    @database_sync_to_async
+    def record(self, mac_address, ip_address):
+        # The MAC registry may need a query to (re)load the company's MACs
+        return record_heartbeat(self.user.company_id, mac_address, ip_address)
+
+    async def send_error(self, message):
+        await self.send(text_data=json.dumps({"type": "error", "message": message}))
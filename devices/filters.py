@@ -0,0 +1,58 @@
+# devices/filters.py
+"""
+Query-string filters for the device API, applied in the database:
+
+    ?status=online,pending   ?is_blocked=true   ?user=<id>
+    ?last_seen_after=<ISO datetime>   ?last_seen_before=<ISO datetime>
+
+An unparseable value is a 400 rather than being ignored, so a typo never
+silently returns the whole inventory.
+"""
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Device
+
+STATUSES = {status for status, _ in Device.STATUS_CHOICES}
+BOOLEANS = {"true": True, "1": True, "false": False, "0": False}
+
+
+def _datetime(name, value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValidationError({name: "Expected an ISO 8601 datetime."})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class DeviceFilterBackend(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        if params.get("status"):
+            statuses = set(params["status"].split(","))
+            if not statuses <= STATUSES:
+                raise ValidationError({"status": f"Expected one of {', '.join(sorted(STATUSES))}."})
+            queryset = queryset.filter(status__in=statuses)
+
+        if params.get("is_blocked"):
+            blocked = BOOLEANS.get(params["is_blocked"].lower())
+            if blocked is None:
+                raise ValidationError({"is_blocked": "Expected true or false."})
+            queryset = queryset.filter(is_blocked=blocked)
+
+        if params.get("user"):
+            try:
+                queryset = queryset.filter(user_id=int(params["user"]))
+            except ValueError:
+                raise ValidationError({"user": "Expected a user id."})
+
+        if params.get("last_seen_after"):
+            queryset = queryset.filter(last_seen__gte=_datetime("last_seen_after", params["last_seen_after"]))
+        if params.get("last_seen_before"):
+            queryset = queryset.filter(last_seen__lt=_datetime("last_seen_before", params["last_seen_before"]))
+
+        return queryset
@@ -11,3 +11,17 @@ class DeviceRegistrationForm(forms.ModelForm):
             "ip_address": forms.TextInput(attrs={"class": "form-control", "placeholder": "192.168.0.1"}),
         }
         
+
+
+class DeviceImportForm(forms.Form):
+    file = forms.FileField(
+        label="CSV or JSON file",
+        help_text="Columns / keys: mac_address (required), ip_address, name, owner (email of a company user; defaults to you). JSON: a list of objects, or one object per line (.ndjson).",
+        widget=forms.ClearableFileInput(attrs={"class": "form-control"}),
+    )
+
+    def clean_file(self):
+        upload = self.cleaned_data["file"]
+        if not upload.name.lower().endswith((".csv", ".json", ".ndjson", ".jsonl", ".txt")):
+            raise forms.ValidationError("Upload a .csv, .json or .ndjson file.")
+        return upload
@@ -0,0 +1,195 @@
+# devices/heartbeats.py
+"""
+Device heartbeats with write-behind last_seen / status updates.
+
+Agents call in every ~30s (POST /api/devices/heartbeat/ or the
+ws/devices/heartbeat/ socket). Writing each heartbeat as a save() would
+be a row update plus a post_save broadcast per call, so instead:
+
+- record_heartbeat() only checks the MAC against the company's in-memory
+  registry (devices/registry.py) and notes the time in this process's
+  buffer; a device beating twice before a flush is one entry.
+- Once DEVICE_HEARTBEAT_FLUSH_INTERVAL seconds have passed (or the buffer
+  holds FLUSH_SIZE devices), the call that notices flushes it: one SELECT
+  per CHUNK_SIZE devices and one bulk_update. A timer started by the
+  first beat into an empty buffer flushes it then too, so a worker that
+  stops receiving heartbeats does not sit on the last ones.
+- Only devices that were offline and came online are published (live
+  deltas and one company message per batch); a heartbeat from a device that was
+  already online changes nothing anyone is shown.
+- sweep_offline_devices() (manage.py sweep_devices) marks devices offline
+  once their last_seen is DEVICE_HEARTBEAT_TIMEOUT seconds old, the
+  online -> offline transition, published the same way.
+
+Each process flushes its own buffer, so no coordination is needed between
+workers. The sweeper runs in its own process and sees only the database,
+where a live device's last_seen can lag by up to one agent interval plus
+one flush interval; DEVICE_HEARTBEAT_TIMEOUT must exceed that
+(min_sweep_timeout), or live devices would be swept. Devices that never
+sent a heartbeat (last_seen empty) are left to the join-request flow.
+"""
+import ipaddress
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .bulk import broadcast_devices_changed, publish_live_changes
+from .macs import format_mac, parse_mac
+from .models import Device
+from .registry import known_macs
+
+CHUNK_SIZE = 900  # below SQLite's 999 bound parameters
+FLUSH_SIZE = 5000
+AGENT_INTERVAL = 30  # seconds between an agent's heartbeats
+FLUSH_SLACK = 5  # seconds for a flush itself to land
+
+
+class HeartbeatBuffer:
+    """Latest heartbeat per device (canonical MAC) since the last flush."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._beats = {}  # mac -> (company_id, seen_at, ip_address)
+        self._started = time.monotonic()
+
+    def add(self, company_id, mac, ip_address=None):
+        """
+        Record a heartbeat; returns (whether the buffer is due for a flush,
+        whether it was empty).
+        """
+        with self._lock:
+            first = not self._beats
+            previous = self._beats.get(mac)
+            if ip_address is None and previous is not None:
+                ip_address = previous[2]
+            self._beats[mac] = (company_id, timezone.now(), ip_address)
+            due = (
+                len(self._beats) >= FLUSH_SIZE
+                or time.monotonic() - self._started >= settings.DEVICE_HEARTBEAT_FLUSH_INTERVAL
+            )
+            return due, first
+
+    def drain(self):
+        with self._lock:
+            beats, self._beats = self._beats, {}
+            self._started = time.monotonic()
+        return beats
+
+    def __len__(self):
+        return len(self._beats)
+
+
+_buffer = HeartbeatBuffer()
+
+
+def _timed_flush():
+    try:
+        flush_heartbeats()
+    finally:
+        connection.close()  # the timer thread's own connection
+
+
+def _schedule_flush():
+    """Flush the buffer DEVICE_HEARTBEAT_FLUSH_INTERVAL from now, whatever arrives meanwhile."""
+    timer = threading.Timer(settings.DEVICE_HEARTBEAT_FLUSH_INTERVAL, _timed_flush)
+    timer.daemon = True
+    timer.start()
+
+
+def record_heartbeat(company_id, mac_address, ip_address=None):
+    """
+    Buffer a heartbeat from a device of `company_id`. Raises ValueError for
+    a malformed MAC / IP or a MAC not registered to the company. Returns
+    whether a flush is due (see flush_heartbeats).
+    """
+    mac = format_mac(parse_mac(mac_address))
+    if ip_address:
+        ip_address = str(ipaddress.ip_address(ip_address))
+    if mac not in known_macs(company_id):
+        raise ValueError(f"{mac} is not a registered device.")
+    due, first = _buffer.add(company_id, mac, ip_address)
+    if first:
+        _schedule_flush()
+    return due
+
+
+def _publish(devices, event, status):
+    """Live deltas and one company message for devices that changed status."""
+    publish_live_changes(devices)
+    by_company = defaultdict(list)
+    for device in devices:
+        by_company[device.company_id].append(device.id)
+    for company_id, ids in by_company.items():
+        broadcast_devices_changed(company_id, event, ids, status=status)
+
+
+def flush_heartbeats():
+    """Write the buffered heartbeats; returns (devices updated, devices that came online)."""
+    beats = _buffer.drain()
+    updated, came_online = 0, 0
+    macs = list(beats)
+    for start in range(0, len(macs), CHUNK_SIZE):
+        with transaction.atomic():
+            devices = list(
+                Device.objects.filter(mac_address__in=macs[start:start + CHUNK_SIZE])
+                .select_related("user").select_for_update(of=("self",))
+            )
+            seen, changed = [], []
+            for device in devices:
+                company_id, seen_at, ip_address = beats[device.mac_address]
+                if device.company_id != company_id:
+                    continue  # moved to another company since it was buffered
+                device.last_seen = seen_at
+                if ip_address:
+                    device.ip_address = ip_address
+                if device.status == "offline":
+                    device.status = "online"
+                    changed.append(device)
+                seen.append(device)
+            Device.objects.bulk_update(seen, ["last_seen", "status", "ip_address"])
+            if changed:
+                _publish(changed, "devices_status_changed", "online")
+        updated += len(seen)
+        came_online += len(changed)
+    return updated, came_online
+
+
+def min_sweep_timeout():
+    """Shortest sweep timeout that cannot catch a live device whose beats are still buffered."""
+    return AGENT_INTERVAL + settings.DEVICE_HEARTBEAT_FLUSH_INTERVAL + FLUSH_SLACK
+
+
+def sweep_offline_devices(timeout=None):
+    """Mark devices offline whose last heartbeat is older than `timeout` seconds; returns how many."""
+    timeout = settings.DEVICE_HEARTBEAT_TIMEOUT if timeout is None else timeout
+    if timeout < min_sweep_timeout():
+        raise ImproperlyConfigured(
+            f"A heartbeat timeout of {timeout}s could sweep live devices whose beats are still "
+            f"buffered in the web workers; use at least {min_sweep_timeout()}s."
+        )
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    swept = 0
+    while True:
+        with transaction.atomic():
+            # Locked, so a flush cannot write an older status over the sweep
+            devices = list(
+                Device.objects.filter(status="online", last_seen__lt=cutoff)
+                .select_related("user").select_for_update(of=("self",))
+                .order_by("id")[:CHUNK_SIZE]
+            )
+            if not devices:
+                return swept
+            Device.objects.filter(id__in=[device.id for device in devices]).update(status="offline")
+            for device in devices:
+                device.status = "offline"
+            _publish(devices, "devices_status_changed", "offline")
+        swept += len(devices)
+        if len(devices) < CHUNK_SIZE:
+            return swept
+
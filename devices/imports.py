@@ -0,0 +1,231 @@
+# devices/imports.py
+"""
+Bulk device import from CSV, JSON or NDJSON (e.g. an MDM export).
+
+Rows are read as a stream and handled CHUNK_SIZE at a time:
+
+- MACs are canonicalized and MACs / IPs validated for the whole chunk in
+  one pass;
+- duplicates are found against the chunk itself, earlier chunks, and the
+  unique mac_address index with one `mac_address IN (...)` query;
+- owners given by email are resolved, case-insensitively, with one query
+  per chunk;
+- new devices go in with bulk_create. If a MAC was registered by someone
+  else since the duplicate check, that chunk's devices are inserted one
+  by one instead and the clashing rows reported as already registered.
+
+bulk_create skips the per-device signals, so the caches they maintain
+(dashboard, MAC registry) are refreshed and the company is sent one
+summary broadcast once the import is done. Imported devices start
+offline, so no live graph changes.
+"""
+import csv
+import io
+import ipaddress
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from companies.dashboard import invalidate_admin_dashboard
+from networks.broadcast import queue_broadcast
+from .macs import parse_mac, format_mac
+from .models import Device
+from .registry import invalidate_mac_registry
+
+CHUNK_SIZE = 900  # rows per query batch; below SQLite's 999 bound parameters
+
+# Accepted column names, after _column() (MDM exports vary)
+_COLUMNS = {
+    "mac_address": ("mac_address", "mac", "macaddress", "wifi_mac", "wi_fi_mac_address"),
+    "ip_address": ("ip_address", "ip", "ipaddress"),
+    "name": ("name", "device_name", "hostname"),
+    "owner": ("owner", "owner_email", "user", "email"),
+}
+
+
+class DeviceImportError(ValueError):
+    """The file could not be read at all."""
+
+
+def _column(name):
+    """"Wi-Fi MAC Address" -> "wi_fi_mac_address"."""
+    return str(name).strip().lower().replace(" ", "_").replace("-", "_")
+
+
+def _pick(record, field):
+    for column in _COLUMNS[field]:
+        value = record.get(column)
+        if value not in (None, ""):
+            return str(value).strip()
+    return ""
+
+
+def format_for(filename):
+    """Import format from a file name: csv (default), json or ndjson."""
+    name = filename.lower()
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "json" if name.endswith(".json") else "csv"
+
+
+def _json_line(raw):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None  # reported as a bad row
+
+
+def _records(text, fmt):
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        if not reader.fieldnames:
+            raise DeviceImportError("The CSV file is empty.")
+        return ((reader.line_num, record) for record in reader)
+    if fmt == "ndjson":
+        return ((line, _json_line(raw)) for line, raw in enumerate(text, start=1) if raw.strip())
+    try:
+        data = json.load(text)
+    except UnicodeDecodeError:
+        raise
+    except ValueError as exc:
+        raise DeviceImportError(f"Invalid JSON: {exc}")
+    if not isinstance(data, list):
+        raise DeviceImportError("Expected a JSON list of devices.")
+    return enumerate(data, start=1)
+
+
+def iter_device_rows(stream, fmt="csv"):
+    """(line, {mac_address, ip_address, name, owner}) for each record of a binary stream."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        for line, record in _records(text, fmt):
+            if not isinstance(record, dict):
+                yield line, {"error": "Expected an object with a mac_address."}
+                continue
+            record = {_column(key): value for key, value in record.items() if key is not None}
+            yield line, {field: _pick(record, field) for field in _COLUMNS}
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise DeviceImportError(f"Could not read the file: {exc}")
+
+
+def _valid_ip(value):
+    try:
+        ipaddress.ip_address(value)
+        return True
+    except ValueError:
+        return False
+
+
+class DeviceImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors = []  # [(line, mac, message)]
+
+
+def _import_chunk(chunk, company, default_owner, seen, result):
+    """Validate one chunk of (line, row) and bulk_create its new devices."""
+    valid = []
+    for line, row in chunk:
+        if "error" in row:
+            result.errors.append((line, "", row["error"]))
+            continue
+        raw_mac = row["mac_address"]
+        try:
+            mac = format_mac(parse_mac(raw_mac))
+        except ValueError:
+            result.errors.append((line, raw_mac, "Invalid MAC address."))
+            continue
+        if row["ip_address"] and not _valid_ip(row["ip_address"]):
+            result.errors.append((line, mac, f"Invalid IP address '{row['ip_address']}'."))
+            continue
+        if mac in seen:
+            result.errors.append((line, mac, f"Duplicate of line {seen[mac]}."))
+            continue
+        seen[mac] = line
+        valid.append((line, mac, row))
+
+    taken = set(
+        Device.objects.filter(mac_address__in=[mac for _, mac, _ in valid])
+        .values_list("mac_address", flat=True)
+    )
+    owner_emails = {row["owner"].lower() for _, _, row in valid if row["owner"]}
+    owners = {}
+    if owner_emails:
+        User = get_user_model()
+        owners = {
+            user.email_lower: user
+            for user in User.objects.filter(company=company)
+            .annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=owner_emails)
+        }
+
+    devices = []
+    for line, mac, row in valid:
+        if mac in taken:
+            result.errors.append((line, mac, "Already registered."))
+            continue
+        owner = default_owner
+        if row["owner"]:
+            owner = owners.get(row["owner"].lower())
+            if owner is None:
+                result.errors.append((line, mac, f"Unknown owner '{row['owner']}'."))
+                continue
+        devices.append((line, Device(
+            user=owner,
+            company=company,
+            mac_address=mac,
+            ip_address=row["ip_address"] or None,
+            name=row["name"][:100],
+        )))
+
+    try:
+        with transaction.atomic():
+            Device.objects.bulk_create([device for _, device in devices])
+    except IntegrityError:
+        # Registered concurrently since `taken` was read: find which ones
+        for line, device in devices:
+            try:
+                with transaction.atomic():
+                    Device.objects.bulk_create([device])
+            except IntegrityError:
+                result.errors.append((line, device.mac_address, "Already registered."))
+            else:
+                result.created += 1
+        return
+    result.created += len(devices)
+
+
+def import_devices(rows, company, default_owner=None):
+    """
+    Register the devices of `rows` ((line, row) pairs, see
+    iter_device_rows) to `company`, owned by the row's owner or else
+    `default_owner`.
+    """
+    result = DeviceImportResult()
+    seen = {}  # mac -> line, across chunks
+    chunk = []
+    for item in rows:
+        chunk.append(item)
+        if len(chunk) >= CHUNK_SIZE:
+            with transaction.atomic():
+                _import_chunk(chunk, company, default_owner, seen, result)
+            chunk = []
+    if chunk:
+        with transaction.atomic():
+            _import_chunk(chunk, company, default_owner, seen, result)
+
+    if result.created:
+        invalidate_admin_dashboard(company.id)
+        invalidate_mac_registry(company.id)
+        queue_broadcast(
+            f"company_{company.id}",
+            {"type": "broadcast", "payload": {
+                "type": "devices_imported",
+                "company_id": company.id,
+                "count": result.created,
+            }},
+        )
+    result.errors.sort(key=lambda error: error[0])
+    return result
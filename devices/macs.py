@@ -0,0 +1,81 @@
+# devices/macs.py
+"""
+MAC address canonicalization.
+
+MACs are stored in one canonical form, lower-case hex pairs separated by
+colons ("aa:bb:cc:dd:ee:ff"), whatever form they were typed or reported
+in ("AA-BB-CC-DD-EE-FF", "aabbccddeeff", "aabb.ccdd.eeff"...). Comparing
+MACs is then a plain `=`, which the unique / plain indexes on the column
+can serve, instead of `mac_address__iexact`.
+
+MACAddressField does this for a model: values are canonicalized on save
+and in lookups (`filter(mac_address="AA-BB-...")` finds "aa:bb:..."), and
+model forms reject what is not a MAC.
+"""
+import re
+
+from django.core.exceptions import ValidationError
+from django.db import models
+
+_SEPARATORS = re.compile(r"[\s:.\-]")
+_HEX12 = re.compile(r"[0-9a-f]{12}")
+
+
+def parse_mac(value) -> int:
+    """The 48-bit integer of a MAC in any common notation; ValueError if it is not one."""
+    digits = _SEPARATORS.sub("", str(value)).lower()
+    if not _HEX12.fullmatch(digits):
+        raise ValueError(f"{value!r} is not a MAC address")
+    return int(digits, 16)
+
+
+def format_mac(number) -> str:
+    digits = f"{number:012x}"
+    return ":".join(digits[i:i + 2] for i in range(0, 12, 2))
+
+
+def normalize_mac(value) -> str:
+    """
+    Canonical form of a MAC, "" if there is none. Values that are not a MAC
+    are returned stripped but otherwise untouched (e.g. placeholders).
+    """
+    if not value:
+        return ""
+    try:
+        return format_mac(parse_mac(value))
+    except ValueError:
+        return str(value).strip()
+
+
+def validate_mac_address(value):
+    try:
+        parse_mac(value)
+    except ValueError:
+        raise ValidationError(
+            "%(value)s is not a valid MAC address (e.g. 00:1A:2B:3C:4D:5E).",
+            code="invalid_mac",
+            params={"value": value},
+        )
+
+
+class MACAddressField(models.CharField):
+    """CharField holding a canonical MAC (see module docstring)."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("max_length", 17)
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        value = super().to_python(value)
+        return normalize_mac(value) if value else value
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        return normalize_mac(value) if value else value
+
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.attname)
+        if value:
+            value = normalize_mac(value)
+            setattr(model_instance, self.attname, value)
+        return value
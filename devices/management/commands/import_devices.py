@@ -0,0 +1,41 @@
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from devices.imports import DeviceImportError, format_for, import_devices, iter_device_rows
+
+
+class Command(BaseCommand):
+    help = "Register devices to a company from a CSV, JSON or NDJSON file (e.g. an MDM export)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", help="CSV (mac_address,ip_address,name,owner), JSON or NDJSON file")
+        parser.add_argument(
+            "--owner", required=True,
+            help="Email of the company user owning rows that do not name an owner"
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        owner = User.objects.select_related("company").filter(email__iexact=options["owner"]).first()
+        if owner is None or owner.company is None:
+            raise CommandError(f"{options['owner']} is not a user of any company")
+
+        path = Path(options["file"])
+        try:
+            with path.open("rb") as stream:
+                result = import_devices(
+                    iter_device_rows(stream, format_for(path.name)), owner.company, default_owner=owner
+                )
+        except (OSError, DeviceImportError) as exc:
+            raise CommandError(str(exc))
+
+        for line, mac, error in result.errors:
+            self.stderr.write(f"Line {line} ({mac}): {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.created} device(s) imported, {len(result.errors)} skipped for {owner.company.name}."
+        ))
+
+
+# Usage: python manage.py import_devices mdm_export.csv --owner admin@acme.com
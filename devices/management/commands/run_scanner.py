@@ -0,0 +1,43 @@
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from devices.scan_backends import BACKENDS, get_backend
+from devices.scan_service import ScanService
+
+
+class Command(BaseCommand):
+    help = "Scan every network on its own schedule (subnets, scan interval and jitter) until stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=None,
+            help="Networks scanned at once (default: SCANNER_CONCURRENCY)"
+        )
+        parser.add_argument(
+            "--workers", type=int, default=None,
+            help="Subnets of one network scanned at once (default: SCAN_WORKERS)"
+        )
+        parser.add_argument(
+            "--backend", choices=sorted(BACKENDS), default=None,
+            help="Scanner backend (default: SCAN_BACKEND)"
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Scan every scheduled network once, then exit"
+        )
+
+    def handle(self, *args, **options):
+        service = ScanService(
+            concurrency=options["concurrency"],
+            workers=options["workers"],
+            backend=get_backend(options["backend"]),
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.WARNING("Scanner running (Ctrl+C to stop)..."))
+        asyncio.run(service.run(once=options["once"]))
+        self.stdout.write(self.style.SUCCESS("Scanner stopped."))
+
+
+# Usage: python manage.py run_scanner --concurrency 8
+#        python manage.py run_scanner --once --backend fake
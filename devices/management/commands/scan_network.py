@@ -1,19 +1,72 @@
-from django.core.management.base import BaseCommand
-from devices.utils import scan_network_and_detect_intruders
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from networks.models import Network
+from devices.scan_backends import BACKENDS, get_backend
+from devices.utils import scan_network
+
 
 class Command(BaseCommand):
     help = "Scan the network and log intruders"
 
     def add_arguments(self, parser):
         parser.add_argument(
-            "--target", type=str, default="192.168.1.0/24",
-            help="Target IP range to scan"
+            "--target", action="append", dest="targets",
+            help="Target IP range to scan; repeat for several (default: SCAN_SUBNETS)"
+        )
+        parser.add_argument(
+            "--network", type=int, default=None,
+            help="Scan this network (its subnets unless --target is given) and stream it to its monitors"
+        )
+        parser.add_argument(
+            "--workers", type=int, default=None,
+            help="Subnets scanned at once (default: SCAN_WORKERS)"
+        )
+        parser.add_argument(
+            "--backend", choices=sorted(BACKENDS), default=None,
+            help="Scanner backend (default: SCAN_BACKEND)"
+        )
+        parser.add_argument(
+            "--record", metavar="FILE",
+            help="Also save the hosts found as a recording the fake backend can replay"
         )
 
     def handle(self, *args, **options):
-        target_ip = options["target"]
-        self.stdout.write(self.style.WARNING(f"Scanning network: {target_ip}"))
+        network = None
+        if options["network"] is not None:
+            network = Network.objects.filter(pk=options["network"]).first()
+            if network is None:
+                raise CommandError(f"Network {options['network']} does not exist")
+
+        targets = options["targets"] or (network.subnet_list if network else settings.SCAN_SUBNETS)
+        if not targets:
+            if network is not None:
+                raise CommandError(f"Network {network.pk} has no subnets to scan")
+            raise CommandError("No targets given and SCAN_SUBNETS is empty")
+        self.stdout.write(self.style.WARNING(f"Scanning network: {', '.join(targets)}"))
+
+        report = scan_network(targets, options["workers"], get_backend(options["backend"]), network)
+
+        for subnet, error in report.errors.items():
+            self.stderr.write(self.style.ERROR(f"Scan of {subnet} failed: {error}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Scan completed. {len(report.hosts)} devices found, "
+            f"{len(report.appeared)} new, {len(report.departed)} gone, "
+            f"{len(report.intruders)} intruders logged."
+        ))
+
+        if options["record"]:
+            recording = {}
+            for host in report.hosts:
+                recording.setdefault(host["subnet"], []).append({"ip": host["ip"], "mac": host["mac"]})
+            with open(options["record"], "w") as fh:
+                json.dump(recording, fh, indent=2)
+            self.stdout.write(f"Recording saved to {options['record']}")
 
-        devices = scan_network_and_detect_intruders(target_ip)
 
-        self.stdout.write(self.style.SUCCESS(f"Scan completed. {len(devices)} devices found."))
+# Usage: python manage.py scan_network --target 192.168.1.0/24 --target 10.0.0.0/24 --workers 4
+#        python manage.py scan_network --network 3 --backend scapy
+#        python manage.py scan_network --backend scapy --record scan.json
+#        SCAN_FAKE_RECORDING=scan.json python manage.py scan_network --backend fake
@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from devices.heartbeats import min_sweep_timeout, sweep_offline_devices
+
+
+class Command(BaseCommand):
+    help = "Mark devices offline once their heartbeats stop (runs until stopped unless --once)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Sweep once, then exit"
+        )
+        parser.add_argument(
+            "--timeout", type=int, default=None,
+            help="Seconds without a heartbeat before a device is offline (default: DEVICE_HEARTBEAT_TIMEOUT)"
+        )
+        parser.add_argument(
+            "--interval", type=float, default=30,
+            help="Seconds between sweeps (default: 30)"
+        )
+
+    def handle(self, *args, **options):
+        timeout = options["timeout"] or settings.DEVICE_HEARTBEAT_TIMEOUT
+        if timeout < min_sweep_timeout():
+            # Beats buffered in the web workers are invisible here
+            raise CommandError(
+                f"A timeout of {timeout}s could sweep live devices; use at least {min_sweep_timeout()}s "
+                "(agent interval plus DEVICE_HEARTBEAT_FLUSH_INTERVAL)."
+            )
+        try:
+            while True:
+                swept = sweep_offline_devices(timeout)
+                if swept:
+                    self.stdout.write(f"Marked {swept} device(s) offline.")
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS("Device sweeper stopped."))
+
+
+# Usage: python manage.py sweep_devices
+#        python manage.py sweep_devices --once --timeout 120
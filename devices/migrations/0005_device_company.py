@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_company(apps, schema_editor):
+    Device = apps.get_model("devices", "Device")
+    User = apps.get_model("accounts", "User")
+    Device.objects.filter(user__isnull=False).update(
+        company_id=Subquery(User.objects.filter(pk=OuterRef("user_id")).values("company_id")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_announcement_announce_company_scope_idx'),
+        ('devices', '0004_device_device_status_blocked_idx'),
+        ('accounts', '0003_user_profile_image_alter_user_role'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='company',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='devices', to='companies.company'),
+        ),
+        migrations.RunPython(backfill_company, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0005_device_company'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiscoveredHost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subnet', models.CharField(max_length=43)),
+                ('host_key', models.CharField(max_length=64)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('mac_address', models.CharField(blank=True, max_length=17)),
+                ('registered', models.BooleanField(default=False)),
+                ('present', models.BooleanField(default=True)),
+                ('first_seen', models.DateTimeField()),
+                ('departed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('subnet', 'host_key'), name='discovered_host_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:42
+
+import devices.macs
+from django.db import migrations
+
+
+def normalize_device_macs(apps, schema_editor):
+    Device = apps.get_model("devices", "Device")
+    rows = list(Device.objects.order_by("pk").values_list("pk", "mac_address"))
+    owner = {}  # canonical MAC -> pk of the device that keeps it
+    for pk, mac in rows:
+        if devices.macs.normalize_mac(mac) == mac:
+            owner[mac] = pk
+    changed, clashes = [], []
+    for pk, mac in rows:
+        canonical = devices.macs.normalize_mac(mac)
+        if canonical == mac:
+            continue
+        if canonical in owner:
+            clashes.append((pk, mac, owner[canonical]))
+            continue
+        owner[canonical] = pk
+        changed.append(Device(pk=pk, mac_address=canonical))
+    Device.objects.bulk_update(changed, ["mac_address"], batch_size=500)
+
+    # A device whose canonical MAC is already another device's keeps its old
+    # spelling (the column is unique) and is put back to pending approval,
+    # so an admin sees it and can merge or delete it
+    if clashes:
+        Device.objects.filter(pk__in=[pk for pk, _, _ in clashes]).update(status="pending")
+        print(f"\n  {len(clashes)} device(s) duplicate another device's MAC and were set to pending:")
+        for pk, mac, kept in clashes:
+            print(f"    device {pk} ({mac}) duplicates device {kept}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0006_discoveredhost'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='device',
+            name='mac_address',
+            field=devices.macs.MACAddressField(max_length=17, unique=True, validators=[devices.macs.validate_mac_address]),
+        ),
+        migrations.AlterField(
+            model_name='discoveredhost',
+            name='mac_address',
+            field=devices.macs.MACAddressField(blank=True, max_length=17),
+        ),
+        migrations.RunPython(normalize_device_macs, migrations.RunPython.noop),
+    ]
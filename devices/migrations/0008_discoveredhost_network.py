@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0007_normalize_mac_addresses'),
+        ('networks', '0008_networksession_open_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='discoveredhost',
+            name='discovered_host_unique',
+        ),
+        migrations.AddField(
+            model_name='discoveredhost',
+            name='network',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='discovered_hosts', to='networks.network'),
+        ),
+        migrations.AddConstraint(
+            model_name='discoveredhost',
+            constraint=models.UniqueConstraint(fields=('network', 'subnet', 'host_key'), name='discovered_host_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='discoveredhost',
+            constraint=models.UniqueConstraint(condition=models.Q(('network__isnull', True)), fields=('subnet', 'host_key'), name='discovered_host_adhoc_unique'),
+        ),
+    ]
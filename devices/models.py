@@ -2,6 +2,8 @@
 from django.db import models
 from django.conf import settings
 
+from .macs import MACAddressField, validate_mac_address
+
 
 class Device(models.Model):
     user = models.ForeignKey(
@@ -12,8 +14,18 @@ class Device(models.Model):
         related_name="devices",
         db_index=True,
     )
+    # Denormalized from user.company so tenant listings need no join;
+    # kept current by save() and the User company-change signal
+    company = models.ForeignKey(
+        "companies.Company",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="devices",
+    )
     name = models.CharField(max_length=100, blank=True)
-    mac_address = models.CharField(max_length=17, unique=True)
+    # Canonical "aa:bb:cc:dd:ee:ff" (devices/macs.py), so lookups are exact index hits
+    mac_address = MACAddressField(unique=True, validators=[validate_mac_address])
     ip_address = models.GenericIPAddressField(blank=True, null=True)
     registered_at = models.DateTimeField(auto_now_add=True)
     last_seen = models.DateTimeField(null=True, blank=True)
@@ -29,10 +41,27 @@ class Device(models.Model):
         indexes = [
             models.Index(fields=["mac_address"]),
             models.Index(fields=["user"]),
+            # Online, unblocked devices (live view)
+            models.Index(fields=["status", "is_blocked"], name="device_status_blocked_idx"),
         ]
 
-    def company(self):
-        return self.user.company if self.user else None
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_user_id = instance.__dict__.get("user_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Follow the owner's company when the owner is set or changes
+        update_fields = kwargs.get("update_fields")
+        user_changed = self.user_id != getattr(self, "_loaded_user_id", None)
+        if self.user_id is not None and (self.company_id is None or user_changed):
+            if update_fields is None or "user" in update_fields:
+                self.company_id = self.user.company_id
+                if update_fields is not None:
+                    kwargs["update_fields"] = {*update_fields, "company"}
+        super().save(*args, **kwargs)
+        self._loaded_user_id = self.user_id
 
     def __str__(self):
         owner = self.user.email if self.user else "Unassigned"
@@ -59,3 +88,46 @@ class DeviceLog(models.Model):
 
     def __str__(self):
         return f"{self.get_action_display()} - {self.device} by {self.user}"
+
+
+class DiscoveredHost(models.Model):
+    """
+    A host seen by the network scanner (devices/scanner.py), one row per
+    subnet and host. Rows are only written when a host appears, changes
+    address or leaves, so a steady network costs no writes per scan.
+    """
+    # The network whose scan saw the host (None: ad-hoc scans of SCAN_SUBNETS).
+    # Networks of different companies may share an address range, so each
+    # keeps its own view of it.
+    network = models.ForeignKey(
+        "networks.Network",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="discovered_hosts",
+    )
+    subnet = models.CharField(max_length=43)
+    # The MAC when the scan sees it (same LAN segment), else "ip:<address>"
+    host_key = models.CharField(max_length=64)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    mac_address = MACAddressField(blank=True)
+    registered = models.BooleanField(default=False)
+    present = models.BooleanField(default=True)
+    first_seen = models.DateTimeField()  # when the host (re)appeared
+    departed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["network", "subnet", "host_key"], name="discovered_host_unique"
+            ),
+            # NULLs are distinct in a unique constraint, so ad-hoc scans need their own
+            models.UniqueConstraint(
+                fields=["subnet", "host_key"],
+                condition=models.Q(network__isnull=True),
+                name="discovered_host_adhoc_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.mac_address or self.ip_address} on {self.subnet}"
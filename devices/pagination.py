@@ -0,0 +1,18 @@
+# devices/pagination.py
+"""
+Cursor pagination for the device API.
+
+Devices are listed in id order and each page continues after the last id
+of the previous one, so paging through a large inventory stays an index
+range scan at any depth, and devices registered while a client pages are
+not skipped or repeated. Clients syncing their inventory follow `next`
+until it is null.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class DeviceCursorPagination(CursorPagination):
+    ordering = "id"
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
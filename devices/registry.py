@@ -0,0 +1,68 @@
+# devices/registry.py
+"""
+Per-company registry of known device MACs.
+
+Each process keeps the registered MACs of a company in memory as a
+frozenset, so "is this MAC one of ours?" is a set lookup (the scanner
+asks it for every host it finds). Entries are tagged with a generation
+counter kept in the shared cache; the Device signals in devices/signals.py
+bump it whenever a company's devices change, and every process reloads
+that company's set on its next lookup.
+"""
+import threading
+import time
+
+from django.core.cache import cache
+
+from .models import Device
+
+_registries = {}  # company_id -> (generation, frozenset of MACs)
+_lock = threading.Lock()
+
+
+def _generation_key(company_id) -> str:
+    return f"devices:mac_registry:{company_id}"
+
+
+def _generation_seed() -> int:
+    # From the clock, so a counter lost to cache eviction never repeats a
+    # generation some process already holds
+    return int(time.time() * 1000)
+
+
+def _generation(company_id) -> int:
+    key = _generation_key(company_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _generation_seed(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def known_macs(company_id) -> frozenset:
+    """Canonical MACs of the devices of a company (`None`: of no company)."""
+    generation = _generation(company_id)
+    entry = _registries.get(company_id)
+    if entry is not None and entry[0] == generation:
+        return entry[1]
+
+    macs = frozenset(
+        Device.objects.filter(company_id=company_id).values_list("mac_address", flat=True)
+    )
+    with _lock:
+        _registries[company_id] = (generation, macs)
+    return macs
+
+
+def invalidate_mac_registry(*company_ids):
+    """Make every process reload the registries of these companies."""
+    for company_id in set(company_ids):
+        key = _generation_key(company_id)
+        cache.add(key, _generation_seed(), timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Key evicted between add() and incr()
+            cache.set(key, _generation_seed(), timeout=None)
+        with _lock:
+            _registries.pop(company_id, None)
@@ -0,0 +1,7 @@
+# devices/routing.py
+from django.urls import re_path
+from . import consumers
+
+websocket_urlpatterns = [
+    re_path(r'^ws/devices/heartbeat/$', consumers.DeviceHeartbeatConsumer.as_asgi()),
+]
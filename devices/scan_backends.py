@@ -0,0 +1,203 @@
+# devices/scan_backends.py
+"""
+Scanner backends: how devices/scanner.py finds the hosts of a subnet.
+
+A backend yields {"ip": ..., "mac": ...} dicts from `iter_hosts(subnet)`
+as hosts answer; `scan(subnet)` collects them. If given a `progress`
+callable, it is called with the number of addresses probed since the last
+call, as the sweep gets through them. SCAN_BACKEND picks one:
+
+- "nmap": `nmap -sn` through python-nmap (needs the nmap binary); hosts
+  come back when the whole subnet is done, and there is no progress to
+  report before that;
+- "scapy": ARP (or ICMP echo) sweep in pure Python; requests go out in
+  batches from a sender thread while replies are yielded as they arrive,
+  so a /16 sweep reports its first hosts straight away. Progress is
+  reported per batch sent. Needs raw socket privileges;
+- "fake": replays recorded host lists (see `scan_network --record`),
+  deterministic, for tests and benchmarks. Progress goes up to each
+  host's address as it is replayed.
+"""
+import ipaddress
+import json
+import queue
+import threading
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .macs import normalize_mac
+
+BROADCAST_MAC = "ff:ff:ff:ff:ff:ff"
+
+
+class ScannerBackend:
+    name = None
+
+    def iter_hosts(self, subnet, progress=None):
+        raise NotImplementedError
+
+    def scan(self, subnet):
+        return list(self.iter_hosts(subnet))
+
+
+class NmapBackend(ScannerBackend):
+    name = "nmap"
+
+    def __init__(self, arguments="-sn"):
+        self.arguments = arguments
+
+    def iter_hosts(self, subnet, progress=None):
+        import nmap
+
+        nm = nmap.PortScanner()
+        nm.scan(hosts=subnet, arguments=self.arguments)
+        for host in nm.all_hosts():
+            addresses = nm[host]["addresses"]
+            yield {
+                "ip": addresses.get("ipv4") or host,
+                "mac": normalize_mac(addresses.get("mac")),
+            }
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class ScapyBackend(ScannerBackend):
+    """
+    ARP sweep (same LAN segment, reports MACs) or ICMP echo sweep (routed
+    subnets, IPs only). `timeout` is how long to wait for late replies
+    after the last batch went out.
+    """
+    name = "scapy"
+
+    def __init__(self, protocol="arp", batch_size=256, timeout=2.0, iface=None):
+        if protocol not in ("arp", "icmp"):
+            raise ImproperlyConfigured(f"Unknown sweep protocol {protocol!r}")
+        self.protocol = protocol
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.iface = iface
+
+    def _requests(self, addresses):
+        from scapy.all import ARP, ICMP, IP, Ether
+
+        if self.protocol == "arp":
+            return [Ether(dst=BROADCAST_MAC) / ARP(pdst=str(ip)) for ip in addresses]
+        return [IP(dst=str(ip)) / ICMP() for ip in addresses]
+
+    def _parse(self, packet):
+        from scapy.all import ARP, ICMP, IP
+
+        if self.protocol == "arp":
+            if ARP in packet and packet[ARP].op == 2:  # is-at
+                return {"ip": packet[ARP].psrc, "mac": normalize_mac(packet[ARP].hwsrc)}
+        elif ICMP in packet and packet[ICMP].type == 0:  # echo-reply
+            return {"ip": packet[IP].src, "mac": ""}
+        return None
+
+    def iter_hosts(self, subnet, progress=None):
+        from scapy.all import AsyncSniffer, send, sendp
+
+        network = ipaddress.ip_network(subnet, strict=False)
+        replies = queue.Queue()
+        done = object()
+        failure = []
+
+        started = threading.Event()
+        sniffer = AsyncSniffer(
+            iface=self.iface,
+            store=False,
+            # Python-side filter: a BPF filter would need tcpdump installed
+            lfilter=lambda packet: self._parse(packet) is not None,
+            prn=replies.put,
+            started_callback=started.set,
+        )
+        sniffer.start()
+        started.wait(self.timeout)
+
+        def sweep():
+            try:
+                for batch in _batched(network.hosts(), self.batch_size):
+                    packets = self._requests(batch)
+                    if self.protocol == "arp":
+                        sendp(packets, iface=self.iface, verbose=False)
+                    else:
+                        send(packets, iface=self.iface, verbose=False)
+                    if progress:
+                        progress(len(batch))
+                time.sleep(self.timeout)
+            except Exception as exc:
+                failure.append(exc)
+            finally:
+                replies.put(done)
+
+        threading.Thread(target=sweep, daemon=True).start()
+
+        seen = set()
+        try:
+            while (packet := replies.get()) is not done:
+                host = self._parse(packet)
+                if host is None or host["ip"] in seen:
+                    continue
+                if ipaddress.ip_address(host["ip"]) not in network:
+                    continue
+                seen.add(host["ip"])
+                yield host
+        finally:
+            if sniffer.running:
+                sniffer.stop()
+        if failure:
+            raise failure[0]
+
+
+class FakeBackend(ScannerBackend):
+    """
+    Replays `recordings` ({subnet: [host, ...]}, or a JSON file of that at
+    `path`). Hosts come back in recorded order, `delay` seconds apart;
+    subnets that were not recorded have no hosts.
+    """
+    name = "fake"
+
+    def __init__(self, recordings=None, path=None, delay=0):
+        if recordings is None and path:
+            with open(path) as fh:
+                recordings = json.load(fh)
+        self.recordings = recordings or {}
+        self.delay = delay
+
+    def iter_hosts(self, subnet, progress=None):
+        try:
+            network = ipaddress.ip_network(subnet, strict=False)
+        except ValueError:
+            network = None
+        probed = 0
+        for host in self.recordings.get(subnet, []):
+            if self.delay:
+                time.sleep(self.delay)
+            if progress and network is not None:
+                # Addresses up to this host's count as swept
+                offset = int(ipaddress.ip_address(host["ip"])) - int(network.network_address) + 1
+                if probed < offset <= network.num_addresses:
+                    progress(offset - probed)
+                    probed = offset
+            yield {"ip": host["ip"], "mac": normalize_mac(host.get("mac"))}
+
+
+BACKENDS = {backend.name: backend for backend in (NmapBackend, ScapyBackend, FakeBackend)}
+
+
+def get_backend(name=None):
+    """The backend called `name` (default: SCAN_BACKEND)."""
+    name = name or settings.SCAN_BACKEND
+    if name == "fake":
+        return FakeBackend(path=settings.SCAN_FAKE_RECORDING or None)
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ImproperlyConfigured(f"Unknown scanner backend {name!r}") from None
@@ -0,0 +1,167 @@
+# devices/scan_service.py
+"""
+Background scan service (manage.py run_scanner).
+
+One asyncio loop schedules every network with subnets and a non-zero
+scan_interval: a network is due `scan_interval` seconds after its last
+scan plus a random 0..scan_jitter seconds, so networks sharing an
+interval spread out instead of all scanning at the same moment. The scan
+settings are re-read every SCANNER_REFRESH_INTERVAL seconds.
+
+Scans run on worker threads (the scanner itself is blocking), at most
+SCANNER_CONCURRENCY at a time. A network whose previous scan is still
+running when it comes due skips that turn, so slow scans never pile up.
+Intruder alerts (notifications, and mail queued in the outbox) go
+through a queue drained by their own task, so they never hold up
+scanning.
+"""
+import asyncio
+import random
+import signal
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from networks.models import Network
+from .utils import notify_intruders, scan_network_and_log_intruders
+
+
+def _in_thread(func):
+    """`func` as a coroutine run on a worker thread with its own DB connection."""
+    def run(*args):
+        close_old_connections()
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def scheduled_networks():
+    return list(
+        Network.objects.select_related("company")
+        .exclude(subnets="")
+        .filter(scan_interval__gt=0)
+    )
+
+
+class ScanService:
+    def __init__(self, concurrency=None, refresh_interval=None, workers=None, backend=None, log=print):
+        self.concurrency = concurrency or settings.SCANNER_CONCURRENCY
+        self.refresh_interval = refresh_interval or settings.SCANNER_REFRESH_INTERVAL
+        self.workers = workers
+        self.backend = backend
+        self.log = log
+        self.networks = {}  # network_id -> Network
+        self.due = {}       # network_id -> loop time of its next scan
+        self.running = {}   # network_id -> scan task
+
+    # Scheduling
+
+    @staticmethod
+    def _jitter(network):
+        return random.uniform(0, network.scan_jitter)
+
+    def _first_due(self, network, now):
+        """Carry on from the last scan, also across restarts."""
+        wait = 0
+        if network.last_scanned_at is not None:
+            elapsed = (timezone.now() - network.last_scanned_at).total_seconds()
+            wait = max(0, network.scan_interval - elapsed)
+        return now + wait + self._jitter(network)
+
+    async def _refresh(self, now):
+        self.networks = {network.id: network for network in await _in_thread(scheduled_networks)()}
+        for network_id in set(self.due) - set(self.networks):
+            del self.due[network_id]
+        for network_id, network in self.networks.items():
+            if network_id not in self.due:
+                self.due[network_id] = self._first_due(network, now)
+
+    def _start_due_scans(self, now):
+        for network_id, due_at in self.due.items():
+            if due_at > now:
+                continue
+            network = self.networks[network_id]
+            self.due[network_id] = now + network.scan_interval + self._jitter(network)
+            if network_id in self.running:
+                self.log(f"{network}: previous scan still running, skipping this turn")
+                continue
+            self.running[network_id] = asyncio.create_task(self._scan(network))
+
+    # Scanning and alerts
+
+    def _scan_network(self, network):
+        report = scan_network_and_log_intruders(None, self.workers, self.backend, network)
+        Network.objects.filter(pk=network.pk).update(last_scanned_at=timezone.now())
+        return report
+
+    async def _scan(self, network):
+        try:
+            async with self.slots:
+                report = await _in_thread(self._scan_network)(network)
+        except Exception as exc:
+            self.log(f"{network}: scan failed: {exc!r}")
+        else:
+            for subnet, error in report.errors.items():
+                self.log(f"{network}: scan of {subnet} failed: {error!r}")
+            self.log(
+                f"{network}: {len(report.hosts)} hosts, {len(report.appeared)} new, "
+                f"{len(report.departed)} gone, {len(report.intruders)} intruders"
+            )
+            if report.intruders:
+                self.alerts.put_nowait((report, network))
+        finally:
+            self.running.pop(network.id, None)
+
+    async def _dispatch_alerts(self):
+        while (alert := await self.alerts.get()) is not None:
+            report, network = alert
+            try:
+                await _in_thread(notify_intruders)(report, network)
+            except Exception as exc:
+                self.log(f"{network}: intruder alert failed: {exc!r}")
+
+    # Main loop
+
+    def stop(self):
+        self.stopping.set()
+
+    async def run(self, once=False):
+        """Scan until stop() (SIGINT / SIGTERM), or every network once with `once`."""
+        loop = asyncio.get_running_loop()
+        self.slots = asyncio.Semaphore(self.concurrency)
+        self.alerts = asyncio.Queue()
+        self.stopping = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # not available on this platform / thread
+
+        dispatcher = asyncio.create_task(self._dispatch_alerts())
+        next_refresh = 0
+        while not self.stopping.is_set():
+            now = loop.time()
+            if now >= next_refresh:
+                await self._refresh(now)
+                if once:
+                    self.due = dict.fromkeys(self.networks, now)
+                next_refresh = now + self.refresh_interval
+            self._start_due_scans(now)
+            if once:
+                break
+
+            wake_at = min([next_refresh, *self.due.values()])
+            try:
+                await asyncio.wait_for(self.stopping.wait(), timeout=max(0, wake_at - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+
+        if self.running:
+            self.log(f"Waiting for {len(self.running)} running scan(s)...")
+            await asyncio.gather(*self.running.values())
+        self.alerts.put_nowait(None)
+        await dispatcher
@@ -0,0 +1,132 @@
+# devices/scan_stream.py
+"""
+Live scan events for a network's monitors.
+
+ScanStream follows a running scan (devices/scanner.py) and pushes what it
+finds to the `network_<id>_monitors` group while the sweep is still going,
+as `network.message` events:
+
+- scan_started     {subnets}
+- scan_host_found / scan_host_registered / scan_intruder_flagged
+                   {ip, mac, subnet}, by what the host turned out to be
+- scan_progress    {percent, subnets_done, subnets_total, hosts}
+- scan_finished    {hosts, appeared, departed, intruders, failed}
+
+Host events are sent in batches (every FLUSH_INTERVAL seconds or
+FLUSH_SIZE hosts, whichever comes first), one channel layer round trip per
+batch, so a busy sweep does not send a message per host. An intruder is
+sent straight away, with whatever is pending. Progress counts addresses
+as the backend reports them swept (per batch for scapy, see
+devices/scan_backends.py) and goes out with each batch, or on its own
+once FLUSH_INTERVAL has passed; a finished subnet counts in full.
+"""
+import ipaddress
+import threading
+import time
+
+from networks.broadcast import broadcast_batch, queue_broadcast
+from networks.live import monitors_group
+from .scanner import ScanListener
+
+FLUSH_INTERVAL = 1.0
+FLUSH_SIZE = 100
+
+_HOST_EVENTS = {
+    "registered": "scan_host_registered",
+    "intruder": "scan_intruder_flagged",
+}
+
+
+def _address_count(subnet):
+    try:
+        return ipaddress.ip_network(subnet, strict=False).num_addresses
+    except ValueError:
+        return 1  # a host name, or a range nmap understands
+
+
+class ScanStream(ScanListener):
+    def __init__(self, network_id):
+        self.group = monitors_group(network_id)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._hosts = 0
+        self._total = self._done = 0
+        self._swept = {}  # subnet -> addresses counted in _done
+        self._subnets_total = self._subnets_done = 0
+
+    def _send(self, events):
+        with broadcast_batch():
+            for event in events:
+                queue_broadcast(self.group, {"type": "network.message", "message": event})
+
+    def _flush(self, *extra):
+        """Send the pending host events, progress (and `extra` ones) in one go."""
+        with self._lock:
+            events, self._pending = self._pending + [self._progress(), *extra], []
+            self._last_flush = time.monotonic()
+        self._send(events)
+
+    def _due(self):
+        return time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+
+    def _count(self, subnet, count):
+        """Add `count` swept addresses of `subnet`, no more than it has."""
+        swept = self._swept.get(subnet, 0)
+        count = min(count, _address_count(subnet) - swept)
+        self._swept[subnet] = swept + count
+        self._done += count
+
+    def _progress(self):
+        return {
+            "type": "scan_progress",
+            "percent": int(self._done * 100 / self._total) if self._total else 100,
+            "subnets_done": self._subnets_done,
+            "subnets_total": self._subnets_total,
+            "hosts": self._hosts,
+        }
+
+    def scan_started(self, subnets):
+        self._subnets_total = len(subnets)
+        self._total = sum(_address_count(subnet) for subnet in subnets)
+        self._send([{"type": "scan_started", "subnets": list(subnets)}])
+
+    def host_found(self, subnet, host):
+        with self._lock:
+            self._hosts += 1
+            self._pending.append({
+                "type": _HOST_EVENTS.get(host["status"], "scan_host_found"),
+                "ip": host["ip"],
+                "mac": host["mac"],
+                "subnet": subnet,
+            })
+            due = (
+                host["status"] == "intruder"
+                or len(self._pending) >= FLUSH_SIZE
+                or self._due()
+            )
+        if due:
+            self._flush()
+
+    def addresses_scanned(self, subnet, count):
+        with self._lock:
+            self._count(subnet, count)
+            due = self._due()
+        if due:
+            self._flush()
+
+    def subnet_done(self, subnet, hosts, error):
+        with self._lock:
+            self._subnets_done += 1
+            self._count(subnet, _address_count(subnet))
+        self._flush()
+
+    def scan_done(self, report):
+        self._flush({
+            "type": "scan_finished",
+            "hosts": len(report.hosts),
+            "appeared": len(report.appeared),
+            "departed": len(report.departed),
+            "intruders": len(report.intruders),
+            "failed": sorted(report.errors),
+        })
@@ -0,0 +1,221 @@
+# devices/scanner.py
+"""
+Network scanner engine.
+
+Subnets are scanned concurrently (one backend sweep per subnet on a thread
+pool, see devices/scan_backends.py) and the results are diffed against
+the previous scan of the same network, kept in DiscoveredHost:
+
+- a host that appears (new, or back after leaving) is inserted or
+  re-activated, and logged as an intruder if its MAC is not registered;
+- a host that is no longer answering is marked departed;
+- a host that is still there is only written if its address or
+  registration changed.
+
+Hosts are classified with set lookups: against the company's in-memory
+MAC registry (devices/registry.py) when a network is scanned, else
+against every registered MAC, loaded once per run. Every write is a
+bulk_create / bulk_update, so a scan costs a handful of queries however
+many hosts it sees. A subnet whose scan failed is left out of the diff,
+so its hosts are not reported as departed. A ScanListener can follow the
+scan as hosts come in (devices/scan_stream.py streams it to the live
+view).
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from alerts.models import IntruderLog
+from companies.dashboard import invalidate_admin_dashboard
+from networks.broadcast import queue_delta
+from networks.live import serialize_intruder
+from .models import Device, DiscoveredHost
+from .registry import known_macs
+from .scan_backends import get_backend
+
+
+class ScanListener:
+    """
+    Follows a running scan (see devices/scan_stream.py). `host_found`,
+    `addresses_scanned` and `subnet_done` are called from the worker
+    threads as results come in; `addresses_scanned` only as often as the
+    backend reports progress (see devices/scan_backends.py).
+    """
+
+    def scan_started(self, subnets):
+        pass
+
+    def host_found(self, subnet, host):
+        pass
+
+    def addresses_scanned(self, subnet, count):
+        pass
+
+    def subnet_done(self, subnet, hosts, error):
+        pass
+
+    def scan_done(self, report):
+        pass
+
+
+def registered_macs():
+    """MACs of all registered devices (stored canonical, see devices/macs.py)."""
+    return set(Device.objects.values_list("mac_address", flat=True))
+
+
+def _host_status(host, registered):
+    if not host["mac"]:
+        return "unknown"  # no MAC behind a router
+    return "registered" if host["mac"] in registered else "intruder"
+
+
+def _scan_subnet(backend, subnet, registered, listener):
+    hosts = []
+    try:
+        progress = partial(listener.addresses_scanned, subnet)
+        for host in backend.iter_hosts(subnet, progress=progress):
+            host = {**host, "subnet": subnet, "status": _host_status(host, registered)}
+            hosts.append(host)
+            listener.host_found(subnet, host)
+    except Exception as exc:
+        listener.subnet_done(subnet, hosts, exc)
+        raise
+    listener.subnet_done(subnet, hosts, None)
+    return hosts
+
+
+def scan_subnets(subnets, workers=None, backend=None, listener=None, registered=None):
+    """
+    Scan `subnets` concurrently with `backend` (default: SCAN_BACKEND),
+    classifying hosts against `registered` MACs (default: all devices).
+    Returns ({subnet: hosts}, {subnet: error}) for the subnets that were
+    scanned and the ones that failed.
+    """
+    backend = backend or get_backend()
+    listener = listener or ScanListener()
+    if registered is None:
+        registered = registered_macs()
+    subnets = list(dict.fromkeys(subnets))
+    workers = max(1, min(workers or settings.SCAN_WORKERS, len(subnets) or 1))
+    results, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            subnet: pool.submit(_scan_subnet, backend, subnet, registered, listener)
+            for subnet in subnets
+        }
+        for subnet, future in futures.items():
+            try:
+                results[subnet] = future.result()
+            except Exception as exc:
+                errors[subnet] = exc
+    return results, errors
+
+
+class ScanReport:
+    def __init__(self, hosts, appeared, departed, intruders, errors):
+        self.hosts = hosts          # every host seen, as dicts
+        self.appeared = appeared    # DiscoveredHost rows new in this scan
+        self.departed = departed    # DiscoveredHost rows gone since the last one
+        self.intruders = intruders  # IntruderLog rows created
+        self.errors = errors        # {subnet: exception} of failed scans
+
+
+def _host_key(host):
+    return host["mac"] or f"ip:{host['ip']}"
+
+
+def _diff(results, now, network=None):
+    """DiscoveredHost rows to create / update for the scanned subnets of `network`."""
+    known = {
+        (row.subnet, row.host_key): row
+        for row in DiscoveredHost.objects.filter(network=network, subnet__in=list(results))
+    }
+    seen = set()
+    hosts, to_create, to_update, appeared, departed = [], [], [], [], []
+
+    for subnet, subnet_hosts in results.items():
+        for host in subnet_hosts:
+            key = (subnet, _host_key(host))
+            if key in seen:
+                continue
+            seen.add(key)
+            is_registered = host["status"] == "registered"
+            hosts.append(host)
+
+            row = known.get(key)
+            if row is None:
+                row = DiscoveredHost(
+                    network=network,
+                    subnet=subnet,
+                    host_key=key[1],
+                    ip_address=host["ip"],
+                    mac_address=host["mac"],
+                    registered=is_registered,
+                    present=True,
+                    first_seen=now,
+                )
+                to_create.append(row)
+                appeared.append(row)
+            elif not row.present:
+                row.present, row.first_seen, row.departed_at = True, now, None
+                row.ip_address, row.registered = host["ip"], is_registered
+                to_update.append(row)
+                appeared.append(row)
+            elif row.ip_address != host["ip"] or row.registered != is_registered:
+                row.ip_address, row.registered = host["ip"], is_registered
+                to_update.append(row)
+
+    for key, row in known.items():
+        if row.present and key not in seen:
+            row.present, row.departed_at = False, now
+            to_update.append(row)
+            departed.append(row)
+
+    return hosts, to_create, to_update, appeared, departed
+
+
+def run_scan(subnets=None, workers=None, backend=None, listener=None, network=None):
+    """
+    Scan `subnets` and record what changed. With a `network`, its subnets
+    are the default and intruders are logged against it (and show up on
+    its live view); otherwise SCAN_SUBNETS are scanned.
+    """
+    if not subnets:
+        subnets = network.subnet_list if network is not None else settings.SCAN_SUBNETS
+    listener = listener or ScanListener()
+    listener.scan_started(subnets)
+
+    # On a company's network, only that company's devices are registered
+    registered = known_macs(network.company_id) if network is not None else None
+    results, errors = scan_subnets(subnets, workers, backend, listener, registered)
+    now = timezone.now()
+
+    with transaction.atomic():
+        hosts, to_create, to_update, appeared, departed = _diff(results, now, network)
+        DiscoveredHost.objects.bulk_create(to_create)
+        DiscoveredHost.objects.bulk_update(
+            to_update, ["ip_address", "registered", "present", "first_seen", "departed_at"]
+        )
+        intruders = IntruderLog.objects.bulk_create([
+            IntruderLog(
+                network=network,
+                company_id=network.company_id if network is not None else None,
+                ip_address=row.ip_address,
+                mac_address=row.mac_address,
+            )
+            for row in appeared
+            if row.mac_address and not row.registered
+        ])
+        # bulk_create skips the post_save live-view and dashboard signals;
+        # the deltas also bump the live version get_network_status' ETag uses
+        if network is not None and intruders:
+            for log in intruders:
+                queue_delta(network.id, "intruder_detected", serialize_intruder(log))
+            invalidate_admin_dashboard(network.company_id)
+
+    report = ScanReport(hosts, appeared, departed, intruders, errors)
+    listener.scan_done(report)
+    return report
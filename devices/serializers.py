@@ -1,8 +1,48 @@
 # devices/serializers.py
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from .models import Device
 
-class DeviceSerializer(serializers.ModelSerializer):
+
+class SparseFieldsMixin:
+    """`?fields=id,mac_address,status` returns only those fields."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        wanted = request.query_params.get("fields") if request is not None else None
+        if wanted:
+            wanted = {name.strip() for name in wanted.split(",")}
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
+
+
+class DeviceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # Needs select_related("user") on the queryset, or it is a query per device
+    user_email = serializers.EmailField(source="user.email", read_only=True, default=None)
+
     class Meta:
         model = Device
         fields = '__all__'
+        read_only_fields = ("company",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Devices can only be assigned to users of the requester's company
+        request = self.context.get("request")
+        if "user" in self.fields and request is not None:
+            self.fields["user"].queryset = get_user_model().objects.filter(
+                company_id=request.user.company_id
+            )
+
+
+class DeviceBulkUpdateSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=900,  # SQLite's 999 bound parameters
+    )
+    is_blocked = serializers.BooleanField()
+
+
+class HeartbeatSerializer(serializers.Serializer):
+    mac_address = serializers.CharField(max_length=32)
+    ip_address = serializers.IPAddressField(required=False, allow_null=True)
@@ -0,0 +1,27 @@
+# devices/signals.py
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import Device
+from .registry import invalidate_mac_registry
+
+
+@receiver(post_init, sender=Device)
+def remember_device_registry(sender, instance, **kwargs):
+    # __dict__ so a deferred field is not loaded just for this
+    instance._original_company_id = instance.__dict__.get("company_id")
+    instance._original_mac_address = instance.__dict__.get("mac_address")
+
+
+@receiver(post_save, sender=Device)
+def device_saved(sender, instance, created, **kwargs):
+    moved = instance.company_id != instance._original_company_id
+    if created or moved or instance.mac_address != instance._original_mac_address:
+        invalidate_mac_registry(instance.company_id, instance._original_company_id)
+    instance._original_company_id = instance.company_id
+    instance._original_mac_address = instance.mac_address
+
+
+@receiver(post_delete, sender=Device)
+def device_deleted(sender, instance, **kwargs):
+    invalidate_mac_registry(instance.company_id)
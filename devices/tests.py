@@ -1,3 +1,421 @@
-from django.test import TestCase
+from datetime import timedelta
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.apps import apps
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from alerts.models import IntruderLog
+from companies.models import Company
+from networks.models import Network
+from .imports import import_devices
+from .models import Device, DiscoveredHost
+from . import heartbeats, scan_stream
+from .scan_backends import FakeBackend
+from .scan_stream import ScanStream
+from .scanner import run_scan
+
+SUBNET = "192.168.1.0/24"
+OWN = {"ip": "192.168.1.10", "mac": "AA-BB-CC-DD-EE-01"}
+INTRUDER = {"ip": "192.168.1.99", "mac": "aa:bb:cc:dd:ee:99"}
+ROUTED = {"ip": "192.168.1.50", "mac": ""}  # behind a router: no MAC
+
+
+class DeviceCompanyTests(TestCase):
+    """Device.company follows the owner's company."""
+
+    def setUp(self):
+        self.acme = Company.objects.create(name="Acme", domain="acme.test")
+        self.globex = Company.objects.create(name="Globex", domain="globex.test")
+        self.bob = User.objects.create(email="bob@acme.test", company=self.acme, role=User.Roles.EMPLOYEE)
+        self.device = Device.objects.create(user=self.bob, mac_address="aa:bb:cc:dd:ee:01")
+
+    def test_new_device_takes_its_owners_company(self):
+        self.assertEqual(self.device.company, self.acme)
+
+    def test_new_owner_brings_their_company(self):
+        carol = User.objects.create(email="carol@globex.test", company=self.globex, role=User.Roles.EMPLOYEE)
+        device = Device.objects.get()
+        device.user = carol
+        device.save(update_fields=["user"])
+
+        self.assertEqual(Device.objects.get().company, self.globex)
+
+    def test_owner_moving_company_moves_their_devices(self):
+        self.bob.company = self.globex
+        self.bob.save()
+
+        self.assertEqual(Device.objects.get().company, self.globex)
+
+    def test_company_listing_needs_no_join(self):
+        devices = Device.objects.filter(company=self.acme)
+
+        self.assertNotIn("JOIN", str(devices.query))
+        self.assertEqual(list(devices), [self.device])
+
+class FakeBackendScanTests(TestCase):
+    """run_scan driven by the deterministic FakeBackend."""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Acme", domain="acme.test")
+        self.admin = User.objects.create(email="admin@acme.test", company=self.company, role=User.Roles.ADMIN)
+        Device.objects.create(user=self.admin, mac_address=OWN["mac"])
+        self.network = Network.objects.create(company=self.company, name="Office", subnets=SUBNET)
+
+    def scan(self, *hosts, network=None):
+        return run_scan(backend=FakeBackend({SUBNET: list(hosts)}), network=network or self.network)
+
+    def test_first_scan_reports_every_host_as_appeared(self):
+        report = self.scan(OWN, INTRUDER, ROUTED)
+
+        self.assertEqual(len(report.hosts), 3)
+        self.assertEqual(len(report.appeared), 3)
+        self.assertEqual(report.departed, [])
+        self.assertEqual(
+            {host["status"] for host in report.hosts}, {"registered", "intruder", "unknown"}
+        )
+
+    def test_intruder_is_logged_once_against_the_network(self):
+        first = self.scan(OWN, INTRUDER)
+        second = self.scan(OWN, INTRUDER)
+
+        self.assertEqual(len(first.intruders), 1)
+        self.assertEqual(second.intruders, [])
+        log = IntruderLog.objects.get()
+        self.assertEqual(log.mac_address, INTRUDER["mac"])
+        self.assertEqual(log.network, self.network)
+        self.assertEqual(log.company, self.company)
+
+    def test_steady_scan_changes_nothing(self):
+        self.scan(OWN, INTRUDER)
+        report = self.scan(OWN, INTRUDER)
+
+        self.assertEqual(report.appeared, [])
+        self.assertEqual(report.departed, [])
+
+    def test_host_that_stops_answering_departs_and_can_reappear(self):
+        self.scan(OWN, INTRUDER)
+
+        gone = self.scan(OWN)
+        self.assertEqual([row.mac_address for row in gone.departed], [INTRUDER["mac"]])
+        self.assertFalse(DiscoveredHost.objects.get(mac_address=INTRUDER["mac"]).present)
+
+        back = self.scan(OWN, INTRUDER)
+        self.assertEqual([row.mac_address for row in back.appeared], [INTRUDER["mac"]])
+        self.assertEqual(len(back.intruders), 1)
+        self.assertEqual(IntruderLog.objects.count(), 2)
+
+    def test_failed_subnet_does_not_depart_its_hosts(self):
+        class FailingBackend(FakeBackend):
+            def iter_hosts(self, subnet, progress=None):
+                raise OSError("scan failed")
+
+        self.scan(OWN, INTRUDER)
+        report = run_scan(backend=FailingBackend(), network=self.network)
+
+        self.assertIn(SUBNET, report.errors)
+        self.assertEqual(report.departed, [])
+        self.assertEqual(DiscoveredHost.objects.filter(present=True).count(), 2)
+
+    def test_networks_sharing_a_range_keep_their_own_state(self):
+        other_company = Company.objects.create(name="Globex", domain="globex.test")
+        other_network = Network.objects.create(company=other_company, name="HQ", subnets=SUBNET)
+
+        self.scan(INTRUDER)
+        report = self.scan(INTRUDER, network=other_network)
+
+        self.assertEqual(len(report.appeared), 1)
+        self.assertEqual(len(report.intruders), 1)
+        self.assertEqual(IntruderLog.objects.filter(company=other_company).count(), 1)
+        self.assertEqual(IntruderLog.objects.filter(company=self.company).count(), 1)
+
+    def test_registered_only_within_the_scanning_company(self):
+        other_company = Company.objects.create(name="Globex", domain="globex.test")
+        other_network = Network.objects.create(company=other_company, name="HQ", subnets=SUBNET)
+
+        # Acme's device is a stranger on Globex's network
+        report = self.scan(OWN, network=other_network)
+
+        self.assertEqual(report.hosts[0]["status"], "intruder")
+        self.assertEqual(len(report.intruders), 1)
+
+
+class ScanNetworkCommandTests(TestCase):
+    """scan_network refuses to run with nothing to scan."""
+
+    @override_settings(SCAN_SUBNETS=[])
+    def test_no_targets_and_no_network(self):
+        with self.assertRaisesMessage(CommandError, "SCAN_SUBNETS is empty"):
+            call_command("scan_network")
+
+    def test_network_without_subnets(self):
+        company = Company.objects.create(name="Acme", domain="acme.test")
+        network = Network.objects.create(company=company, name="Office", subnets="")
+
+        with self.assertRaisesMessage(CommandError, f"Network {network.pk} has no subnets"):
+            call_command("scan_network", network=network.pk)
+
+class NormalizeMACMigrationTests(TestCase):
+    """The MAC normalization data migration (devices 0007)."""
+
+    def setUp(self):
+        company = Company.objects.create(name="Acme", domain="acme.test")
+        self.user = User.objects.create(email="admin@acme.test", company=company, role=User.Roles.ADMIN)
+
+    def device_with_raw_mac(self, mac):
+        device = Device.objects.create(user=self.user, mac_address="00:00:00:00:00:00")
+        with connection.cursor() as cursor:  # the field would normalize it
+            cursor.execute("UPDATE devices_device SET mac_address = %s WHERE id = %s", [mac, device.pk])
+        return device
+
+    def migrate(self):
+        migration = import_module("devices.migrations.0007_normalize_mac_addresses")
+        with mock.patch("builtins.print") as printed:
+            migration.normalize_device_macs(apps, None)
+        return "\n".join(str(call.args[0]) for call in printed.call_args_list)
+
+    def test_colliding_mac_is_flagged_and_reported(self):
+        kept = Device.objects.create(user=self.user, mac_address="aa:bb:cc:dd:ee:01")
+        duplicate = self.device_with_raw_mac("AA-BB-CC-DD-EE-01")
+        fixed = self.device_with_raw_mac("AABB.CCDD.EE02")
+
+        report = self.migrate()
+
+        fixed.refresh_from_db()
+        self.assertEqual(fixed.mac_address, "aa:bb:cc:dd:ee:02")
+        duplicate.refresh_from_db()
+        self.assertEqual(duplicate.status, "pending")
+        self.assertIn(f"device {duplicate.pk} (AA-BB-CC-DD-EE-01) duplicates device {kept.pk}", report)
+        kept.refresh_from_db()
+        self.assertEqual(kept.status, "offline")
+
+class ScanStreamProgressTests(TestCase):
+    """scan_progress events of a ScanStream following a FakeBackend scan."""
+
+    def setUp(self):
+        company = Company.objects.create(name="Acme", domain="acme.test")
+        self.network = Network.objects.create(company=company, name="Office", subnets=SUBNET)
+
+    def progress(self, *hosts):
+        stream = ScanStream(self.network.id)
+        sent = []
+        with mock.patch.object(stream, "_send", sent.extend), \
+                mock.patch.object(scan_stream, "FLUSH_INTERVAL", 0):
+            run_scan(backend=FakeBackend({SUBNET: list(hosts)}), network=self.network, listener=stream)
+        return [event["percent"] for event in sent if event["type"] == "scan_progress"]
+
+    def test_single_subnet_progress_advances_while_sweeping(self):
+        percents = self.progress(OWN, ROUTED, INTRUDER)
+
+        # 192.168.1.10, .50, .99 of 256 addresses, then the subnet is done
+        self.assertEqual(list(dict.fromkeys(percents)), [4, 19, 39, 100])
+        self.assertEqual(percents, sorted(percents))
+
+    def test_progress_never_passes_the_subnet_size(self):
+        percents = self.progress(OWN, {"ip": "10.0.0.1", "mac": ""})
+
+        self.assertTrue(all(percent <= 100 for percent in percents))
+        self.assertEqual(percents[-1], 100)
+
+
+class DeviceAPITests(TestCase):
+    """The /api/devices/ endpoints."""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Acme", domain="acme.test")
+        self.admin = User.objects.create(email="admin@acme.test", company=self.company, role=User.Roles.ADMIN)
+        self.employee = User.objects.create(email="bob@acme.test", company=self.company, role=User.Roles.EMPLOYEE)
+        other_company = Company.objects.create(name="Globex", domain="globex.test")
+        self.outsider = User.objects.create(email="admin@globex.test", company=other_company, role=User.Roles.ADMIN)
+
+        self.devices = [
+            Device.objects.create(user=self.admin, mac_address=f"aa:bb:cc:dd:ee:{n:02x}") for n in range(3)
+        ]
+        self.employee_device = Device.objects.create(
+            user=self.employee, mac_address="aa:bb:cc:dd:ee:10", status="online",
+            last_seen=timezone.now(),
+        )
+        self.foreign_device = Device.objects.create(user=self.outsider, mac_address="aa:bb:cc:dd:ee:20")
+        self.client = APIClient()
+
+    def get(self, requester, url="/api/devices/", **params):
+        self.client.force_authenticate(requester)
+        return self.client.get(url, params)
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200, response.data)
+        return [device["id"] for device in response.data["results"]]
+
+    def test_admin_lists_the_company_devices_only(self):
+        ids = self.ids(self.get(self.admin))
+
+        self.assertEqual(ids, [device.id for device in [*self.devices, self.employee_device]])
+
+    def test_employee_lists_own_devices_only(self):
+        self.assertEqual(self.ids(self.get(self.employee)), [self.employee_device.id])
+
+    def test_other_company_device_is_not_found(self):
+        response = self.get(self.admin, f"/api/devices/{self.foreign_device.id}/")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_pages_cover_every_device_once(self):
+        response = self.get(self.admin, page_size=2)
+        seen = self.ids(response)
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            seen += self.ids(response)
+
+        self.assertEqual(seen, [device.id for device in [*self.devices, self.employee_device]])
+
+    def test_filters(self):
+        Device.objects.filter(pk=self.devices[0].pk).update(is_blocked=True)
+        hour_ago = (timezone.now() - timedelta(hours=1)).isoformat()
+
+        self.assertEqual(self.ids(self.get(self.admin, status="online")), [self.employee_device.id])
+        self.assertEqual(self.ids(self.get(self.admin, is_blocked="true")), [self.devices[0].id])
+        self.assertEqual(self.ids(self.get(self.admin, user=self.employee.id)), [self.employee_device.id])
+        self.assertEqual(
+            self.ids(self.get(self.admin, last_seen_after=hour_ago)), [self.employee_device.id]
+        )
+        self.assertEqual(self.ids(self.get(self.admin, last_seen_before=hour_ago)), [])
+
+    def test_bad_filter_value_is_rejected(self):
+        self.assertEqual(self.get(self.admin, status="lost").status_code, 400)
+        self.assertEqual(self.get(self.admin, is_blocked="maybe").status_code, 400)
+        self.assertEqual(self.get(self.admin, last_seen_after="yesterday").status_code, 400)
+
+    def test_fields_limits_the_output(self):
+        response = self.get(self.admin, fields="id,mac_address")
+
+        self.assertEqual(response.status_code, 200)
+        for device in response.data["results"]:
+            self.assertEqual(set(device), {"id", "mac_address"})
+
+    def test_bulk_block_reports_ids_it_cannot_see(self):
+        self.client.force_authenticate(self.admin)
+        ids = [self.devices[0].id, self.devices[1].id, self.foreign_device.id, 999999]
+
+        response = self.client.patch("/api/devices/bulk/", {"ids": ids, "is_blocked": True}, format="json")
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["updated"], 2)
+        self.assertEqual(sorted(response.data["ids"]), [self.devices[0].id, self.devices[1].id])
+        self.assertEqual(response.data["not_found"], sorted([self.foreign_device.id, 999999]))
+        self.assertEqual(
+            set(Device.objects.filter(is_blocked=True).values_list("id", flat=True)),
+            {self.devices[0].id, self.devices[1].id},
+        )
+
+    def test_bulk_block_is_for_admins(self):
+        self.client.force_authenticate(self.employee)
+
+        response = self.client.patch(
+            "/api/devices/bulk/", {"ids": [self.employee_device.id], "is_blocked": True}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Device.objects.get(pk=self.employee_device.pk).is_blocked)
+
+
+class DeviceImportTests(TestCase):
+    """import_devices against existing users and devices."""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Acme", domain="acme.test")
+        self.admin = User.objects.create(email="admin@acme.test", company=self.company, role=User.Roles.ADMIN)
+        self.owner = User.objects.create(email="Bob.Smith@Acme.test", company=self.company, role=User.Roles.EMPLOYEE)
+
+    def rows(self, *rows):
+        return [
+            (line, {"mac_address": mac, "ip_address": "", "name": "", "owner": owner})
+            for line, (mac, owner) in enumerate(rows, start=2)
+        ]
+
+    def test_owner_email_matches_any_case(self):
+        result = import_devices(
+            self.rows(("aa:bb:cc:00:00:01", "bob.smith@acme.test"), ("aa:bb:cc:00:00:02", "BOB.SMITH@ACME.TEST")),
+            self.company, default_owner=self.admin,
+        )
+
+        self.assertEqual(result.errors, [])
+        self.assertEqual(result.created, 2)
+        self.assertEqual(Device.objects.filter(user=self.owner).count(), 2)
+
+    def test_mac_registered_concurrently_is_reported_not_raised(self):
+        raced = "aa:bb:cc:00:00:02"
+        bulk_create = Device.objects.bulk_create
+
+        def racing(devices, *args, **kwargs):
+            # Another request registered `raced` after the duplicate check
+            if any(device.mac_address == raced for device in devices):
+                raise IntegrityError("UNIQUE constraint failed: devices_device.mac_address")
+            return bulk_create(devices, *args, **kwargs)
+
+        with mock.patch.object(Device.objects, "bulk_create", side_effect=racing):
+            result = import_devices(
+                self.rows(("aa:bb:cc:00:00:01", ""), (raced, ""), ("aa:bb:cc:00:00:03", "")),
+                self.company, default_owner=self.admin,
+            )
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.errors, [(3, raced, "Already registered.")])
+        self.assertEqual(
+            set(Device.objects.values_list("mac_address", flat=True)),
+            {"aa:bb:cc:00:00:01", "aa:bb:cc:00:00:03"},
+        )
+
+
+@override_settings(DEVICE_HEARTBEAT_FLUSH_INTERVAL=10, DEVICE_HEARTBEAT_TIMEOUT=90)
+class HeartbeatTests(TestCase):
+    """Write-behind heartbeats and the offline sweep."""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Acme", domain="acme.test")
+        admin = User.objects.create(email="admin@acme.test", company=self.company, role=User.Roles.ADMIN)
+        self.device = Device.objects.create(user=admin, mac_address=OWN["mac"])
+        self.addCleanup(heartbeats._buffer.drain)
+        patcher = mock.patch.object(heartbeats, "_schedule_flush")
+        self.schedule_flush = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_first_beat_into_an_empty_buffer_arms_the_timer(self):
+        heartbeats.record_heartbeat(self.company.id, OWN["mac"])
+        heartbeats.record_heartbeat(self.company.id, OWN["mac"], "192.168.1.10")
+        self.assertEqual(self.schedule_flush.call_count, 1)
+
+        heartbeats.flush_heartbeats()
+        heartbeats.record_heartbeat(self.company.id, OWN["mac"])
+        self.assertEqual(self.schedule_flush.call_count, 2)
+
+    def test_flush_writes_last_seen_and_brings_the_device_online(self):
+        heartbeats.record_heartbeat(self.company.id, OWN["mac"], "192.168.1.10")
+
+        self.assertEqual(heartbeats.flush_heartbeats(), (1, 1))
+
+        self.device.refresh_from_db()
+        self.assertEqual(self.device.status, "online")
+        self.assertEqual(self.device.ip_address, "192.168.1.10")
+        self.assertIsNotNone(self.device.last_seen)
+
+    def test_unregistered_mac_is_rejected(self):
+        with self.assertRaises(ValueError):
+            heartbeats.record_heartbeat(self.company.id, INTRUDER["mac"])
+
+    def test_sweep_marks_silent_devices_offline(self):
+        Device.objects.filter(pk=self.device.pk).update(
+            status="online", last_seen=timezone.now() - timedelta(seconds=120)
+        )
+
+        self.assertEqual(heartbeats.sweep_offline_devices(), 1)
+        self.assertEqual(Device.objects.get(pk=self.device.pk).status, "offline")
+
+    def test_sweep_refuses_a_timeout_shorter_than_buffered_beats_can_lag(self):
+        with self.assertRaises(ImproperlyConfigured):
+            heartbeats.sweep_offline_devices(timeout=30)
@@ -6,4 +6,5 @@ urlpatterns = [
     path("device/<int:pk>/update/", views.update_device, name="update_device"),
     path("device/<int:pk>/delete/", views.delete_device, name="delete_device"),
     path('register-device/', views.register_device, name='register_device'),
+    path("import-devices/", views.import_devices, name="import_devices"),
 ]
@@ -1,44 +1,54 @@
 # devices/utils.py
-import nmap
-from django.utils import timezone
-from .models import Device, IntruderLog
-
-def scan_network_and_log_intruders():
-    nm = nmap.PortScanner()
-    # Adjust subnet to your network range
-    nm.scan(hosts="192.168.1.0/24", arguments="-sn")  # Ping scan
-
-    for host in nm.all_hosts():
-        mac = nm[host]['addresses'].get('mac', None)
-        ip = nm[host]['addresses'].get('ipv4', None)
-
-        if mac:
-            # Check if this MAC is in the registered devices
-            registered = Device.objects.filter(mac_address__iexact=mac).exists()
-
-            if not registered:
-                IntruderLog.objects.create(
-                    ip_address=ip,
-                    mac_address=mac,
-                    detected_at=timezone.now()
-                )
-
-
-
-from django.core.mail import send_mail
-
-def scan_network():
-    results = scan_network_and_log_intruders()  # Your existing scan function
-    intruders = [device for device in results if device["status"] == "intruder"]
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from notifications.outbox import queue_email
+from notifications.utils import create_notifications_bulk
+from .scan_stream import ScanStream
+from .scanner import run_scan
+
+
+def scan_network_and_log_intruders(subnets=None, workers=None, backend=None, network=None):
+    """
+    Scan the subnets (default: the network's, else SCAN_SUBNETS); see
+    devices/scanner.py. A network's monitors watch the scan live.
+    """
+    listener = ScanStream(network.id) if network is not None else None
+    return run_scan(subnets, workers, backend, listener, network)
+
+
+def notify_intruders(report, network=None):
+    """
+    Tell the network's company admins (in-app and by mail) about the
+    intruders a scan just logged; SCAN_ALERT_RECIPIENTS are mailed for
+    scans not tied to a network.
+    """
+    # Only intruders that just appeared; ones still connected were reported before
+    intruders = report.intruders
+    if not intruders:
+        return
+
+    recipients = list(settings.SCAN_ALERT_RECIPIENTS)
+    if network is not None:
+        User = get_user_model()
+        admins = list(network.company.users.filter(role=User.Roles.ADMIN))
+        create_notifications_bulk(
+            admins,
+            f"🚨 {len(intruders)} unregistered device(s) found on '{network.name}'.",
+            link="/admin/intruder-logs/",
+        )
+        recipients = [admin.email for admin in admins]
 
-    if intruders:
-        message = "\n".join([f"{d['ip']} ({d['mac']})" for d in intruders])
-        send_mail(
+    if recipients:
+        message = "\n".join([f"{log.ip_address} ({log.mac_address})" for log in intruders])
+        queue_email(
             subject="Intruder Detected on Network",
-            message=f"Intruder(s) found:\n\n{message}",
-            from_email=None,
-            recipient_list=["admin@example.com"],
-            fail_silently=False,
+            body=f"Intruder(s) found:\n\n{message}",
+            recipients=recipients,
         )
 
-    return results
+
+def scan_network(subnets=None, workers=None, backend=None, network=None):
+    report = scan_network_and_log_intruders(subnets, workers, backend, network)
+    notify_intruders(report, network)
+    return report
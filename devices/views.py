@@ -1,7 +1,14 @@
 # devices/views.py
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
 from .models import Device
-from .serializers import DeviceSerializer
+from .serializers import DeviceSerializer, DeviceBulkUpdateSerializer, HeartbeatSerializer
+from .bulk import set_blocked
+from .heartbeats import flush_heartbeats, record_heartbeat
+from .filters import DeviceFilterBackend
+from .pagination import DeviceCursorPagination
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect
 from django.contrib import messages
@@ -11,15 +18,97 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from .models import Device, DeviceLog
-from .forms import DeviceRegistrationForm
+from .forms import DeviceRegistrationForm, DeviceImportForm
+from .imports import DeviceImportError, format_for, import_devices as run_import, iter_device_rows
+from accounts.decorators import company_admin_required
+from django.http import JsonResponse
+import io
 
 
 User = get_user_model()
 
 class DeviceViewSet(viewsets.ModelViewSet):
-    queryset = Device.objects.all()
+    """
+    Devices of the requester's company (company admins) or the requester's
+    own devices (everyone else), cursor-paginated. See devices/filters.py
+    for the filters; `?fields=a,b` limits the fields returned.
+    """
     serializer_class = DeviceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = DeviceCursorPagination
+    filter_backends = [DeviceFilterBackend]
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.company_id is None:
+            return Device.objects.none()
+        devices = Device.objects.filter(company_id=user.company_id).select_related("user")
+        if not user.is_company_admin():
+            devices = devices.filter(user=user)
+        return devices
+
+    def _owner(self, serializer):
+        """Admins may assign a device to any user of the company; others own theirs."""
+        user = self.request.user
+        if user.is_company_admin():
+            return serializer.validated_data.get("user", getattr(serializer.instance, "user", None)) or user
+        return user
+
+    def perform_create(self, serializer):
+        serializer.save(user=self._owner(serializer), company=self.request.user.company)
+
+    def perform_update(self, serializer):
+        serializer.save(user=self._owner(serializer))
+
+    @action(detail=False, methods=["patch"], url_path="bulk")
+    def bulk_update(self, request):
+        """
+        Block or unblock many devices in one transaction:
+        `PATCH {"ids": [...], "is_blocked": true}`.
+        """
+        if not request.user.is_company_admin():
+            raise PermissionDenied("Only company admins can block devices.")
+        serializer = DeviceBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+        devices = self.get_queryset().filter(id__in=ids)
+        changed = set_blocked(devices, serializer.validated_data["is_blocked"], request.user.company_id)
+        return Response({
+            "updated": len(changed),
+            "ids": changed,
+            "not_found": sorted(set(ids) - set(devices.values_list("id", flat=True))),
+        })
+
+    @action(detail=False, methods=["post"])
+    def heartbeat(self, request):
+        """
+        An agent reporting its device(s) alive: `{"mac_address", "ip_address"}`
+        or a list of them. Buffered and written in batches (devices/heartbeats.py).
+        """
+        if request.user.company_id is None:
+            raise PermissionDenied("Heartbeats come from devices of a company.")
+        if isinstance(request.data, list):
+            serializer = HeartbeatSerializer(data=request.data, many=True, max_length=1000)
+            serializer.is_valid(raise_exception=True)
+            beats = serializer.validated_data
+        else:
+            serializer = HeartbeatSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            beats = [serializer.validated_data]
+
+        accepted, errors, due = 0, [], False
+        for beat in beats:
+            try:
+                due = record_heartbeat(
+                    request.user.company_id, beat["mac_address"], beat.get("ip_address")
+                ) or due
+            except ValueError as exc:
+                errors.append({"mac_address": beat["mac_address"], "error": str(exc)})
+            else:
+                accepted += 1
+        if due:
+            flush_heartbeats()
+        return Response({"accepted": accepted, "errors": errors}, status=202)
 
 
 @login_required
@@ -96,3 +185,45 @@ def register_device(request):
 
     return render(request, "companies/devices/register_device.html", {"form": form})
 
+
+@login_required
+@company_admin_required
+def import_devices(request):
+    """
+    Register many devices at once from an uploaded CSV / JSON / NDJSON file
+    (e.g. an MDM export), or from a JSON body (answered in JSON).
+    """
+    if request.method == "POST" and request.content_type == "application/json":
+        try:
+            result = run_import(
+                iter_device_rows(io.BytesIO(request.body), "json"),
+                request.user.company, default_owner=request.user,
+            )
+        except DeviceImportError as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+        return JsonResponse({
+            "created": result.created,
+            "errors": [
+                {"line": line, "mac_address": mac, "error": error}
+                for line, mac, error in result.errors
+            ],
+        })
+
+    result = None
+    if request.method == "POST":
+        form = DeviceImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data["file"]
+            try:
+                result = run_import(
+                    iter_device_rows(upload.file, format_for(upload.name)),
+                    request.user.company, default_owner=request.user,
+                )
+            except DeviceImportError as exc:
+                form.add_error("file", str(exc))
+            else:
+                messages.success(request, f"{result.created} device(s) imported.")
+    else:
+        form = DeviceImportForm()
+
+    return render(request, "companies/devices/import_devices.html", {"form": form, "result": result})
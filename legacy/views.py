@@ -37,7 +37,7 @@ from django.contrib import messages
 from django.utils import timezone
 from alerts.models import IntruderLog
 from networks.models import NetworkMembership, Network
-from notifications.utils import create_notification  # assuming you already have this
+from notifications.utils import create_notifications_bulk  # assuming you already have this
 
 @csrf_exempt
 def attempt_connect(request, network_id):
@@ -70,12 +70,11 @@ def attempt_connect(request, network_id):
             role__in=["admin", "manager"]
         ).select_related("user")
 
-        for member in admins_managers:
-            create_notification(
-                member.user,
-                f"🚨 Intruder detected on '{network.name}'. System blocked their attempt.",
-                link="/n/admin/networks/unauthorized/"  # link to unauthorized attempts page    
-            )
+        create_notifications_bulk(
+            [member.user for member in admins_managers],
+            f"🚨 Intruder detected on '{network.name}'. System blocked their attempt.",
+            link="/n/admin/networks/unauthorized/"  # link to unauthorized attempts page
+        )
     except Network.DoesNotExist:
         pass  # safe guard if invalid network_id
 
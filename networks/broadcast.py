@@ -0,0 +1,202 @@
+# networks/broadcast.py
+"""
+Transaction-aware buffer for channel layer broadcasts.
+
+Signal handlers queue their group messages and live-view deltas here
+instead of calling `group_send` once per saved row. Queued messages are
+coalesced per object (only the last update of a device, request,
+membership... is kept) and sent together:
+
+- inside `transaction.atomic`: when the transaction commits, and not at
+  all if it (or the savepoint they were queued in) rolls back;
+- inside `broadcast_batch()` (every request, via BroadcastBatchMiddleware):
+  when the batch ends;
+- anywhere else: immediately.
+
+A flush is one event-loop round trip for every group, and each network's
+monitors get one delta carrying all of that network's changes.
+"""
+import asyncio
+import weakref
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+from .live import commit_changes, monitors_group
+
+_local = Local()
+
+# Deltas about the same object replace each other; the rest are kept as is
+_DELTA_KINDS = {
+    "device_upserted": "device",
+    "device_removed": "device",
+    "request_created": "request",
+    "request_decided": "request",
+    "intruder_detected": "intruder",
+    "intruder_removed": "intruder",
+    "members_changed": "members",
+    "network_updated": "network",
+    "presence_changed": "presence",
+}
+
+
+class _Buffer:
+    """Pending group messages and live-view changes, in arrival order."""
+
+    def __init__(self):
+        self.messages = {}  # group -> {key: message}
+        self.changes = {}   # network_id -> {key: change}
+
+    @staticmethod
+    def _put(queue, key, value):
+        # Re-inserting moves the object after anything queued since
+        queue.pop(key, None)
+        queue[key] = value
+
+    def add_message(self, group, key, message):
+        self._put(self.messages.setdefault(group, {}), key, message)
+
+    def add_change(self, network_id, key, change):
+        self._put(self.changes.setdefault(network_id, {}), key, change)
+
+    def merge(self, other):
+        for group, messages in other.messages.items():
+            for key, message in messages.items():
+                self.add_message(group, key, message)
+        for network_id, changes in other.changes.items():
+            for key, change in changes.items():
+                self.add_change(network_id, key, change)
+
+
+def _send(buffer):
+    """Commit the buffered deltas and send everything in one round trip."""
+    sends = []
+    for network_id, changes in buffer.changes.items():
+        delta = commit_changes(network_id, list(changes.values()))
+        sends.append((monitors_group(network_id), {"type": "network.delta", "delta": delta}))
+
+    for group, messages in buffer.messages.items():
+        messages = list(messages.values())
+        if len(messages) == 1:
+            sends.append((group, messages[0]))
+        else:
+            sends.append((group, {"type": "broadcast.batch", "messages": messages}))
+
+    channel_layer = get_channel_layer() if sends else None
+    if channel_layer is None:
+        return
+
+    async def send_all():
+        await asyncio.gather(*(
+            channel_layer.group_send(group, message) for group, message in sends
+        ))
+
+    async_to_sync(send_all)()
+
+
+def _batch_buffer():
+    if getattr(_local, "depth", 0):
+        return _local.buffer
+    return None
+
+
+def _commit_hook(buffer):
+    def hook():
+        target = _batch_buffer()
+        if target is not None:
+            target.merge(buffer)
+        else:
+            _send(buffer)
+    return hook
+
+
+def _transaction_buffer(connection):
+    """
+    Buffer of the open transaction or savepoint, registered with on_commit
+    from inside it, so Django runs or discards it with that savepoint.
+
+    Only Django holds the commit hook; a buffer whose hook was run or
+    dropped is dead. Buffers are kept in the order their hooks will run,
+    and a message goes to the newest one only while it is alive and still
+    belongs to the current savepoint: after a savepoint is released its
+    buffer stays pending, and what comes next starts a new buffer behind it.
+    """
+    key = tuple(connection.savepoint_ids)
+    pending = [entry for entry in getattr(_local, "transaction", []) if entry[1]() is not None]
+    if pending and pending[-1][0] == key:
+        _local.transaction = pending
+        return pending[-1][2]
+
+    buffer = _Buffer()
+    hook = _commit_hook(buffer)
+    transaction.on_commit(hook)
+    _local.transaction = [*pending, (key, weakref.ref(hook), buffer)]
+    return buffer
+
+
+def _queue(add):
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        add(_transaction_buffer(connection))
+        return
+
+    buffer = _batch_buffer()
+    if buffer is not None:
+        add(buffer)
+        return
+
+    buffer = _Buffer()
+    add(buffer)
+    _send(buffer)
+
+
+def queue_broadcast(group, message, key=None):
+    """
+    Send `message` to a channel layer group once the current transaction or
+    batch is done. A later message with the same `key` for the same group
+    replaces this one; `key=None` never coalesces.
+    """
+    key = object() if key is None else key
+    _queue(lambda buffer: buffer.add_message(group, key, message))
+
+
+def queue_delta(network_id, event, data):
+    """
+    Queue one change of a network's live view (see networks.live) for its
+    monitors. Changes about the same device, request or intruder coalesce.
+    """
+    kind = _DELTA_KINDS.get(event)
+    key = object() if kind is None else (kind, data.get("id"))
+    change = {"event": event, "data": data}
+    _queue(lambda buffer: buffer.add_change(network_id, key, change))
+
+
+@contextmanager
+def broadcast_batch():
+    """Hold every broadcast queued inside the block and send them at the end."""
+    depth = getattr(_local, "depth", 0)
+    if not depth:
+        _local.buffer = _Buffer()
+    _local.depth = depth + 1
+    try:
+        yield
+    finally:
+        _local.depth = depth
+        if not depth:
+            buffer, _local.buffer = _local.buffer, None
+            # Rows saved under autocommit are stored even if the block raised
+            _send(buffer)
+
+
+class BroadcastBatchMiddleware:
+    """Send the broadcasts of a request in one batch once the view returns."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with broadcast_batch():
+            return self.get_response(request)
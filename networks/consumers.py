@@ -1,9 +1,15 @@
 # networks/consumers.py
+import asyncio
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
-from .models import Network, NetworkMembership, JoinRequest, Device
+from django.db import transaction
+from .models import Network, NetworkMembership, JoinRequest
+from devices.models import Device
+from .live import build_snapshot
+from .sessions import close_session, open_session, refresh_session
 from alerts.models import IntruderLog
 
 class NetworkVisualizationConsumer(AsyncWebsocketConsumer):
@@ -34,6 +40,12 @@ class NetworkVisualizationConsumer(AsyncWebsocketConsumer):
         await self.accept()
         print(f"Admin {self.user.email} connected to monitor network {self.network_id}")
 
+        # Presence: a session for this socket, kept listed until it closes
+        self.session = await database_sync_to_async(open_session)(
+            int(self.network_id), self.user, self.channel_name
+        )
+        self.presence_task = asyncio.create_task(self.keep_present())
+
         # Send initial state
         initial_state = await self.get_initial_state(self.network_id)
         await self.send(text_data=json.dumps({
@@ -47,6 +59,15 @@ class NetworkVisualizationConsumer(AsyncWebsocketConsumer):
             self.network_group_name,
             self.channel_name
         )
+        if getattr(self, "session", None) is not None:
+            self.presence_task.cancel()
+            await database_sync_to_async(close_session)(self.session, self.channel_name)
+
+    async def keep_present(self):
+        """Refresh this socket's presence entry well within its TTL."""
+        while True:
+            await asyncio.sleep(settings.NETWORK_PRESENCE_TTL / 3)
+            await database_sync_to_async(refresh_session)(self.session, self.channel_name)
 
     @database_sync_to_async
     def is_user_network_admin(self, user, network_id):
@@ -62,37 +83,9 @@ class NetworkVisualizationConsumer(AsyncWebsocketConsumer):
 
     @database_sync_to_async
     def get_initial_state(self, network_id):
-        """Get the initial state of the network."""
+        """Get the initial state of the network (same shape as the status API)."""
         network = Network.objects.get(id=network_id)
-        devices = Device.objects.filter(user__company=network.company)
-        pending_requests = JoinRequest.objects.filter(network_id=network_id, status="pending")
-        
-        return {
-            'devices': [
-                {
-                    'id': device.id,
-                    'name': device.name,
-                    'mac_address': device.mac_address,
-                    'status': device.status,
-                    'user_email': device.user.email if device.user else 'Unassigned'
-                }
-                for device in devices
-            ],
-            'pending_requests': [
-                {
-                    'id': req.id,
-                    'user_email': req.user.email,
-                    'device_name': req.device.name if req.device else 'No device',
-                    'ip_address': req.ip_address,
-                    'created_at': req.created_at.isoformat()
-                }
-                for req in pending_requests
-            ],
-            'network': {
-                'name': network.name,
-                'description': network.description
-            }
-        }
+        return build_snapshot(network)
 
     # Receive message from WebSocket
     async def receive(self, text_data):
@@ -103,6 +96,13 @@ class NetworkVisualizationConsumer(AsyncWebsocketConsumer):
             await self.approve_join_request(text_data_json['request_id'])
         elif message_type == 'reject_request':
             await self.reject_join_request(text_data_json['request_id'])
+        elif message_type == 'resync':
+            # Client detected a gap in delta versions
+            initial_state = await self.get_initial_state(self.network_id)
+            await self.send(text_data=json.dumps({
+                'type': 'initial_state',
+                'data': initial_state
+            }))
 
     # Receive message from room group
     async def network_message(self, event):
@@ -110,24 +110,38 @@ class NetworkVisualizationConsumer(AsyncWebsocketConsumer):
         message = event['message']
         await self.send(text_data=json.dumps(message))
 
+    async def network_delta(self, event):
+        """Forward a versioned live-view delta (see networks.broadcast)."""
+        await self.send(text_data=json.dumps({
+            'type': 'delta',
+            **event['delta']
+        }))
+
+    async def broadcast_batch(self, event):
+        """Unpack several group messages flushed together by networks.broadcast."""
+        for message in event['messages']:
+            await self.dispatch(message)
+
     @database_sync_to_async
     def approve_join_request(self, request_id):
         """Approve a join request."""
-        jr = JoinRequest.objects.get(id=request_id)
-        jr.status = "approved"
-        jr.save()
+        # One transaction so monitors get the whole approval as one delta
+        with transaction.atomic():
+            jr = JoinRequest.objects.get(id=request_id)
+            jr.status = "approved"
+            jr.save()
 
-        # Add user to network
-        NetworkMembership.objects.get_or_create(
-            user=jr.user,
-            network=jr.network,
-            defaults={"role": "employee", "active": True}
-        )
+            # Add user to network
+            NetworkMembership.objects.get_or_create(
+                user=jr.user,
+                network=jr.network,
+                defaults={"role": "employee", "active": True}
+            )
 
-        # Update device status
-        if jr.device:
-            jr.device.status = "online"
-            jr.device.save()
+            # Update device status
+            if jr.device:
+                jr.device.status = "online"
+                jr.device.save()
 
         # Notify the user who was approved
         self.channel_layer.group_send(
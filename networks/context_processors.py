@@ -1,17 +1,15 @@
 # networks/context_processors.py
-from .models import JoinRequest
-from notifications.models import Notification
+from .counters import get_pending_requests_count
+from notifications.counters import get_unread_count
 
 def network_requests_count(request):
     """
     Context processor to add pending join requests count to all templates
     """
-    if request.user.is_authenticated and hasattr(request.user, 'company'):
+    if request.user.is_authenticated and getattr(request.user, 'company_id', None):
         if request.user.is_company_admin:
-            join_requests_count = JoinRequest.objects.filter(
-                network__company=request.user.company, 
-                status="pending"
-            ).count()
+            # Cached per company, kept current by the JoinRequest signals
+            join_requests_count = get_pending_requests_count(request.user.company_id)
         else:
             join_requests_count = 0
     else:
@@ -26,10 +24,8 @@ def unread_notifications_count(request):
     Context processor for unread notifications count
     """
     if request.user.is_authenticated:
-        notifications_unread_count = Notification.objects.filter(
-            user=request.user, 
-            read=False
-        ).count()
+        # Cached per user, kept current by the Notification signals
+        notifications_unread_count = get_unread_count(request.user.id)
     else:
         notifications_unread_count = 0
     
@@ -0,0 +1,40 @@
+# networks/counters.py
+"""
+Cached pending join request count per company, for the admin navbar badge.
+
+Kept up to date by the JoinRequest signals (networks/signals.py) and
+rebuilt from the database on a miss.
+"""
+from django.core.cache import cache
+
+from .models import JoinRequest
+
+# Upper bound on how long a count can drift if an update is missed
+COUNTER_TIMEOUT = 60 * 10
+
+
+def _pending_key(company_id) -> str:
+    return f"networks:pending_requests:{company_id}"
+
+
+def get_pending_requests_count(company_id) -> int:
+    key = _pending_key(company_id)
+    count = cache.get(key)
+    if count is None:
+        count = JoinRequest.objects.filter(
+            network__company_id=company_id, status="pending"
+        ).count()
+        cache.add(key, count, COUNTER_TIMEOUT)
+    return count
+
+
+def adjust_pending_requests_count(company_id, delta):
+    try:
+        cache.incr(_pending_key(company_id), delta)
+    except ValueError:
+        # Not cached; the next read counts from the database
+        pass
+
+
+def reset_pending_requests_count(company_id):
+    cache.delete(_pending_key(company_id))
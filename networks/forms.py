@@ -1,17 +1,34 @@
+import ipaddress
+
 from django import forms
 from .models import Network
 
 class NetworkForm(forms.ModelForm):
     class Meta:
         model = Network
-        fields = ["name", "description", "visibility"]
+        fields = ["name", "description", "visibility", "subnets", "scan_interval", "scan_jitter"]
         widgets = {
             "name": forms.TextInput(attrs={"class": "form-control"}),
             "description": forms.Textarea(attrs={"class": "form-control", "rows": 3}),
             "visibility": forms.Select(attrs={"class": "form-control"}),
+            "subnets": forms.TextInput(attrs={"class": "form-control", "placeholder": "192.168.1.0/24"}),
+            "scan_interval": forms.NumberInput(attrs={"class": "form-control", "min": 0}),
+            "scan_jitter": forms.NumberInput(attrs={"class": "form-control", "min": 0}),
         }
         labels = {
             "name": "Network Name",
             "description": "Description",
             "visibility": "Visibility",
-        }   
\ No newline at end of file
+            "subnets": "Subnets",
+            "scan_interval": "Scan Interval (seconds)",
+            "scan_jitter": "Scan Jitter (seconds)",
+        }
+
+    def clean_subnets(self):
+        subnets = [s.strip() for s in self.cleaned_data["subnets"].split(",") if s.strip()]
+        for subnet in subnets:
+            try:
+                ipaddress.ip_network(subnet, strict=False)
+            except ValueError:
+                raise forms.ValidationError(f"{subnet} is not a valid IP range (e.g. 192.168.1.0/24).")
+        return ", ".join(subnets)   
\ No newline at end of file
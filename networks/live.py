@@ -0,0 +1,335 @@
+# networks/live.py
+"""
+Live network monitoring state.
+
+The live dashboard receives one snapshot of a network when it connects and
+then only versioned deltas pushed from the model signals (batched by
+networks.broadcast), instead of re-querying `get_network_status` every few
+seconds.
+
+Each network's live view (online devices, pending requests, recent
+intruders, member count) is kept in the cache and patched by the same
+deltas, so readers get it without touching the ORM.
+"""
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from alerts.models import IntruderLog
+from devices.models import Device
+from .models import JoinRequest
+from .presence import watcher_count
+
+# Intruders are shown on the live graph for this long after detection
+INTRUDER_WINDOW = timedelta(minutes=1)
+
+# Cached live state is rebuilt from the database at least this often
+STATE_TIMEOUT = 60 * 60
+
+
+def monitors_group(network_id) -> str:
+    """Channel layer group of the admins monitoring a network."""
+    return f"network_{network_id}_monitors"
+
+
+def _version_key(network_id) -> str:
+    return f"networks:live:{network_id}:version"
+
+
+def _state_key(network_id) -> str:
+    return f"networks:live:{network_id}:state"
+
+
+def _modified_key(network_id) -> str:
+    return f"networks:live:{network_id}:modified"
+
+
+def _snapshot_key(network_id) -> str:
+    return f"networks:live:{network_id}:snapshot"
+
+
+def _version_seed() -> int:
+    # Counters start from the clock so a counter lost to cache eviction
+    # never hands out a version (and ETag) that was already used.
+    return int(time.time() * 1000)
+
+
+def get_version(network_id) -> int:
+    """Current change counter of a network's live view."""
+    key = _version_key(network_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _version_seed(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(network_id) -> int:
+    """Increment and return the change counter of a network's live view."""
+    key = _version_key(network_id)
+    cache.set(_modified_key(network_id), time.time(), timeout=None)
+    cache.add(key, _version_seed(), timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Key evicted between add() and incr()
+        version = _version_seed()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def get_version_token(network_id):
+    """
+    (token, last_modified) of a network's live view in one cache round
+    trip, for answering conditional requests without loading the state.
+
+    The token is that of the last snapshot built (see snapshot_token), or
+    None when it is unknown or no longer current: the version moved on, or
+    an intruder it shows has since left INTRUDER_WINDOW. Callers then
+    build a snapshot.
+    """
+    version_key, modified_key = _version_key(network_id), _modified_key(network_id)
+    snapshot_key = _snapshot_key(network_id)
+    cached = cache.get_many([version_key, modified_key, snapshot_key])
+    version = cached.get(version_key)
+    if version is None:
+        version = get_version(network_id)
+    modified = cached.get(modified_key)
+    if modified is None:
+        # Unknown since the cache was cleared: treat as changed now
+        modified = time.time()
+        cache.add(modified_key, modified, timeout=None)
+
+    token = None
+    snapshot = cached.get(snapshot_key)  # (version, expires_at) of the last snapshot
+    if snapshot is not None and snapshot[0] == version:
+        expires_at = snapshot[1]
+        if expires_at is None or expires_at > time.time():
+            token = _token(version, expires_at)
+        else:
+            modified = max(modified, expires_at)
+    return token, datetime.fromtimestamp(modified, tz=dt_timezone.utc)
+
+
+def _token(version, expires_at):
+    return str(version) if expires_at is None else f"{version}-{int(expires_at * 1000)}"
+
+
+def _next_expiry(intruders):
+    """When the first of `intruders` leaves INTRUDER_WINDOW (epoch seconds), or None."""
+    if not intruders:
+        return None
+    detected = min(datetime.fromisoformat(intruder["detected_at"]) for intruder in intruders)
+    return (detected + INTRUDER_WINDOW).timestamp()
+
+
+def snapshot_token(snapshot):
+    """
+    Validator of a snapshot: its version, and when its first intruder
+    expires, since that changes the snapshot without a new version.
+    """
+    return _token(snapshot["version"], _next_expiry(snapshot["intruders"]))
+
+
+# -------------------------
+# Serializers
+# -------------------------
+def serialize_device(device):
+    return {
+        "id": device.id,
+        "name": device.name,
+        "mac_address": device.mac_address,
+        "status": device.status,
+        "user_email": device.user.email if device.user else "Unassigned",
+        "ip_address": device.ip_address,
+    }
+
+
+def serialize_join_request(jr):
+    return {
+        "id": jr.id,
+        "user_email": jr.user.email,
+        "device_name": jr.device.name if jr.device else "No device",
+        "device_mac": jr.device.mac_address if jr.device else "",
+        "ip_address": jr.ip_address,
+        "created_at": jr.created_at.isoformat(),
+        "status": jr.status,
+    }
+
+
+def serialize_intruder(log):
+    return {
+        "id": log.id,
+        "status": "intruder",
+        "ip_address": log.ip_address,
+        "mac_address": log.mac_address or "",
+        "detected_at": log.detected_at.isoformat(),
+        "note": log.note,
+    }
+
+
+def is_device_visible(device) -> bool:
+    """Whether a device is drawn on the live graph of its networks."""
+    return device.status == "online" and not device.is_blocked
+
+
+# -------------------------
+# Live state
+# -------------------------
+def _load_state(network, version):
+    """Rebuild a network's live state from the database."""
+    devices = (
+        Device.objects.filter(
+            user__network_memberships__network=network,
+            user__network_memberships__active=True,
+            status="online",
+            is_blocked=False,
+        )
+        .select_related("user")
+        .distinct()
+    )
+    pending_requests = (
+        JoinRequest.objects.filter(network=network, status="pending")
+        .select_related("user", "device")
+    )
+    intruders = IntruderLog.objects.filter(
+        network=network,
+        status="Detected",
+        detected_at__gte=timezone.now() - INTRUDER_WINDOW,
+    )
+
+    return {
+        "version": version,
+        "devices": {device.id: serialize_device(device) for device in devices},
+        "pending_requests": {req.id: serialize_join_request(req) for req in pending_requests},
+        "intruders": {log.id: serialize_intruder(log) for log in intruders},
+        "network": {
+            "id": network.id,
+            "name": network.name,
+            "description": network.description,
+            "visibility": network.visibility,
+            "member_count": network.memberships.filter(active=True).count(),
+            "watching": watcher_count(network.id),
+        },
+    }
+
+
+def get_live_state(network):
+    """
+    Cached live state of a network, rebuilt only when missing or behind the
+    network's change counter (a delta failed to patch it).
+    """
+    state_key, version_key = _state_key(network.id), _version_key(network.id)
+    cached = cache.get_many([state_key, version_key])
+    state = cached.get(state_key)
+    version = cached.get(version_key)
+    if version is None:
+        version = get_version(network.id)
+
+    if state is None or state["version"] != version:
+        # Version is read before the queries so a change racing with them
+        # leaves the state behind the counter and it is rebuilt next time.
+        state = _load_state(network, version)
+        cache.set(state_key, state, STATE_TIMEOUT)
+    return state
+
+
+def invalidate_live_state(network_id):
+    """Drop a network's cached live state; the next reader rebuilds it."""
+    cache.delete(_state_key(network_id))
+
+
+def build_snapshot(network):
+    """
+    Full live view of a network: online devices of active members, pending
+    join requests and intruders detected within INTRUDER_WINDOW.
+    """
+    state = get_live_state(network)
+    cutoff = timezone.now() - INTRUDER_WINDOW
+    intruders = [
+        intruder for intruder in state["intruders"].values()
+        if datetime.fromisoformat(intruder["detected_at"]) >= cutoff
+    ]
+    # For get_version_token: when this snapshot stops being current
+    cache.set(
+        _snapshot_key(network.id), (state["version"], _next_expiry(intruders)), STATE_TIMEOUT
+    )
+
+    return {
+        "version": state["version"],
+        "devices": list(state["devices"].values()),
+        "pending_requests": list(state["pending_requests"].values()),
+        "intruders": intruders,
+        "flash_message": "🚨 Intruder detected! Their attempt was blocked." if intruders else None,
+        "network": state["network"],
+    }
+
+
+def _apply_change(state, event, data):
+    if event == "device_upserted":
+        state["devices"][data["id"]] = data
+    elif event == "device_removed":
+        state["devices"].pop(data["id"], None)
+    elif event == "request_created":
+        state["pending_requests"][data["id"]] = data
+    elif event == "request_decided":
+        state["pending_requests"].pop(data["id"], None)
+    elif event == "intruder_detected":
+        state["intruders"][data["id"]] = data
+    elif event == "intruder_removed":
+        state["intruders"].pop(data["id"], None)
+    elif event == "intruders_cleared":
+        state["intruders"].clear()
+    elif event == "members_changed":
+        state["network"]["member_count"] = data["member_count"]
+    elif event == "presence_changed":
+        state["network"]["watching"] = data["watching"]
+    elif event == "network_updated":
+        state["network"].update(data)
+
+
+def _apply_changes(network_id, base_version, version, changes):
+    """Patch the cached live state in place of rebuilding it."""
+    key = _state_key(network_id)
+    state = cache.get(key)
+    if state is None:
+        return
+    if state["version"] != base_version:
+        # Missed a change (e.g. another worker patched concurrently)
+        cache.delete(key)
+        return
+
+    for change in changes:
+        _apply_change(state, change["event"], change["data"])
+
+    # Expired intruders only need to leave the cache, not the clients
+    cutoff = timezone.now() - INTRUDER_WINDOW
+    state["intruders"] = {
+        id_: intruder for id_, intruder in state["intruders"].items()
+        if datetime.fromisoformat(intruder["detected_at"]) >= cutoff
+    }
+    state["version"] = version
+    cache.set(key, state, STATE_TIMEOUT)
+
+
+# -------------------------
+# Deltas
+# -------------------------
+def commit_changes(network_id, changes):
+    """
+    Give a batch of changes to a network's live view the next version and
+    patch the cached state with them. Returns the delta for its monitors
+    (sent by networks.broadcast).
+
+    Deltas carry the new version and the version they apply on top of, so a
+    client that missed one can ask for a fresh snapshot.
+    """
+    version = bump_version(network_id)
+    _apply_changes(network_id, version - 1, version, changes)
+    return {
+        "base_version": version - 1,
+        "version": version,
+        "changes": changes,
+    }
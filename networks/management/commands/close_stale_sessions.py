@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from networks.presence import has_shared_cache
+from networks.sessions import close_stale_sessions
+
+
+class Command(BaseCommand):
+    help = "Close live view sessions whose socket is gone (runs until stopped unless --once)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Sweep once, then exit"
+        )
+        parser.add_argument(
+            "--interval", type=float, default=60,
+            help="Seconds between sweeps (default: 60)"
+        )
+
+    def handle(self, *args, **options):
+        if not has_shared_cache():
+            # This process could not see any socket's presence and would close every session
+            raise CommandError(
+                "Presence lives in the cache, and the default cache is per process. "
+                "Set CACHE_REDIS_URL so this command sees the web workers' presence."
+            )
+        try:
+            while True:
+                closed = close_stale_sessions()
+                if closed:
+                    self.stdout.write(f"Closed {closed} stale session(s).")
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS("Session sweeper stopped."))
+
+
+# Usage: python manage.py close_stale_sessions
+#        python manage.py close_stale_sessions --once
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0004_device_device_status_blocked_idx'),
+        ('networks', '0004_delete_unauthorizedattempt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='joinrequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['network', 'created_at'], name='joinreq_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='networkmembership',
+            index=models.Index(fields=['network', 'active'], name='netmember_network_active_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networks', '0005_joinrequest_joinreq_pending_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='network',
+            name='subnets',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
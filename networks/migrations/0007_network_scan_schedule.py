@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networks', '0006_network_subnets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='network',
+            name='last_scanned_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='network',
+            name='scan_interval',
+            field=models.PositiveIntegerField(default=900),
+        ),
+        migrations.AddField(
+            model_name='network',
+            name='scan_jitter',
+            field=models.PositiveIntegerField(default=60),
+        ),
+    ]
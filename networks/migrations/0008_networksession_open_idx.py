@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networks', '0007_network_scan_schedule'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='networksession',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at'], name='netsession_open_idx'),
+        ),
+    ]
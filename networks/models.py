@@ -14,11 +14,22 @@ class Network(models.Model):
         choices=[("company", "Company Only"), ("invite", "Invite Only"), ("public", "Public Discoverable")],
         default="company",
     )
+    # CIDR ranges the network scanner sweeps for this network, comma-separated
+    subnets = models.CharField(max_length=255, blank=True)
+    # manage.py run_scanner scans every `scan_interval` seconds, plus up to
+    # `scan_jitter` seconds at random so networks do not all scan at once
+    scan_interval = models.PositiveIntegerField(default=900)
+    scan_jitter = models.PositiveIntegerField(default=60)
+    last_scanned_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.name} ({self.company.name})"
 
+    @property
+    def subnet_list(self):
+        return [subnet.strip() for subnet in self.subnets.split(",") if subnet.strip()]
+
 class NetworkSession(models.Model):
     """Tracks an active live visualization session for a network."""
     network = models.ForeignKey(Network, on_delete=models.CASCADE, related_name="sessions")
@@ -27,6 +38,16 @@ class NetworkSession(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     ended_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Open sessions (networks/sessions.py sweeps them)
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(is_active=True),
+                name="netsession_open_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"Session for {self.network.name} by {self.created_by.email}"
 
@@ -51,6 +72,10 @@ class NetworkMembership(models.Model):
 
     class Meta:
         unique_together = ("network", "user")
+        indexes = [
+            # Active members of a network (live view, member counts)
+            models.Index(fields=["network", "active"], name="netmember_network_active_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.email} in {self.network.name}"
@@ -80,6 +105,14 @@ class JoinRequest(models.Model):
 
     class Meta:
         unique_together = ("network", "user")
+        indexes = [
+            # Pending requests per network / company (badges, admin queues)
+            models.Index(
+                fields=["network", "created_at"],
+                condition=models.Q(status="pending"),
+                name="joinreq_pending_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"JoinRequest({self.user.email} -> {self.network.name}, {self.status})"
@@ -0,0 +1,94 @@
+# networks/presence.py
+"""
+Who is watching a network's live view right now.
+
+Every open monitor socket (NetworkVisualizationConsumer) has an entry in
+its network's roster, a small dict in the shared cache:
+
+    channel_name -> (user_id, session_id, expires_at)
+
+The consumer refreshes its entry every PRESENCE_TTL / 3 seconds and drops
+it on disconnect; an entry of a socket that died without disconnecting
+(worker killed, network gone) simply expires. Readers ignore expired
+entries, so a count is one cache read and never a query.
+
+Presence needs a cache shared by every process (CACHE_REDIS_URL): with
+the default per-process locmem cache, each worker only sees its own
+sockets and a sweeper process sees none (see has_shared_cache()).
+
+Rosters are read-modify-written without a lock. Two sockets writing at
+the same moment can lose one entry, but its next refresh puts it back, so
+the roster is never wrong for longer than a refresh interval.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Cache backends whose data never leaves the process
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def has_shared_cache() -> bool:
+    """Whether rosters written by one process are visible to the others."""
+    return settings.CACHES["default"]["BACKEND"] not in PROCESS_LOCAL_CACHES
+
+
+def _roster_key(network_id) -> str:
+    return f"networks:presence:{network_id}"
+
+
+def _live(roster, now):
+    return {channel: entry for channel, entry in roster.items() if entry[2] > now}
+
+
+def _write(network_id, update):
+    key = _roster_key(network_id)
+    now = time.time()
+    roster = _live(cache.get(key) or {}, now)
+    update(roster, now)
+    # Outlives its newest entry, so an abandoned roster cleans itself up
+    cache.set(key, roster, settings.NETWORK_PRESENCE_TTL * 2)
+    return roster
+
+
+def touch(network_id, channel_name, user_id, session_id):
+    """Add or refresh a socket's entry; returns the network's roster."""
+    def update(roster, now):
+        roster[channel_name] = (user_id, session_id, now + settings.NETWORK_PRESENCE_TTL)
+    return _write(network_id, update)
+
+
+def leave(network_id, channel_name):
+    """Drop a socket's entry; returns the network's roster."""
+    return _write(network_id, lambda roster, now: roster.pop(channel_name, None))
+
+
+def roster(network_id):
+    """Live entries of a network's roster (channel_name -> (user_id, session_id, expires_at))."""
+    return _live(cache.get(_roster_key(network_id)) or {}, time.time())
+
+
+def watchers(network_id, entries=None) -> set:
+    """Ids of the users watching a network."""
+    entries = roster(network_id) if entries is None else entries
+    return {user_id for user_id, _, _ in entries.values()}
+
+
+def watcher_count(network_id, entries=None) -> int:
+    return len(watchers(network_id, entries))
+
+
+def live_session_ids(network_ids) -> set:
+    """NetworkSession ids that still have a live socket, for many networks in one cache read."""
+    now = time.time()
+    rosters = cache.get_many([_roster_key(network_id) for network_id in set(network_ids)])
+    return {
+        session_id
+        for entries in rosters.values()
+        for _, session_id, expires_at in entries.values()
+        if expires_at > now
+    }
@@ -0,0 +1,115 @@
+# networks/sessions.py
+"""
+Live view sessions and the memberships they keep active.
+
+Opening a monitor socket opens a NetworkSession and lists the socket in
+the network's presence roster (networks/presence.py); closing it ends the
+session. Opening live_network marks the watcher's membership active, so
+when a user's last socket on a network goes away, that membership (an
+admin or manager one; employees' memberships come from join requests and
+are left alone) is made inactive again. Active members are therefore the
+people actually present, and member_count stays small.
+
+Sockets that die without a disconnect leave their session open; their
+roster entry expires, and close_stale_sessions() (manage.py
+close_stale_sessions) closes all such sessions in a few batch UPDATEs.
+That needs the shared cache presence lives in (CACHE_REDIS_URL); with a
+per-process cache the sweeper would see no one watching and refuses to run.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+
+from . import presence
+from .broadcast import queue_delta
+from .models import NetworkMembership, NetworkSession
+from .signals import publish_member_count, publish_member_devices
+
+CHUNK_SIZE = 900  # below SQLite's 999 bound parameters
+MONITOR_ROLES = ("admin", "manager")
+
+
+def _publish_watching(network_id, entries=None):
+    queue_delta(network_id, "presence_changed", {"watching": presence.watcher_count(network_id, entries)})
+
+
+def _release_memberships(network_id, user_ids):
+    """Make the monitor memberships of users no longer watching inactive."""
+    if not user_ids:
+        return
+    memberships = NetworkMembership.objects.filter(
+        network_id=network_id, user_id__in=user_ids, role__in=MONITOR_ROLES, active=True
+    )
+    released = list(memberships.values_list("user_id", flat=True))
+    if not released:
+        return
+    # update() skips the membership signals; publish what they would have
+    memberships.filter(user_id__in=released).update(active=False)
+    for user_id in released:
+        publish_member_devices(network_id, user_id, active=False)
+    publish_member_count(network_id)
+
+
+def open_session(network_id, user, channel_name):
+    """A monitor socket connected: returns its NetworkSession."""
+    with transaction.atomic():
+        session = NetworkSession.objects.create(network_id=network_id, created_by=user)
+        _publish_watching(network_id, presence.touch(network_id, channel_name, user.id, session.id))
+    return session
+
+
+def refresh_session(session, channel_name):
+    """Keep a connected socket listed (every PRESENCE_TTL / 3 seconds)."""
+    presence.touch(session.network_id, channel_name, session.created_by_id, session.id)
+
+
+def close_session(session, channel_name):
+    """A monitor socket disconnected."""
+    with transaction.atomic():
+        entries = presence.leave(session.network_id, channel_name)
+        session.end_session()
+        if session.created_by_id not in presence.watchers(session.network_id, entries):
+            _release_memberships(session.network_id, [session.created_by_id])
+        _publish_watching(session.network_id, entries)
+
+
+def close_stale_sessions():
+    """
+    End open sessions whose socket is gone; returns how many. Refuses to
+    run without a shared cache, where every session would look stale.
+    """
+    if not presence.has_shared_cache():
+        raise ImproperlyConfigured(
+            "Closing stale sessions needs a cache shared by all processes (set CACHE_REDIS_URL)."
+        )
+    # Sessions younger than the TTL may not be in the roster yet
+    cutoff = timezone.now() - timedelta(seconds=settings.NETWORK_PRESENCE_TTL)
+    open_sessions = list(
+        NetworkSession.objects.filter(is_active=True, created_at__lt=cutoff)
+        .values_list("id", "network_id", "created_by_id")
+    )
+    live = presence.live_session_ids(network_id for _, network_id, _ in open_sessions)
+    stale = [session for session in open_sessions if session[0] not in live]
+    if not stale:
+        return 0
+
+    left = defaultdict(set)  # network_id -> users whose stale sessions closed
+    for _, network_id, user_id in stale:
+        left[network_id].add(user_id)
+
+    with transaction.atomic():
+        now = timezone.now()
+        ids = [session_id for session_id, _, _ in stale]
+        for start in range(0, len(ids), CHUNK_SIZE):
+            NetworkSession.objects.filter(id__in=ids[start:start + CHUNK_SIZE]).update(
+                is_active=False, ended_at=now
+            )
+        for network_id, user_ids in left.items():
+            entries = presence.roster(network_id)
+            _release_memberships(network_id, list(user_ids - presence.watchers(network_id, entries)))
+            _publish_watching(network_id, entries)
+    return len(stale)
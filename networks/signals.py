@@ -1,22 +1,94 @@
 # networks/signals.py
-from django.db.models.signals import post_save
+from django.db.models.signals import post_init, post_save, post_delete
 from django.dispatch import receiver
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
-from .models import  NetworkMembership, JoinRequest
+from .models import  Network, NetworkMembership, JoinRequest
+from .broadcast import queue_broadcast, queue_delta
+from .counters import adjust_pending_requests_count, reset_pending_requests_count
+from .live import (
+    serialize_device,
+    serialize_join_request,
+    serialize_intruder,
+    is_device_visible,
+)
 from devices.models import Device
+from alerts.models import IntruderLog
 
 def group_for_network(network_id: int) -> str:
     return f"network_{network_id}"
 
 
+def _device_network_ids(device):
+    """Networks whose live view can show this device (its owner's active memberships)."""
+    if not device.user_id:
+        return []
+    return list(
+        NetworkMembership.objects.filter(user_id=device.user_id, active=True)
+        .values_list("network_id", flat=True)
+    )
+
+
+def publish_member_devices(network_id, user_id, active):
+    """The member's devices appear on / disappear from the live graph."""
+    for device in Device.objects.filter(user_id=user_id).select_related("user"):
+        if active and is_device_visible(device):
+            queue_delta(network_id, "device_upserted", serialize_device(device))
+        else:
+            queue_delta(network_id, "device_removed", {"id": device.id})
+
+
+def publish_member_count(network_id):
+    queue_delta(network_id, "members_changed", {
+        "member_count": NetworkMembership.objects.filter(
+            network_id=network_id, active=True
+        ).count(),
+    })
+
+
+@receiver(post_save, sender=Network)
+def network_changed(sender, instance, created, **kwargs):
+    if not created:
+        queue_delta(instance.id, "network_updated", {
+            "name": instance.name,
+            "description": instance.description,
+            "visibility": instance.visibility,
+        })
+
+
+@receiver(post_init, sender=JoinRequest)
+def remember_join_request_status(sender, instance, **kwargs):
+    # __dict__ so a deferred field is not loaded just for this
+    instance._original_status = instance.__dict__.get("status")
+
+
+def _update_pending_count(instance, created):
+    """Keep the company's cached pending request count in step."""
+    was_pending = not created and instance._original_status == "pending"
+    is_pending = instance.status == "pending"
+    company_id = instance.network.company_id
+    if not created and instance._original_status is None:
+        # Loaded with `status` deferred: previous state unknown
+        reset_pending_requests_count(company_id)
+    elif was_pending != is_pending:
+        adjust_pending_requests_count(company_id, 1 if is_pending else -1)
+    instance._original_status = instance.status
+
+
 @receiver(post_save, sender=JoinRequest)
 def join_request_status_changed(sender, instance, created, **kwargs):
+    _update_pending_count(instance, created)
+
     if created:
-        # new request event (optional)
+        if instance.status == "pending":
+            queue_delta(instance.network_id, "request_created", serialize_join_request(instance))
         return
+
+    if instance.status != "pending":
+        queue_delta(instance.network_id, "request_decided", {
+            "id": instance.id,
+            "status": instance.status,
+        })
+
     if instance.status in ("approved", "denied"):
-        channel_layer = get_channel_layer()
         payload = {
             "type": "join_request_updated",
             "request_id": instance.id,
@@ -24,14 +96,23 @@ def join_request_status_changed(sender, instance, created, **kwargs):
             "network_id": instance.network_id,
             "user_id": instance.user_id,
         }
-        async_to_sync(channel_layer.group_send)(
+        queue_broadcast(
             group_for_network(instance.network_id),
-            {"type": "broadcast", "payload": payload}
+            {"type": "broadcast", "payload": payload},
+            key=("join_request", instance.id),
         )
 
+@receiver(post_delete, sender=JoinRequest)
+def join_request_deleted(sender, instance, **kwargs):
+    if instance.status == "pending":
+        adjust_pending_requests_count(instance.network.company_id, -1)
+        queue_delta(instance.network_id, "request_decided", {
+            "id": instance.id,
+            "status": "deleted",
+        })
+
 @receiver(post_save, sender=NetworkMembership)
 def membership_changed(sender, instance, created, **kwargs):
-    channel_layer = get_channel_layer()
     payload = {
         "type": "membership_updated",
         "network_id": instance.network_id,
@@ -40,38 +121,73 @@ def membership_changed(sender, instance, created, **kwargs):
         "active": instance.active,
         "created": bool(created),
     }
-    async_to_sync(channel_layer.group_send)(
+    queue_broadcast(
         group_for_network(instance.network_id),
-        {"type": "broadcast", "payload": payload}
+        {"type": "broadcast", "payload": payload},
+        key=("membership", instance.user_id),
     )
 
+    publish_member_devices(instance.network_id, instance.user_id, instance.active)
+    publish_member_count(instance.network_id)
+
+@receiver(post_delete, sender=NetworkMembership)
+def membership_deleted(sender, instance, **kwargs):
+    publish_member_devices(instance.network_id, instance.user_id, active=False)
+    publish_member_count(instance.network_id)
+
 @receiver(post_save, sender=Device)
 def device_state_changed(sender, instance, **kwargs):
     """
     Triggered whenever a Device is saved.
-    Uses the user's company instead of a non-existent company field.
+    Uses the device's denormalized company, so the owner is not loaded.
     """
-    # Ensure device has a user and that user has a company
-    if not instance.user or not hasattr(instance.user, "company") or instance.user.company is None:
-        return
+    # Live graph deltas for every network the owner is active in
+    for network_id in _device_network_ids(instance):
+        if is_device_visible(instance):
+            queue_delta(network_id, "device_upserted", serialize_device(instance))
+        else:
+            queue_delta(network_id, "device_removed", {"id": instance.id})
 
-    company = instance.user.company
+    # Ensure device belongs to a company
+    if instance.company_id is None:
+        return
 
     # Broadcast or handle device state change per network or company
     # Replace this with your actual logic for notifying channels
-    channel_layer = get_channel_layer()
     payload = {
         "type": "device_state_updated",
         "device_id": instance.id,
         "name": instance.name,
         "user_id": instance.user_id,
-        "company_id": company.id,
+        "company_id": instance.company_id,
         "mac_address": instance.mac_address,
         "ip_address": instance.ip_address,
     }
 
     # Example: send company-wide (adjust if you have networks attached)
-    async_to_sync(channel_layer.group_send)(
-        f"company_{company.id}",  # group name for the company
-        {"type": "broadcast", "payload": payload}
+    queue_broadcast(
+        f"company_{instance.company_id}",  # group name for the company
+        {"type": "broadcast", "payload": payload},
+        key=("device", instance.id),
     )
+
+@receiver(post_delete, sender=Device)
+def device_deleted(sender, instance, **kwargs):
+    for network_id in _device_network_ids(instance):
+        queue_delta(network_id, "device_removed", {"id": instance.id})
+
+@receiver(post_save, sender=IntruderLog)
+def intruder_detected(sender, instance, created, **kwargs):
+    if not instance.network_id:
+        return
+    if instance.status == "Detected":
+        if created:
+            queue_delta(instance.network_id, "intruder_detected", serialize_intruder(instance))
+    elif not created:
+        # Acknowledged / escalated / read
+        queue_delta(instance.network_id, "intruder_removed", {"id": instance.id})
+
+@receiver(post_delete, sender=IntruderLog)
+def intruder_deleted(sender, instance, **kwargs):
+    if instance.network_id:
+        queue_delta(instance.network_id, "intruder_removed", {"id": instance.id})
@@ -1,3 +1,381 @@
-from django.test import TestCase
+import io
+import time
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from alerts.models import IntruderLog
+from companies.models import Announcement, Company
+from devices.models import Device
+from devices.scan_backends import FakeBackend
+from devices.scanner import run_scan
+from notifications.models import Notification
+from . import broadcast, live, presence
+from .broadcast import broadcast_batch, queue_broadcast
+from .context_processors import network_requests_count, unread_notifications_count
+from .models import JoinRequest, Network, NetworkMembership, NetworkSession
+from .sessions import close_session, close_stale_sessions, open_session
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite syntax")
+class HotQueryIndexTests(TestCase):
+    """The hot multi-tenant filters must be served by their indexes, not table scans."""
+
+    def query_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = self.query_plan(queryset)
+        self.assertTrue(
+            any(index_name in step for step in plan),
+            f"{index_name} not used:\n" + "\n".join(plan),
+        )
+        table = queryset.model._meta.db_table
+        self.assertFalse(
+            any(step.startswith(f"SCAN {table}") for step in plan),
+            f"full scan of {table}:\n" + "\n".join(plan),
+        )
+
+    def test_pending_join_requests_per_company(self):
+        self.assertUsesIndex(
+            JoinRequest.objects.filter(network__company_id=1, status="pending"),
+            "joinreq_pending_idx",
+        )
+
+    def test_pending_join_requests_per_network(self):
+        self.assertUsesIndex(
+            JoinRequest.objects.filter(network_id=1, status="pending"),
+            "joinreq_pending_idx",
+        )
+
+    def test_recent_intruders(self):
+        self.assertUsesIndex(
+            IntruderLog.objects.filter(
+                network_id=1,
+                status="Detected",
+                detected_at__gte=timezone.now() - timedelta(minutes=1),
+            ),
+            "intruder_net_status_time_idx",
+        )
+
+    def test_unread_notifications(self):
+        self.assertUsesIndex(
+            Notification.objects.filter(user_id=1, read=False),
+            "notif_unread_idx",
+        )
+
+    def test_notification_list(self):
+        self.assertUsesIndex(
+            Notification.objects.filter(user_id=1).order_by("-created_at"),
+            "notif_user_created_idx",
+        )
+
+    def test_active_members(self):
+        self.assertUsesIndex(
+            NetworkMembership.objects.filter(network_id=1, active=True),
+            "netmember_network_active_idx",
+        )
+
+    def test_visible_devices(self):
+        self.assertUsesIndex(
+            Device.objects.filter(status="online", is_blocked=False),
+            "device_status_blocked_idx",
+        )
+
+    def test_company_announcements(self):
+        self.assertUsesIndex(
+            Announcement.objects.filter(company_id=1, scope="company").order_by("-created_at"),
+            "announce_company_scope_idx",
+        )
+
+
+class NavbarCounterTests(TestCase):
+    """Navbar badge counts come from cached counters kept by the signals."""
+
+    def setUp(self):
+        cache.clear()
+        company = Company.objects.create(name="Acme", domain="acme.test")
+        self.admin = User.objects.create(email="admin@acme.test", company=company, role=User.Roles.ADMIN)
+        self.network = Network.objects.create(company=company, name="Office", subnets="10.1.0.0/24")
+        self.request = RequestFactory().get("/")
+        self.request.user = self.admin
+
+    def counts(self):
+        return {
+            **network_requests_count(self.request),
+            **unread_notifications_count(self.request),
+        }
+
+    def test_warm_counters_run_no_queries(self):
+        JoinRequest.objects.create(network=self.network, user=self.admin)
+        Notification.objects.create(user=self.admin, message="Hello")
+        self.counts()
+
+        with self.assertNumQueries(0):
+            counts = self.counts()
+        self.assertEqual(counts, {"join_requests_count": 1, "notifications_unread_count": 1})
+
+    def test_signals_keep_the_counters_current(self):
+        self.counts()
+        join_request = JoinRequest.objects.create(network=self.network, user=self.admin)
+        notification = Notification.objects.create(user=self.admin, message="Hello")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.counts(), {"join_requests_count": 1, "notifications_unread_count": 1})
+
+        join_request.status = "approved"
+        join_request.save()
+        notification.read = True
+        notification.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.counts(), {"join_requests_count": 0, "notifications_unread_count": 0})
+
+class PresenceTests(TestCase):
+    """Monitor sockets joining and leaving a network's presence roster."""
+
+    def setUp(self):
+        cache.clear()
+        company = Company.objects.create(name="Acme", domain="acme.test")
+        self.network = Network.objects.create(company=company, name="Office", subnets="10.1.0.0/24")
+        self.admin = User.objects.create(email="admin@acme.test", company=company, role=User.Roles.ADMIN)
+        self.manager = User.objects.create(email="manager@acme.test", company=company, role=User.Roles.MANAGER)
+        for user, role in ((self.admin, "admin"), (self.manager, "manager")):
+            NetworkMembership.objects.create(network=self.network, user=user, role=role, active=True)
+
+    def is_active(self, user):
+        return NetworkMembership.objects.get(network=self.network, user=user).active
+
+    def test_watchers_are_counted_once_per_user(self):
+        open_session(self.network.id, self.admin, "specific.a")
+        open_session(self.network.id, self.admin, "specific.b")
+        open_session(self.network.id, self.manager, "specific.c")
+
+        self.assertEqual(len(presence.roster(self.network.id)), 3)
+        self.assertEqual(presence.watcher_count(self.network.id), 2)
+
+    def test_membership_is_released_with_the_last_socket(self):
+        first = open_session(self.network.id, self.admin, "specific.a")
+        second = open_session(self.network.id, self.admin, "specific.b")
+
+        close_session(first, "specific.a")
+        self.assertTrue(self.is_active(self.admin))
+
+        close_session(second, "specific.b")
+        self.assertFalse(self.is_active(self.admin))
+        self.assertEqual(presence.watcher_count(self.network.id), 0)
+        self.assertEqual(NetworkSession.objects.filter(is_active=True).count(), 0)
+
+    def test_employee_membership_is_left_alone(self):
+        employee = User.objects.create(email="bob@acme.test", company=self.network.company, role=User.Roles.EMPLOYEE)
+        NetworkMembership.objects.create(network=self.network, user=employee, role="employee", active=True)
+
+        close_session(open_session(self.network.id, employee, "specific.a"), "specific.a")
+
+        self.assertTrue(self.is_active(employee))
+
+    def test_entry_of_a_dead_socket_expires(self):
+        open_session(self.network.id, self.admin, "specific.a")
+
+        with mock.patch.object(presence.time, "time", return_value=time.time() + 3600):
+            self.assertEqual(presence.watcher_count(self.network.id), 0)
+
+    def test_sweep_closes_only_sessions_without_a_socket(self):
+        open_session(self.network.id, self.admin, "specific.a")
+        dead = open_session(self.network.id, self.manager, "specific.b")
+        presence.leave(self.network.id, "specific.b")  # died without a disconnect
+        NetworkSession.objects.update(created_at=timezone.now() - timedelta(hours=1))
+
+        with mock.patch.object(presence, "has_shared_cache", return_value=True):
+            self.assertEqual(close_stale_sessions(), 1)
+
+        dead.refresh_from_db()
+        self.assertFalse(dead.is_active)
+        self.assertFalse(self.is_active(self.manager))
+        self.assertTrue(self.is_active(self.admin))
+
+    def test_sweep_refuses_a_per_process_cache(self):
+        with self.assertRaises(ImproperlyConfigured):
+            close_stale_sessions()
+
+class TransactionBroadcastTests(TestCase):
+    """Broadcasts queued in transactions go out on commit, savepoint by savepoint."""
+
+    group = "company_1"
+
+    def sent(self, block):
+        """Messages for `group` sent once `block` has run and committed."""
+        sent = []
+
+        def record(buffer):
+            sent.extend(buffer.messages.get(self.group, {}).values())
+
+        with mock.patch.object(broadcast, "_send", record):
+            with broadcast_batch(), self.captureOnCommitCallbacks(execute=True):
+                block()
+        return sent
+
+    def queue(self, message, key=None):
+        queue_broadcast(self.group, message, key=key)
+
+    def test_rolled_back_savepoint_is_not_sent(self):
+        def block():
+            with transaction.atomic():
+                self.queue("kept")
+                try:
+                    with transaction.atomic():
+                        self.queue("dropped")
+                        raise ValueError
+                except ValueError:
+                    pass
+                self.queue("after")
+
+        self.assertEqual(self.sent(block), ["kept", "after"])
+
+    def test_released_savepoint_is_sent_in_order(self):
+        def block():
+            with transaction.atomic():
+                self.queue("first", key="device")
+                with transaction.atomic():
+                    self.queue("inner", key="device")
+                self.queue("last", key="device")
+
+        self.assertEqual(self.sent(block), ["last"])
+
+    def test_rolled_back_transaction_does_not_swallow_the_next(self):
+        def block():
+            try:
+                with transaction.atomic():
+                    self.queue("dropped")
+                    raise ValueError
+            except ValueError:
+                pass
+            with transaction.atomic():
+                self.queue("sent")
+
+        self.assertEqual(self.sent(block), ["sent"])
+
+
+class LiveStateCacheTests(TestCase):
+    """The cached live state is patched by deltas instead of re-queried."""
+
+    def setUp(self):
+        cache.clear()
+        company = Company.objects.create(name="Acme", domain="acme.test")
+        self.member = User.objects.create(email="bob@acme.test", company=company, role=User.Roles.EMPLOYEE)
+        self.network = Network.objects.create(company=company, name="Office", subnets="10.1.0.0/24")
+        with self.captureOnCommitCallbacks(execute=True):
+            NetworkMembership.objects.create(network=self.network, user=self.member, active=True)
+
+    def test_warm_snapshot_runs_no_queries(self):
+        live.build_snapshot(self.network)
+
+        with self.assertNumQueries(0):
+            snapshot = live.build_snapshot(self.network)
+        self.assertEqual(snapshot["network"]["member_count"], 1)
+
+    def test_device_coming_online_is_patched_in(self):
+        before = live.build_snapshot(self.network)
+
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            device = Device.objects.create(user=self.member, mac_address="aa:bb:cc:dd:ee:01")
+            device.status = "online"
+            device.save()
+
+        with self.assertNumQueries(0):
+            snapshot = live.build_snapshot(self.network)
+        self.assertGreater(snapshot["version"], before["version"])
+        self.assertEqual([d["id"] for d in snapshot["devices"]], [device.id])
+
+    def test_state_behind_the_version_is_rebuilt(self):
+        live.build_snapshot(self.network)
+        live.bump_version(self.network.id)  # a delta that never patched the state
+
+        with self.assertNumQueries(4):  # devices, requests, intruders, member count
+            snapshot = live.build_snapshot(self.network)
+        self.assertEqual(snapshot["version"], live.get_version(self.network.id))
+
+class NetworkStatusETagTests(TestCase):
+    """Conditional polls of get_network_status see bulk intruder changes."""
+
+    subnet = "10.1.0.0/24"
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Acme", domain="acme.test")
+        admin = User.objects.create(email="admin@acme.test", company=self.company, role=User.Roles.ADMIN)
+        self.network = Network.objects.create(company=self.company, name="Office", subnets=self.subnet)
+        self.url = reverse("api_network_status", args=[self.network.id])
+        self.client.force_login(admin)
+
+    def poll(self, etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get(self.url, **headers)
+
+    def scan(self, *hosts):
+        with self.captureOnCommitCallbacks(execute=True):
+            run_scan(backend=FakeBackend({self.subnet: list(hosts)}), network=self.network)
+
+    def test_scanned_intruder_changes_the_etag(self):
+        etag = self.poll()["ETag"]
+        self.assertEqual(self.poll(etag).status_code, 304)
+
+        self.scan({"ip": "10.1.0.9", "mac": "aa:bb:cc:dd:ee:09"})
+
+        response = self.poll(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.json()["intruders"]), 1)
+
+    def test_expired_intruder_changes_the_etag(self):
+        self.scan({"ip": "10.1.0.9", "mac": "aa:bb:cc:dd:ee:09"})
+        response = self.poll()
+        etag = response["ETag"]
+        self.assertEqual(len(response.json()["intruders"]), 1)
+        self.assertEqual(self.poll(etag).status_code, 304)
+
+        later = timezone.now() + live.INTRUDER_WINDOW + timedelta(seconds=1)
+        with mock.patch.object(live, "timezone") as clock, mock.patch.object(live, "time") as wall:
+            clock.now.return_value = later
+            wall.time.return_value = later.timestamp()
+            response = self.poll(etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["intruders"], [])
+            self.assertNotEqual(response["ETag"], etag)
+            self.assertEqual(self.poll(response["ETag"]).status_code, 304)
+
+    def test_pruning_long_expired_intruders_leaves_the_etag(self):
+        self.scan({"ip": "10.1.0.9", "mac": "aa:bb:cc:dd:ee:09"})
+        IntruderLog.objects.update(detected_at=timezone.now() - timedelta(days=400))
+        etag = self.poll()["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("prune_intruder_logs", days=30, stdout=io.StringIO())
+
+        # Far outside INTRUDER_WINDOW: the live view does not change
+        self.assertFalse(IntruderLog.objects.exists())
+        self.assertEqual(self.poll(etag).status_code, 304)
+
+
+class IntruderLogListTests(TestCase):
+    """The admin intruder log list."""
+
+    def test_viewing_the_list_writes_nothing(self):
+        company = Company.objects.create(name="Acme", domain="acme.test")
+        admin = User.objects.create(email="admin@acme.test", company=company, role=User.Roles.ADMIN)
+        network = Network.objects.create(company=company, name="Office", subnets="10.1.0.0/24")
+        IntruderLog.objects.create(network=network, company=company, mac_address="aa:bb:cc:dd:ee:09")
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse("admin_intruder_logs"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Notification.objects.exists())
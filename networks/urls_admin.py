@@ -15,6 +15,7 @@ urlpatterns = [
     # Intruder Logs
     path("networks/intruder-logs/", views_admin.intruder_logs, name="admin_intruder_logs"),
     path("networks/intruder-logs/export/csv/", views_admin.export_intruder_logs_csv, name="export_intruder_logs_csv"),
+    path("networks/intruder-logs/export/ndjson/", views_admin.export_intruder_logs_ndjson, name="export_intruder_logs_ndjson"),
 
     # Join Requests (Admin Approval)
     path("join-requests/", views_admin.join_requests, name="admin_join_requests"),
@@ -5,8 +5,8 @@ from accounts.decorators import company_admin_required
 from .models import Network, NetworkMembership
 from .forms import NetworkForm
 from alerts.models import IntruderLog
-from django.http import HttpResponse
-import csv
+from alerts.pagination import paginate_logs
+from alerts.exports import stream_logs_csv, stream_logs_ndjson
 from django.utils import timezone
 # 🔔 Notifications util
 from notifications.utils import create_notification
@@ -85,52 +85,32 @@ def delete_network(request, network_id):
 @company_admin_required
 def unauthorized_attempts(request):
     attempts = IntruderLog.objects.filter(
-        network__company=request.user.company
+        company=request.user.company
     ).select_related("network", "user")
-    return render(request, "networks/admin/unauthorized_attempts.html", {"attempts": attempts})
+    page = paginate_logs(attempts, request.GET.get("after"))
+    return render(request, "networks/admin/unauthorized_attempts.html", {"attempts": page, "page": page})
 
 
 @login_required
 @company_admin_required
 def intruder_logs(request):
-    logs = IntruderLog.objects.filter(status='unauthorized')
+    logs = IntruderLog.objects.filter(company=request.user.company).select_related("network")
+    page = paginate_logs(logs, request.GET.get("after"))
+    return render(request, "networks/admin/intruder_logs.html", {"logs": page, "page": page})
 
-    # 🔔 Send notification when new intruder logs exist (optional: only latest one)
-    if logs.exists():
-        latest = logs.latest("timestamp")
-        ua = latest.unauthorized_attempt
-        create_notification(
-            request.user,
-            f"Intruder alert on network '{ua.network.name if ua else 'Unknown'}'.",
-            link="/admin/intruder-logs/"
-        )
 
-    return render(request, "networks/admin/intruder_logs.html", {"logs": logs})
+@login_required
+@company_admin_required
+def export_intruder_logs_csv(request):
+    logs = IntruderLog.objects.filter(company=request.user.company)
+    return stream_logs_csv(logs)
 
 
 @login_required
 @company_admin_required
-def export_intruder_logs_csv(request):
-    logs = IntruderLog.objects.filter(
-        unauthorized_attempt__network__company=request.user.company
-    )
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = 'attachment; filename=\"intruder_logs.csv\"'
-
-    writer = csv.writer(response)
-    writer.writerow(["MAC Address", "IP Address", "Status", "Timestamp", "Network", "Reason"])
-    for log in logs:
-        ua = log.unauthorized_attempt
-        writer.writerow([
-            log.mac_address,
-            log.ip_address,
-            log.status,
-            log.timestamp,
-            ua.network.name if ua else "N/A",
-            ua.reason if ua else "N/A",
-        ])
-
-    return response
+def export_intruder_logs_ndjson(request):
+    logs = IntruderLog.objects.filter(company=request.user.company)
+    return stream_logs_ndjson(logs)
 
 
 # ✅ Join Requests (Admin Approval)
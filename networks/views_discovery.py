@@ -4,7 +4,7 @@ from django.contrib.auth.decorators import login_required
 from django.db.models import Q
 from .models import Network, JoinRequest, UnauthorizedAttempt
 from alerts.models import IntruderLog
-from notifications.utils import create_notification
+from notifications.utils import create_notification, create_notifications_bulk
 
 @login_required
 def network_directory(request):
@@ -36,20 +36,18 @@ def request_access(request, network_id):
 
         # 🔔 notify managers/admins
         managers = network.memberships.filter(role="manager").select_related("user")
-        for m in managers:
-            create_notification(
-                m.user,
-                f"{request.user.get_full_name()} requested to join '{network.name}'.",
-                link="/manager/team-join-requests/"
-            )
+        create_notifications_bulk(
+            [m.user for m in managers],
+            f"{request.user.get_full_name()} requested to join '{network.name}'.",
+            link="/manager/team-join-requests/"
+        )
 
         admins = request.user.company.admins.all()  # assuming related name
-        for a in admins:
-            create_notification(
-                a,
-                f"{request.user.get_full_name()} requested to join '{network.name}'.",
-                link="/admin/join-requests/"
-            )
+        create_notifications_bulk(
+            admins,
+            f"{request.user.get_full_name()} requested to join '{network.name}'.",
+            link="/admin/join-requests/"
+        )
 
         # confirm to employee
         create_notification(
@@ -81,11 +79,10 @@ def outsider_attempt(request, network_id):
 
         # 🔔 notify admins in real-time
         admins = network.company.admins.all()
-        for a in admins:
-            create_notification(
-                a,
-                f"⚠️ Intruder attempt detected on '{network.name}'.",
-                link="/admin/intruder-logs/"
-            )
+        create_notifications_bulk(
+            admins,
+            f"⚠️ Intruder attempt detected on '{network.name}'.",
+            link="/admin/intruder-logs/"
+        )
 
     return redirect("home")
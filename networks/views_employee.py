@@ -3,7 +3,7 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseForbidden
 from .models import Network, NetworkMembership, JoinRequest
-from notifications.utils import create_notification
+from notifications.utils import create_notification, create_notifications_bulk
 from devices.models import Device
 
 @login_required
@@ -69,12 +69,11 @@ def join_requests(request):
             role__in=["admin", "manager"]
         ).select_related("user")
 
-        for member in admins_managers:
-            create_notification(
-                member.user,
-                f"{request.user.get_full_name()} requested to join '{network.name}'.",
-                link="/n/admin/join-requests/"
-            )
+        create_notifications_bulk(
+            [member.user for member in admins_managers],
+            f"{request.user.get_full_name()} requested to join '{network.name}'.",
+            link="/n/admin/join-requests/"
+        )
 
         # Notify employee
         create_notification(
@@ -152,12 +151,11 @@ def cancel_join_request(request, request_id):
             role__in=["admin", "manager"]
         ).select_related("user")
 
-        for member in admins_managers:
-            create_notification(
-                member.user,
-                f"{request.user.get_full_name()} cancelled their join request for '{jr.network.name}'.",
-                link="/n/admin/join-requests/"
-            )
+        create_notifications_bulk(
+            [member.user for member in admins_managers],
+            f"{request.user.get_full_name()} cancelled their join request for '{jr.network.name}'.",
+            link="/n/admin/join-requests/"
+        )
 
         # Notify employee
         create_notification(
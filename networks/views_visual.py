@@ -3,7 +3,6 @@ from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, get_object_or_404
 from accounts.decorators import company_admin_required
 from .models import Network, NetworkMembership
-from alerts.models import IntruderLog
 
 
 @login_required
@@ -44,6 +43,7 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseForbidden
 from .models import Network, NetworkMembership, JoinRequest
+from .live import build_snapshot
 from devices.models import Device
 
 @login_required
@@ -143,8 +143,11 @@ def live_network(request, network_id):
         membership.active = True
         membership.save()
     
+    # Served from the cached live state; the page starts from this snapshot
+    # and its version instead of fetching the status API on load.
     return render(request, "networks/live/live_network.html", {
         "network": network,
+        "live_state": build_snapshot(network),
         "user_role": "admin" if user.is_company_admin else "manager"
     })
 
@@ -189,21 +192,18 @@ def network_join_view(request, network_id):
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
-import json
 
 from devices.models import Device
 from .models import Network, NetworkMembership, JoinRequest
-
-
-from django.utils import timezone
-from datetime import timedelta
-
-from django.contrib import messages
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from .live import build_snapshot, get_version_token, snapshot_token
 
 @login_required
 def get_network_status(request, network_id):
     """API endpoint to get current network status for AJAX polling"""
-    network = get_object_or_404(Network, id=network_id, company=request.user.company)
+    # company_id avoids loading the Company on every poll
+    network = get_object_or_404(Network, id=network_id, company_id=request.user.company_id)
 
     # 🔒 Permission check
     if not request.user.is_company_admin:
@@ -214,84 +214,27 @@ def get_network_status(request, network_id):
         except NetworkMembership.DoesNotExist:
             return JsonResponse({"error": "Permission denied"}, status=403)
 
-    # ✅ Active, online, not-blocked devices
-    devices = (
-        Device.objects.filter(
-            user__network_memberships__network=network,
-            user__network_memberships__active=True,
-            status="online",
-            is_blocked=False,
+    # Clients send back the token they already have; unchanged polls are
+    # answered from the change counter without loading the live state.
+    token, last_modified = get_version_token(network.id)
+    response = None
+    if token is not None:
+        etag = f'"{token}"'
+        response = get_conditional_response(
+            request, etag=etag, last_modified=int(last_modified.timestamp())
         )
-        .select_related("user")
-        .distinct()
-    )
-
-    # ✅ Pending join requests
-    pending_requests = (
-        JoinRequest.objects.filter(network=network, status="pending")
-        .select_related("user", "device")
-    )
-
-    # ✅ Active intruders (last 1 minute only)
-    intruders_qs = IntruderLog.objects.filter(
-        network=network,
-        status="Detected",
-        detected_at__gte=timezone.now() - timedelta(minutes=1)
-    )
-
-    intruders = [
-        {
-            "id": log.id,
-            "status": "intruder",
-            "ip_address": log.ip_address,
-            "mac_address": log.mac_address or "",
-            "detected_at": log.detected_at.isoformat(),
-            "note": log.note,
-        }
-        for log in intruders_qs
-    ]
-
-    # 🚨 Add flash-style message if intruders exist
-    flash_message = None
-    if intruders_qs.exists():
-        flash_message = "🚨 Intruder detected! Their attempt was blocked."
-
-    return JsonResponse(
-        {
-            "devices": [
-                {
-                    "id": device.id,
-                    "name": device.name,
-                    "mac_address": device.mac_address,
-                    "status": device.status,
-                    "user_email": device.user.email if device.user else "Unassigned",
-                    "ip_address": device.ip_address,
-                }
-                for device in devices
-            ],
-            "pending_requests": [
-                {
-                    "id": req.id,
-                    "user_email": req.user.email,
-                    "device_name": req.device.name if req.device else "No device",
-                    "device_mac": req.device.mac_address if req.device else "",
-                    "ip_address": req.ip_address,
-                    "created_at": req.created_at.isoformat(),
-                    "status": req.status,
-                }
-                for req in pending_requests
-            ],
-            "intruders": intruders,
-            "flash_message": flash_message,  # 👈 frontend can show this like a toast
-            "network": {
-                "id": network.id,
-                "name": network.name,
-                "description": network.description,
-                "visibility": network.visibility,
-                "member_count": network.memberships.filter(active=True).count(),
-            },
-        }
-    )
+    if response is None:
+        # Same payload the websocket sends as its initial snapshot; live
+        # dashboards only fall back to polling this when the socket is down.
+        snapshot = build_snapshot(network)
+        etag = f'"{snapshot_token(snapshot)}"'
+        response = get_conditional_response(request, etag=etag) or JsonResponse(snapshot)
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified.timestamp())
+    # Always revalidate: the browser must not reuse a stale body on its own
+    response["Cache-Control"] = "private, no-cache"
+    return response
 
 
 
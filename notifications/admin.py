@@ -1,6 +1,7 @@
 # notifications/admin.py
 from django.contrib import admin
-from .models import Notification
+from django.utils import timezone
+from .models import Notification, OutboundEmail
 
 
 @admin.register(Notification)
@@ -16,3 +17,23 @@ class NotificationAdmin(admin.ModelAdmin):
     def short_message(self, obj):
         return obj.message[:50] + ("..." if len(obj.message) > 50 else "")
     short_message.short_description = "Message"
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    """Mail queued for the outbox worker (manage.py send_outbox)"""
+
+    list_display = ("subject", "recipients", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status", "created_at")
+    search_fields = ("subject", "to")
+    ordering = ("-created_at",)
+    readonly_fields = ("created_at", "sent_at", "attempts", "last_error")
+    actions = ["retry_now"]
+
+    def recipients(self, obj):
+        return ", ".join(obj.to)
+    recipients.short_description = "To"
+
+    @admin.action(description="Retry selected mails now")
+    def retry_now(self, request, queryset):
+        queryset.exclude(status="sent").update(status="queued", attempts=0, next_attempt_at=timezone.now())
@@ -20,3 +20,8 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             "link": event.get("link"),
             "timestamp": event.get("timestamp"),
         }))
+
+    async def broadcast_batch(self, event):
+        """Unpack several notifications flushed together by networks.broadcast."""
+        for message in event["messages"]:
+            await self.dispatch(message)
@@ -0,0 +1,40 @@
+# notifications/counters.py
+"""
+Cached unread-notification count per user, for the navbar badge.
+
+Kept up to date by the Notification signals (notifications/signals.py) and
+rebuilt from the database on a miss. Code that changes notifications with
+`update()` / `bulk_create()` skips the signals and must call
+`reset_unread_count`.
+"""
+from django.core.cache import cache
+
+from .models import Notification
+
+# Upper bound on how long a count can drift if an update is missed
+COUNTER_TIMEOUT = 60 * 10
+
+
+def _unread_key(user_id) -> str:
+    return f"notifications:unread:{user_id}"
+
+
+def get_unread_count(user_id) -> int:
+    key = _unread_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, read=False).count()
+        cache.add(key, count, COUNTER_TIMEOUT)
+    return count
+
+
+def adjust_unread_count(user_id, delta):
+    try:
+        cache.incr(_unread_key(user_id), delta)
+    except ValueError:
+        # Not cached; the next read counts from the database
+        pass
+
+
+def reset_unread_count(*user_ids):
+    cache.delete_many([_unread_key(user_id) for user_id in user_ids])
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import Throttle, send_outbox
+
+
+class Command(BaseCommand):
+    help = "Send queued mail from the outbox (runs until stopped unless --once)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Send what is due now, then exit"
+        )
+        parser.add_argument(
+            "--poll", type=float, default=5,
+            help="Seconds to wait for new mail when the outbox is empty (default: 5)"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=None,
+            help="Mails claimed and sent per connection (default: EMAIL_OUTBOX_BATCH_SIZE)"
+        )
+
+    def handle(self, *args, **options):
+        throttle = Throttle(settings.EMAIL_OUTBOX_RATE_LIMIT)
+        try:
+            while True:
+                sent, unsent = send_outbox(options["batch_size"], throttle=throttle)
+                if sent or unsent:
+                    self.stdout.write(f"Sent {sent} mail(s), {unsent} to retry or failed.")
+                if options["once"]:
+                    break
+                if not (sent or unsent):
+                    time.sleep(options["poll"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS("Outbox worker stopped."))
+
+
+# Usage: python manage.py send_outbox
+#        python manage.py send_outbox --once --batch-size 500
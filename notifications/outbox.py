@@ -0,0 +1,147 @@
+# notifications/outbox.py
+"""
+Outbound mail queue.
+
+Views and the scanner queue their mail here (one INSERT, or one bulk
+INSERT for many mails) instead of talking SMTP inside a request or scan.
+`manage.py send_outbox` sends it: due mails are claimed in batches and
+sent over one connection from `get_connection()`, so the console and
+locmem backends work offline, at most EMAIL_OUTBOX_RATE_LIMIT mails per
+second. A mail that fails is retried with exponential backoff, up to
+EMAIL_OUTBOX_MAX_ATTEMPTS tries, then marked failed. Mails claimed by a
+worker that died are picked up again after SENDING_TIMEOUT.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+SENDING_TIMEOUT = timedelta(minutes=10)
+MAX_RETRY_DELAY = timedelta(hours=6)
+
+
+def _outbound(subject, body, recipients, from_email=None):
+    return OutboundEmail(
+        subject=subject,
+        body=body,
+        to=list(recipients),
+        from_email=from_email or "",
+    )
+
+
+def queue_email(subject, body, recipients, from_email=None):
+    """Queue one mail (to all `recipients` together) for the outbox worker."""
+    mail = _outbound(subject, body, recipients, from_email)
+    mail.save()
+    return mail
+
+
+def queue_emails(messages):
+    """
+    Queue many mails with one INSERT; `messages` are (subject, body,
+    recipients[, from_email]) tuples.
+    """
+    return OutboundEmail.objects.bulk_create(
+        [_outbound(*message) for message in messages], batch_size=500
+    )
+
+
+class Throttle:
+    """Spaces calls to wait() at least 1/rate seconds apart (rate 0: no limit)."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate and rate > 0 else 0
+        self.last = None
+
+    def wait(self):
+        if self.interval and self.last is not None:
+            delay = self.last + self.interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self.last = time.monotonic()
+
+
+def claim_batch(size=None, now=None):
+    """Mark up to `size` due mails as being sent and return them."""
+    size = size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    now = now or timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status__in=["queued", "sending"], next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:size]
+        )
+        OutboundEmail.objects.filter(pk__in=[mail.pk for mail in batch]).update(
+            status="sending",
+            attempts=F("attempts") + 1,
+            next_attempt_at=now + SENDING_TIMEOUT,
+        )
+    for mail in batch:
+        mail.attempts += 1
+    return batch
+
+
+def _retry_delay(attempts):
+    delay = timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+    return min(delay, MAX_RETRY_DELAY)
+
+
+def _failed(mail, error):
+    mail.last_error = repr(error)
+    if mail.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        mail.status = "failed"
+    else:
+        mail.status = "queued"
+        mail.next_attempt_at = timezone.now() + _retry_delay(mail.attempts)
+
+
+def send_batch(batch, connection=None, throttle=None):
+    """Send claimed mails over one connection and record the outcome of each."""
+    connection = connection or get_connection()
+    throttle = throttle or Throttle(settings.EMAIL_OUTBOX_RATE_LIMIT)
+    try:
+        connection.open()
+    except Exception as exc:
+        for mail in batch:
+            _failed(mail, exc)
+    else:
+        try:
+            for mail in batch:
+                throttle.wait()
+                message = EmailMessage(
+                    mail.subject,
+                    mail.body,
+                    mail.from_email or settings.DEFAULT_FROM_EMAIL,
+                    mail.to,
+                )
+                try:
+                    if not connection.send_messages([message]):
+                        raise RuntimeError("backend did not send the message")
+                except Exception as exc:
+                    _failed(mail, exc)
+                else:
+                    mail.status, mail.sent_at, mail.last_error = "sent", timezone.now(), ""
+        finally:
+            connection.close()
+
+    OutboundEmail.objects.bulk_update(
+        batch, ["status", "next_attempt_at", "last_error", "sent_at"]
+    )
+    return sum(1 for mail in batch if mail.status == "sent")
+
+
+def send_outbox(batch_size=None, connection=None, throttle=None):
+    """Send every mail that is due; returns (sent, not sent) counts."""
+    throttle = throttle or Throttle(settings.EMAIL_OUTBOX_RATE_LIMIT)
+    sent = unsent = 0
+    while batch := claim_batch(batch_size):
+        done = send_batch(batch, connection, throttle)
+        sent += done
+        unsent += len(batch) - done
+    return sent, unsent
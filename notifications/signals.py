@@ -0,0 +1,31 @@
+# notifications/signals.py
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Notification
+from .counters import adjust_unread_count, reset_unread_count
+
+
+@receiver(post_init, sender=Notification)
+def remember_read_state(sender, instance, **kwargs):
+    # __dict__ so a deferred field is not loaded just for this
+    instance._original_read = instance.__dict__.get("read")
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created, **kwargs):
+    if created:
+        if not instance.read:
+            adjust_unread_count(instance.user_id, 1)
+    elif instance._original_read is None:
+        # Loaded with `read` deferred: previous state unknown
+        reset_unread_count(instance.user_id)
+    elif instance._original_read != instance.read:
+        adjust_unread_count(instance.user_id, -1 if instance.read else 1)
+    instance._original_read = instance.read
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    if not instance.read:
+        adjust_unread_count(instance.user_id, -1)
@@ -1,3 +1,159 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import get_connection
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from companies.models import Company
+from networks import broadcast
+from . import outbox
+from .counters import get_unread_count
+from .models import Notification, OutboundEmail
+from .outbox import Throttle, queue_emails, send_outbox
+from .utils import create_notifications_bulk
+
+
+class FailingBackend(EmailBackend):
+    """locmem backend that refuses mail to `fail_for`."""
+    fail_for = "bounce@acme.test"
+
+    def send_messages(self, messages):
+        if any(self.fail_for in message.to for message in messages):
+            raise OSError("mailbox unavailable")
+        return super().send_messages(messages)
+
+
+def queue(count, recipient="user{}@acme.test"):
+    return queue_emails(
+        (f"Mail {n}", "Hello", [recipient.format(n)]) for n in range(count)
+    )
+
+
+@override_settings(
+    EMAIL_OUTBOX_RATE_LIMIT=0,
+    EMAIL_OUTBOX_BATCH_SIZE=10,
+    EMAIL_OUTBOX_MAX_ATTEMPTS=3,
+    EMAIL_OUTBOX_RETRY_DELAY=60,
+)
+class OutboxTests(TestCase):
+    """send_outbox against the locmem backend (mail.outbox)."""
+
+    def make_due(self):
+        OutboundEmail.objects.filter(status="queued").update(next_attempt_at=timezone.now())
+
+    def test_each_batch_goes_over_one_connection(self):
+        queue(25)
+        connection = get_connection()
+
+        with mock.patch.object(connection, "open", wraps=connection.open) as opened:
+            sent, unsent = send_outbox(connection=connection)
+
+        self.assertEqual((sent, unsent), (25, 0))
+        self.assertEqual(len(mail.outbox), 25)
+        self.assertEqual(opened.call_count, 3)  # batches of 10, 10 and 5
+
+    def test_failed_mail_is_retried_with_backoff(self):
+        queue(1, "bounce@acme.test")
+        queue(1)
+        connection = FailingBackend()
+
+        before = timezone.now()
+        self.assertEqual(send_outbox(connection=connection), (1, 1))
+        failed = OutboundEmail.objects.get(to=["bounce@acme.test"])
+        self.assertEqual(failed.status, "queued")
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn("mailbox unavailable", failed.last_error)
+        self.assertGreaterEqual(failed.next_attempt_at, before + timedelta(seconds=60))
+        self.assertEqual(len(mail.outbox), 1)  # the other mail went out
+
+        # Not due yet: nothing is sent
+        self.assertEqual(send_outbox(connection=connection), (0, 0))
+
+        self.make_due()
+        before = timezone.now()
+        send_outbox(connection=connection)
+        failed.refresh_from_db()
+        self.assertEqual(failed.attempts, 2)
+        self.assertGreaterEqual(failed.next_attempt_at, before + timedelta(seconds=120))
+
+        self.make_due()
+        send_outbox(connection=connection)
+        failed.refresh_from_db()
+        self.assertEqual(failed.status, "failed")
+        self.assertEqual(failed.attempts, 3)
+
+        self.make_due()
+        self.assertEqual(send_outbox(connection=connection), (0, 0))
+
+    def test_rate_limit_spaces_the_sends(self):
+        queue(3)
+
+        with mock.patch.object(outbox.time, "monotonic", return_value=100.0), \
+                mock.patch.object(outbox.time, "sleep") as sleep:
+            send_outbox(throttle=Throttle(2))
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(sleep.call_args_list, [mock.call(0.5), mock.call(0.5)])
+
+    def test_no_rate_limit_never_sleeps(self):
+        queue(3)
+
+        with mock.patch.object(outbox.time, "sleep") as sleep:
+            send_outbox(throttle=Throttle(0))
+
+        self.assertEqual(len(mail.outbox), 3)
+        sleep.assert_not_called()
+
+    def test_mail_is_marked_sent_exactly_once(self):
+        queue(5)
+
+        self.assertEqual(send_outbox(), (5, 0))
+        self.assertEqual(send_outbox(), (0, 0))
+
+        self.assertEqual(len(mail.outbox), 5)
+        for row in OutboundEmail.objects.all():
+            self.assertEqual(row.status, "sent")
+            self.assertEqual(row.attempts, 1)
+            self.assertIsNotNone(row.sent_at)
+            self.assertEqual(row.last_error, "")
+
+
+class BulkNotificationTests(TestCase):
+    """create_notifications_bulk fanning one message out to many users."""
+
+    def setUp(self):
+        cache.clear()
+        company = Company.objects.create(name="Acme", domain="acme.test")
+        self.users = [
+            User.objects.create(email=f"user{n}@acme.test", company=company, role=User.Roles.EMPLOYEE)
+            for n in range(3)
+        ]
+
+    def test_one_insert_and_one_send_for_every_recipient(self):
+        sent = []
+        with mock.patch.object(broadcast, "_send", sent.append), \
+                self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(1):
+                create_notifications_bulk(self.users, "Network updated")
+
+        sent = [buffer for buffer in sent if buffer.messages]  # an empty batch sends nothing
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(sorted(sent[0].messages), sorted(f"user_{user.id}" for user in self.users))
+
+    def test_duplicate_recipients_are_notified_once(self):
+        create_notifications_bulk([*self.users, self.users[0], None], "Network updated")
+
+        self.assertEqual(Notification.objects.filter(user=self.users[0]).count(), 1)
+        self.assertEqual(Notification.objects.count(), 3)
+
+    def test_cached_unread_counts_see_the_new_notifications(self):
+        self.assertEqual(get_unread_count(self.users[0].id), 0)
+
+        create_notifications_bulk(self.users, "Network updated")
+
+        self.assertEqual(get_unread_count(self.users[0].id), 1)
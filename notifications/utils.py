@@ -1,20 +1,43 @@
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
+from networks.broadcast import broadcast_batch, queue_broadcast
 from .models import Notification
+from .counters import reset_unread_count
+
+
+def _push(notification):
+    queue_broadcast(
+        f"user_{notification.user_id}",
+        {
+            "type": "notify",
+            "message": notification.message,
+            "link": notification.link,
+            "timestamp": str(notification.created_at),
+        },
+    )
+
 
 def create_notification(user, message, link=None):
     notification = Notification.objects.create(user=user, message=message, link=link)
 
     # Push real-time
-    channel_layer = get_channel_layer()
-    if channel_layer is not None:
-        async_to_sync(channel_layer.group_send)(
-            f"user_{user.id}",
-            {
-                "type": "notify",
-                "message": message,
-                "link": link,
-                "timestamp": str(notification.created_at),
-            }
-        )
+    _push(notification)
     return notification
+
+
+def create_notifications_bulk(users, message, link=None):
+    """
+    Send the same notification to many users with one INSERT and one
+    channel layer round trip. Duplicate users are notified once.
+    """
+    recipients = {user.id: user for user in users if user is not None}
+    notifications = Notification.objects.bulk_create([
+        Notification(user=user, message=message, link=link)
+        for user in recipients.values()
+    ])
+    # bulk_create skips the post_save counter updates
+    reset_unread_count(*recipients)
+
+    # Push real-time
+    with broadcast_batch():
+        for notification in notifications:
+            _push(notification)
+    return notifications
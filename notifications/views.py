@@ -2,6 +2,7 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
+from .counters import reset_unread_count
 
 @login_required
 def my_notifications(request):
@@ -10,5 +11,6 @@ def my_notifications(request):
 
     # Mark all unread notifications as read immediately when page is viewed
     notifications.filter(read=False).update(read=True)
+    reset_unread_count(request.user.id)
 
     return render(request, "notifications/my_notifications.html", {"notifications": notifications})
\ No newline at end of file
@@ -9,10 +9,24 @@ class NetworkLive {
         this.nodeAnimations = new Map();
         this.routerNodeId = `network_${NETWORK_ID}`;
 
+        // Live state mirrored from the server snapshot + deltas
+        this.socket = null;
+        this.reconnectTimer = null;
+        this.version = null;
+        this.queuedDeltas = [];
+        this.devices = new Map();
+        this.requests = new Map();
+        this.intruders = new Map();
+
         this.initializeCytoscape();
         this.addZoomControls();
         this.initializeEventListeners();
-        this.startPolling();
+
+        // Page is rendered with the cached live state and its version
+        const initial = document.getElementById('live-state');
+        if (initial) this.applySnapshot(JSON.parse(initial.textContent));
+
+        this.connectSocket();
     }
 
     // -------------------------
@@ -471,7 +485,153 @@ class NetworkLive {
     }
 
     // -------------------------
-    // NETWORK STATUS POLLING
+    // LIVE STREAM (WebSocket snapshot + versioned deltas)
+    // -------------------------
+    connectSocket() {
+        if (!('WebSocket' in window)) return this.startPolling();
+
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        this.socket = new WebSocket(`${protocol}//${window.location.host}/ws/network/${NETWORK_ID}/monitor/`);
+
+        this.socket.onopen = () => {
+            // Deltas replace polling while the socket is up
+            this.stopPolling();
+            this.updateSessionStatus(true, 'stream');
+        };
+
+        this.socket.onmessage = (event) => {
+            const message = JSON.parse(event.data);
+            if (message.type === 'initial_state') {
+                this.applySnapshot(message.data);
+            } else if (message.type === 'delta') {
+                this.applyDelta(message);
+            } else if (message.type?.startsWith('scan_')) {
+                this.applyScanEvent(message);
+            }
+        };
+
+        this.socket.onclose = () => {
+            this.socket = null;
+            // Fall back to polling and try to get the stream back
+            if (!this.isPolling) this.startPolling();
+            clearTimeout(this.reconnectTimer);
+            this.reconnectTimer = setTimeout(() => this.connectSocket(), 15000);
+        };
+    }
+
+    applySnapshot(data) {
+        this.version = data.version;
+        this.devices = new Map(data.devices.map(d => [d.id, d]));
+        this.requests = new Map(data.pending_requests.map(r => [r.id, r]));
+        this.intruders = new Map((data.intruders || []).map(i => [i.id, i]));
+
+        this.updateDevices(data.devices);
+        this.updateJoinRequests(data.pending_requests);
+        this.updateIntruders(data.intruders || []);
+        this.updateNetworkInfo(data.network);
+
+        // 🚨 Show flash message if provided by API
+        if (data.flash_message) {
+            this.showNotification("Alert", data.flash_message, "danger", 5000);
+        }
+
+        // Deltas that raced ahead of the snapshot
+        const queued = this.queuedDeltas;
+        this.queuedDeltas = [];
+        queued.forEach(delta => this.applyDelta(delta));
+    }
+
+    applyDelta(delta) {
+        if (this.version === null) {
+            this.queuedDeltas.push(delta);
+            return;
+        }
+        if (delta.version <= this.version) return; // stale or duplicate
+        if (delta.base_version > this.version) {
+            // Missed a delta - queue until a fresh snapshot arrives
+            this.version = null;
+            this.queuedDeltas.push(delta);
+            this.socket?.send(JSON.stringify({ type: 'resync' }));
+            return;
+        }
+        this.version = delta.version;
+
+        let devicesChanged = false, requestsChanged = false, intrudersChanged = false;
+        delta.changes.forEach(({ event, data }) => {
+            switch (event) {
+                case 'device_upserted':
+                    this.devices.set(data.id, data); devicesChanged = true; break;
+                case 'device_removed':
+                    devicesChanged = this.devices.delete(data.id) || devicesChanged; break;
+                case 'request_created':
+                    this.requests.set(data.id, data); requestsChanged = true; break;
+                case 'request_decided':
+                    requestsChanged = this.requests.delete(data.id) || requestsChanged; break;
+                case 'intruder_detected':
+                    this.intruders.set(data.id, data); intrudersChanged = true;
+                    this.showNotification("Alert", "🚨 Intruder detected! Their attempt was blocked.", "danger", 5000);
+                    break;
+                case 'intruder_removed':
+                    intrudersChanged = this.intruders.delete(data.id) || intrudersChanged; break;
+                case 'intruders_cleared':
+                    this.intruders.clear(); intrudersChanged = true; break;
+                case 'members_changed':
+                case 'presence_changed':
+                    this.updateNetworkInfo(data); break;
+            }
+        });
+
+        if (devicesChanged) this.updateDevices([...this.devices.values()]);
+        if (requestsChanged) this.updateJoinRequests([...this.requests.values()]);
+        if (intrudersChanged) this.updateIntruders(this.recentIntruders());
+    }
+
+    // Progress of a network scan running on the server (devices/scan_stream.py)
+    applyScanEvent(event) {
+        const box = document.getElementById('scan-status');
+        const text = document.getElementById('scan-status-text');
+        const bar = document.getElementById('scan-progress');
+        if (!box) return;
+        switch (event.type) {
+            case 'scan_started':
+                this.scanHosts = 0;
+                box.classList.remove('d-none');
+                bar.style.width = '0%';
+                text.textContent = `Scanning ${event.subnets.join(', ')}...`;
+                break;
+            case 'scan_host_found':
+            case 'scan_host_registered':
+                this.scanHosts = (this.scanHosts || 0) + 1;
+                text.textContent = `Scanning... ${this.scanHosts} hosts found`;
+                break;
+            case 'scan_intruder_flagged':
+                this.scanHosts = (this.scanHosts || 0) + 1;
+                this.showNotification("Alert", `🚨 Unregistered device on the network: ${event.ip} (${event.mac})`, "danger", 5000);
+                break;
+            case 'scan_progress':
+                bar.style.width = `${event.percent}%`;
+                text.textContent = `Scanning... ${event.percent}% (${event.hosts} hosts found)`;
+                break;
+            case 'scan_finished':
+                bar.style.width = '100%';
+                text.textContent = `Scan finished: ${event.hosts} hosts, ${event.intruders} new intruders`
+                    + (event.failed.length ? ` (failed: ${event.failed.join(', ')})` : '');
+                setTimeout(() => box.classList.add('d-none'), 10000);
+                break;
+        }
+    }
+
+    recentIntruders() {
+        // Same 1-minute window the server applies to snapshots
+        const cutoff = Date.now() - 60000;
+        this.intruders.forEach((intruder, id) => {
+            if (new Date(intruder.detected_at).getTime() < cutoff) this.intruders.delete(id);
+        });
+        return [...this.intruders.values()];
+    }
+
+    // -------------------------
+    // NETWORK STATUS POLLING (fallback when the stream is unavailable)
     // -------------------------
     startPolling() {
         if (this.pollingInterval) clearInterval(this.pollingInterval);
@@ -493,28 +653,22 @@ class NetworkLive {
     // -------------------------
     async fetchNetworkStatus() {
         try {
-            const res = await fetch(`/n/live/api/network/${NETWORK_ID}/status/`);
+            // Send back the version we hold; 304 means nothing changed
+            const headers = this.version !== null ? { 'If-None-Match': `"${this.version}"` } : {};
+            const res = await fetch(`/n/live/api/network/${NETWORK_ID}/status/`, { headers, cache: 'no-store' });
+            if (res.status === 304) return;
             if (!res.ok) throw new Error(res.status);
-            const data = await res.json();
-
-            this.updateDevices(data.devices);
-            this.updateJoinRequests(data.pending_requests);
-            this.updateIntruders(data.intruders || []);
-            this.updateNetworkInfo(data.network);
-
-            // 🚨 Show flash message if provided by API
-            if (data.flash_message) {
-                this.showNotification("Alert", data.flash_message, "danger", 5000);
-            }
-
+            this.applySnapshot(await res.json());
         } catch {
             this.showNotification('Connection Error', 'Failed to fetch updates', 'danger');
         }
     }
 
     updateNetworkInfo(network) {
-        const el = document.querySelector('.list-group-item:last-child strong');
-        if (el) el.textContent = network.member_count;
+        const members = document.getElementById('member-count');
+        if (members && network.member_count !== undefined) members.textContent = network.member_count;
+        const watching = document.getElementById('watching-count');
+        if (watching && network.watching !== undefined) watching.textContent = network.watching;
     }
 
     // -------------------------
@@ -565,9 +719,15 @@ class NetworkLive {
     // ALERT BADGE CLICK - clears immediately
     // -------------------------
     initializeEventListeners() {
-        document.getElementById('start-session-btn')?.addEventListener('click', () => this.startPolling());
-        document.getElementById('end-session-btn')?.addEventListener('click', () => this.stopPolling());
-        document.getElementById('refresh-network-btn')?.addEventListener('click', () => this.fetchNetworkStatus());
+        document.getElementById('start-session-btn')?.addEventListener('click', () => this.socket ? null : this.connectSocket());
+        document.getElementById('end-session-btn')?.addEventListener('click', () => this.endSession());
+        document.getElementById('refresh-network-btn')?.addEventListener('click', () => {
+            if (this.socket?.readyState === WebSocket.OPEN) {
+                this.socket.send(JSON.stringify({ type: 'resync' }));
+            } else {
+                this.fetchNetworkStatus();
+            }
+        });
 
         // Clear intruder badge on click
         const intrudersTab = document.getElementById("intruders-tab");
@@ -586,13 +746,26 @@ class NetworkLive {
         }
     }
 
-    updateSessionStatus(active) {
+    endSession() {
+        clearTimeout(this.reconnectTimer);
+        if (this.socket) {
+            this.socket.onclose = null;
+            this.socket.close();
+            this.socket = null;
+        }
+        this.stopPolling();
+    }
+
+    updateSessionStatus(active, mode = 'polling') {
         const el = document.getElementById('session-status');
         const start = document.getElementById('start-session-btn');
         const end = document.getElementById('end-session-btn');
+        if (!active && this.socket?.readyState === WebSocket.OPEN) return; // still streaming
         if (active) {
             el.className = 'alert alert-success';
-            el.innerHTML = `<i class="fas fa-play-circle"></i> Session active - Polling every 5s`;
+            el.innerHTML = mode === 'stream'
+                ? `<i class="fas fa-play-circle"></i> Session active - Live updates`
+                : `<i class="fas fa-play-circle"></i> Session active - Polling every 5s`;
             start.disabled = true; end.disabled = false;
         } else {
             el.className = 'alert alert-info';
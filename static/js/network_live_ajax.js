@@ -5,6 +5,7 @@ class NetworkLiveAJAX {
         this.pendingRequests = new Map();
         this.pollingInterval = null;
         this.isPolling = false;
+        this.etag = null;
         
         this.initializeCytoscape();
         this.initializeEventListeners();
@@ -94,13 +95,23 @@ class NetworkLiveAJAX {
 
     async fetchNetworkStatus() {
         try {
-            const response = await fetch(`/n/live/api/network/${NETWORK_ID}/status/`);
+            // Send back the last ETag; 304 means nothing changed since
+            const headers = this.etag ? { 'If-None-Match': this.etag } : {};
+            const response = await fetch(`/n/live/api/network/${NETWORK_ID}/status/`, {
+                headers,
+                cache: 'no-store'
+            });
+            
+            if (response.status === 304) {
+                return;
+            }
             
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
             
             const data = await response.json();
+            this.etag = response.headers.get('ETag');
             this.handleNetworkData(data);
             
         } catch (error) {